@@ -0,0 +1,4 @@
+import sys
+from loan_calculator.main import main
+
+sys.exit(main())
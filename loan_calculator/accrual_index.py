@@ -0,0 +1,63 @@
+from dataclasses import dataclass
+from typing import Sequence, Tuple
+import numpy as np
+from loan_calculator.cache import cached
+from loan_calculator.data_store import CalculationData
+from loan_calculator.interest_calculations import daily_interest_columns
+from loan_calculator.periods import included_days_before
+
+@dataclass(frozen=True)
+class AccrualIndex:
+    calc_data: CalculationData
+    # Entry k is the interest of the first k included days, so the accrual
+    # over any date range is the difference of two entries.
+    base_cumulative: np.ndarray
+    margin_cumulative: np.ndarray
+
+    @property
+    def nbytes(self) -> int:
+        return self.base_cumulative.nbytes + self.margin_cumulative.nbytes
+
+    def _bounds(self, from_dates: np.ndarray, to_dates: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        if (to_dates < from_dates).any():
+            raise ValueError("End date must not be before start date.")
+        first = included_days_before(self.calc_data, from_dates)
+        last = included_days_before(self.calc_data, to_dates + 1)
+        return first, last
+
+    def days_between_many(self, from_dates: Sequence[str], to_dates: Sequence[str]) -> np.ndarray:
+        first, last = self._bounds(np.asarray(from_dates, dtype="datetime64[D]"), np.asarray(to_dates, dtype="datetime64[D]"))
+        return last - first
+
+    def between_many(
+        self, from_dates: Sequence[str], to_dates: Sequence[str], with_margin: bool = True
+    ) -> np.ndarray:
+        # Both dates are inclusive; dates outside the loan are clipped to it.
+        first, last = self._bounds(np.asarray(from_dates, dtype="datetime64[D]"), np.asarray(to_dates, dtype="datetime64[D]"))
+        cumulative = self.margin_cumulative if with_margin else self.base_cumulative
+        return cumulative[last] - cumulative[first]
+
+    def between(self, from_date: str, to_date: str, with_margin: bool = True) -> float:
+        return float(self.between_many([from_date], [to_date], with_margin)[0])
+
+@cached()
+def accrual_index(calc_data: CalculationData) -> AccrualIndex:
+    columns = daily_interest_columns(calc_data)
+    return AccrualIndex(
+        calc_data=calc_data,
+        base_cumulative=np.concatenate(([0.0], np.cumsum(columns.base_interest))),
+        margin_cumulative=np.concatenate(([0.0], np.cumsum(columns.margin_interest))),
+    )
+
+def accrued_between(
+    calc_data: CalculationData, from_date: str, to_date: str, with_margin: bool = True
+) -> float:
+    return accrual_index(calc_data).between(from_date, to_date, with_margin)
+
+def accrued_between_many(
+    calc_data: CalculationData,
+    from_dates: Sequence[str],
+    to_dates: Sequence[str],
+    with_margin: bool = True,
+) -> np.ndarray:
+    return accrual_index(calc_data).between_many(from_dates, to_dates, with_margin)
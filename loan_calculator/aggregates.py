@@ -0,0 +1,167 @@
+from dataclasses import dataclass
+from threading import RLock
+from typing import Callable, Dict, Hashable, Iterable, List, Tuple
+from loan_calculator.cache import add_invalidation_hook
+from loan_calculator.data_store import CalculationData, CalculationStore, add_save_hook, get_store
+from loan_calculator.fixed_point import minor_digits
+from loan_calculator.portfolio import portfolio_total_interest
+
+REBUILD_BATCH = 10000
+
+GroupKey = Tuple[str, str]
+# Loans, principal and total interest with margin; sums are kept in the
+# currency's minor units so adding and subtracting loans is exact.
+Totals = Tuple[int, int, int]
+
+@dataclass(frozen=True)
+class SummaryRow:
+    currency: str
+    # None when the row covers every method.
+    method: str | None
+    loans: int
+    amount_minor: int
+    interest_minor: int
+
+    @property
+    def amount(self) -> float:
+        return self.amount_minor / 10 ** minor_digits(self.currency)
+
+    @property
+    def interest(self) -> float:
+        return self.interest_minor / 10 ** minor_digits(self.currency)
+
+@dataclass(frozen=True)
+class Mismatch:
+    currency: str
+    method: str
+    maintained: Totals
+    rebuilt: Totals
+
+def _minor(value: float, currency: str) -> int:
+    return round(value * 10 ** minor_digits(currency))
+
+def _interest(calc: CalculationData) -> float:
+    # Priced the same way as a rebuild so both round to the same minor units.
+    return float(portfolio_total_interest([calc])[0])
+
+def _contribution(calc: CalculationData, interest: float) -> Tuple[GroupKey, Totals]:
+    return (calc.currency, calc.method), (1, _minor(calc.amount, calc.currency), _minor(interest, calc.currency))
+
+def _add(totals: Dict[GroupKey, Totals], key: GroupKey, change: Totals, sign: int = 1) -> None:
+    current = totals.get(key, (0, 0, 0))
+    updated = tuple(value + sign * delta for value, delta in zip(current, change))
+    if updated[0]:
+        totals[key] = updated
+    else:
+        totals.pop(key, None)
+
+def _group_totals(calcs: Iterable[Tuple[int, CalculationData]]) -> Tuple[Dict[GroupKey, Totals], Dict[int, Tuple[GroupKey, Totals]]]:
+    totals: Dict[GroupKey, Totals] = {}
+    contributions: Dict[int, Tuple[GroupKey, Totals]] = {}
+    batch: List[Tuple[int, CalculationData]] = []
+
+    def flush() -> None:
+        # One vectorized pricing pass per batch instead of a call per loan.
+        interest = portfolio_total_interest([calc for _, calc in batch]).tolist()
+        for (calc_id, calc), loan_interest in zip(batch, interest):
+            key, change = contributions[calc_id] = _contribution(calc, loan_interest)
+            _add(totals, key, change)
+        batch.clear()
+
+    for item in calcs:
+        batch.append(item)
+        if len(batch) == REBUILD_BATCH:
+            flush()
+    if batch:
+        flush()
+    return totals, contributions
+
+# Per currency and method totals over the whole store, updated on every
+# save so a summary costs one pass over the groups rather than the loans.
+class PortfolioAggregates:
+    def __init__(self):
+        self._lock = RLock()
+        self._store: CalculationStore | None = None
+        self._totals: Dict[GroupKey, Totals] = {}
+        # What each calculation currently adds, so an overwrite can take
+        # exactly that back out.
+        self._contributions: Dict[int, Tuple[GroupKey, Totals]] = {}
+
+    def _stale(self, store: CalculationStore) -> bool:
+        # Another store, or one changed behind save_calculation's back
+        # (cleared, restored), needs a full rebuild.
+        return self._store is not store or len(self._contributions) != len(store)
+
+    def on_save(self, calc_id: int, caldata: CalculationData, previous: CalculationData | None = None) -> None:
+        # Nothing to maintain until a summary has been asked for.
+        if self._store is not get_store():
+            return
+        interest = _interest(caldata)
+        with self._lock:
+            store = get_store()
+            if self._store is not store:
+                return
+            # Apply whatever the store holds now, not what this save wrote:
+            # when saves of one ID race, the last hook to run leaves the
+            # winning version counted.
+            current = store.get(calc_id)
+            old = self._contributions.pop(calc_id, None)
+            if old is not None:
+                _add(self._totals, *old, sign=-1)
+            if current is not None:
+                key, change = self._contributions[calc_id] = _contribution(
+                    current, interest if current == caldata else _interest(current)
+                )
+                _add(self._totals, key, change)
+
+    def on_inputs_changed(self, predicate: Callable[[Hashable], bool]) -> None:
+        # A replaced rate curve or calendar reprices loans without saving
+        # them. Finding those loans means reading the whole store, so the
+        # next summary rebuilds instead.
+        with self._lock:
+            self._store = None
+
+    def rebuild(self) -> None:
+        with self._lock:
+            store = get_store()
+            self._totals, self._contributions = _group_totals(store.iter(REBUILD_BATCH))
+            self._store = store
+
+    def rows(self, by_method: bool = False) -> List[SummaryRow]:
+        with self._lock:
+            if self._stale(get_store()):
+                self.rebuild()
+            groups = dict(self._totals)
+        if not by_method:
+            merged: Dict[GroupKey, Totals] = {}
+            for (currency, _), totals in groups.items():
+                _add(merged, (currency, None), totals)
+            groups = merged
+        return [SummaryRow(currency, method, *totals) for (currency, method), totals in sorted(groups.items(), key=str)]
+
+    def check(self) -> List[Mismatch]:
+        # Compares the maintained totals with a full recomputation.
+        with self._lock:
+            store = get_store()
+            if self._stale(store):
+                self.rebuild()
+            rebuilt, _ = _group_totals(store.iter(REBUILD_BATCH))
+            keys = sorted(set(self._totals) | set(rebuilt))
+            return [
+                Mismatch(currency, method, self._totals.get((currency, method), (0, 0, 0)), rebuilt.get((currency, method), (0, 0, 0)))
+                for currency, method in keys
+                if self._totals.get((currency, method)) != rebuilt.get((currency, method))
+            ]
+
+aggregates = PortfolioAggregates()
+add_save_hook(aggregates.on_save)
+add_invalidation_hook(aggregates.on_inputs_changed)
+
+def portfolio_summary(by_method: bool = False) -> List[SummaryRow]:
+    return aggregates.rows(by_method)
+
+def check_aggregates() -> List[Mismatch]:
+    return aggregates.check()
+
+def rebuild_aggregates() -> None:
+    aggregates.rebuild()
@@ -0,0 +1,186 @@
+import json
+import mmap
+import os
+import struct
+import time
+from dataclasses import dataclass, fields
+from threading import Lock
+from typing import Dict, Iterator, List
+from loan_calculator.data_store import CalculationData, CalculationStore, MemoryStore, ShardedMemoryStore
+
+# Each log line is a JSON array: seq, timestamp, op, calculation ID, then
+# the CalculationData fields in declaration order.
+CALCULATION_FIELDS = tuple(field.name for field in fields(CalculationData))
+# Side index entry: calculation ID and byte offset of its log line.
+INDEX_ENTRY = struct.Struct("<qq")
+# Replay parses this many bytes of log lines with a single json.loads call.
+REPLAY_BLOCK_BYTES = 4 * 1024 * 1024
+
+_encoder = json.JSONEncoder(separators=(",", ":"))
+
+@dataclass
+class AuditRecord:
+    seq: int
+    timestamp: float
+    op: str
+    calc_id: int
+    calculation: CalculationData
+
+def _to_record(row: list) -> AuditRecord:
+    return AuditRecord(row[0], row[1], row[2], row[3], CalculationData(*row[4:]))
+
+class AuditLog:
+    def __init__(self, path: str, sync_every: int = 64):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.sync_every = sync_every
+        self._offsets: Dict[int, List[int]] = {}
+        self.seq = 0
+        self._recover()
+        self._log = open(self.path, "ab")
+        self._index = open(self.index_path, "ab")
+        self._pending = 0
+        # Save hooks run on many threads; seq, both files and the offsets
+        # must advance together.
+        self._lock = Lock()
+
+    def _recover(self) -> None:
+        # A crash can leave a torn final line in the log and a partial entry,
+        # or entries for lost lines, at the end of the index. Both are cut
+        # back to their last whole record so new appends start cleanly.
+        with open(self.path, "a+b") as log:
+            end = 0
+            if log.seek(0, os.SEEK_END):
+                with mmap.mmap(log.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                    end = view.rfind(b"\n") + 1
+                    if end:
+                        last = view.rfind(b"\n", 0, end - 1) + 1
+                        self.seq = json.loads(view[last:end])[0] + 1
+            log.truncate(end)
+            with open(self.index_path, "a+b") as index:
+                index.seek(0)
+                data = index.read()
+                entries = []
+                for calc_id, offset in INDEX_ENTRY.iter_unpack(data[:len(data) - len(data) % INDEX_ENTRY.size]):
+                    if offset >= end:
+                        break
+                    entries.append((calc_id, offset))
+                index.truncate(len(entries) * INDEX_ENTRY.size)
+                # Lines written before their index entry reached disk are
+                # indexed again.
+                position = 0
+                if entries:
+                    log.seek(entries[-1][1])
+                    log.readline()
+                    position = log.tell()
+                log.seek(position)
+                while position < end:
+                    line = log.readline()
+                    entry = (json.loads(line)[3], position)
+                    index.write(INDEX_ENTRY.pack(*entry))
+                    entries.append(entry)
+                    position += len(line)
+        for calc_id, offset in entries:
+            self._offsets.setdefault(calc_id, []).append(offset)
+
+    def append(self, calc_id: int, caldata: CalculationData, previous: CalculationData | None = None) -> None:
+        with self._lock:
+            row = [self.seq, time.time(), "create" if previous is None else "update", calc_id]
+            row.extend(getattr(caldata, name) for name in CALCULATION_FIELDS)
+            offset = self._log.tell()
+            self._log.write(_encoder.encode(row).encode() + b"\n")
+            self._index.write(INDEX_ENTRY.pack(calc_id, offset))
+            self._offsets.setdefault(calc_id, []).append(offset)
+            self.seq += 1
+            self._pending += 1
+            if self._pending >= self.sync_every:
+                self._sync()
+
+    def _sync(self) -> None:
+        self._log.flush()
+        self._index.flush()
+        os.fsync(self._log.fileno())
+        os.fsync(self._index.fileno())
+        self._pending = 0
+
+    def sync(self) -> None:
+        with self._lock:
+            self._sync()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._log.closed:
+                return
+            self._sync()
+            self._log.close()
+            self._index.close()
+
+    def replay_rows(self) -> Iterator[list]:
+        with self._lock:
+            self._log.flush()
+        if os.path.getsize(self.path) == 0:
+            return
+        with open(self.path, "rb") as log, mmap.mmap(log.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            # A trailing line without a newline is a torn write; stop before it.
+            end = view.rfind(b"\n") + 1
+            position = 0
+            while position < end:
+                block_end = view.rfind(b"\n", position, min(position + REPLAY_BLOCK_BYTES, end)) + 1
+                if block_end <= position:
+                    block_end = view.find(b"\n", position) + 1
+                block = view[position:block_end - 1].replace(b"\n", b",")
+                yield from json.loads(b"[" + block + b"]")
+                position = block_end
+
+    def replay(self) -> Iterator[AuditRecord]:
+        return map(_to_record, self.replay_rows())
+
+    def latest_rows(self) -> Iterator[list]:
+        # The side index knows where each ID's newest version lives, so a
+        # restore decodes one line per calculation instead of the full log.
+        with self._lock:
+            self._log.flush()
+            offsets = sorted(versions[-1] for versions in self._offsets.values())
+        if not offsets:
+            return
+        with open(self.path, "rb") as log, mmap.mmap(log.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            lines = []
+            size = 0
+            for offset in offsets:
+                end = view.find(b"\n", offset)
+                if end == -1:
+                    continue
+                lines.append(view[offset:end])
+                size += end - offset
+                if size >= REPLAY_BLOCK_BYTES:
+                    yield from json.loads(b"[" + b",".join(lines) + b"]")
+                    lines = []
+                    size = 0
+            if lines:
+                yield from json.loads(b"[" + b",".join(lines) + b"]")
+
+    def history(self, calc_id: int) -> List[AuditRecord]:
+        with self._lock:
+            self._log.flush()
+            offsets = list(self._offsets.get(calc_id, ()))
+        records = []
+        with open(self.path, "rb") as log:
+            for offset in offsets:
+                log.seek(offset)
+                line = log.readline()
+                if line.endswith(b"\n"):
+                    records.append(_to_record(json.loads(line)))
+        return records
+
+def restore_store(log: AuditLog, store: CalculationStore) -> int:
+    replayed = 0
+    highest_id = -1
+    for row in log.latest_rows():
+        calc_id = row[3]
+        store.save(CalculationData(*row[4:]), calc_id)
+        if calc_id > highest_id:
+            highest_id = calc_id
+        replayed += 1
+    if isinstance(store, (MemoryStore, ShardedMemoryStore)):
+        store.next_id = max(store.next_id, highest_id + 1)
+    return replayed
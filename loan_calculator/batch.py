@@ -0,0 +1,250 @@
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import asdict
+from itertools import islice
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Sequence, Tuple
+from loan_calculator.calendars import get_calendar
+from loan_calculator.rate_curves import get_rate_curve
+from loan_calculator.fixed_point import check_fixed_point
+from loan_calculator.data_store import CalculationData
+from loan_calculator.dates import iso_date, parse_ordinal
+from loan_calculator.interest_calculations import daily_interest_columns
+from loan_calculator.portfolio import portfolio_total_interest
+
+INPUT_FIELDS = ["start_date", "end_date", "amount", "currency", "base_rate", "margin", "exclude_weekends", "method", "calendar", "rate_curve", "rounding"]
+OUTPUT_FIELDS = ["row"] + INPUT_FIELDS + ["total_interest", "total_interest_no_margin", "error"]
+TRUE_VALUES = {"1", "true", "yes", "y", "t"}
+FALSE_VALUES = {"0", "false", "no", "n", "f", ""}
+DEFAULT_CHUNK_SIZE = 2000
+
+def _is_jsonl(path: str) -> bool:
+    return path.lower().endswith((".jsonl", ".ndjson"))
+
+def read_rows(stream: Iterable[str], jsonl: bool) -> Iterator[Dict[str, Any] | str]:
+    # JSONL lines are passed on undecoded so a malformed line is reported
+    # as an invalid row instead of ending the run.
+    if jsonl:
+        for line in stream:
+            if line.strip():
+                yield line
+    else:
+        yield from csv.DictReader(stream)
+
+def _csv_records(lines: Iterable[str]) -> Iterator[str]:
+    # A quoted field may span lines. Escaped quotes come in pairs, so a
+    # record ends on the first line that leaves the quote count even.
+    record: List[str] = []
+    quotes = 0
+    for line in lines:
+        record.append(line)
+        quotes += line.count('"')
+        if quotes % 2 == 0:
+            yield "".join(record)
+            record = []
+            quotes = 0
+    if record:
+        yield "".join(record)
+
+def _decode_row(row: Dict[str, Any] | str) -> Dict[str, Any]:
+    if isinstance(row, str):
+        try:
+            row = json.loads(row)
+        except ValueError as e:
+            raise ValueError(f"Invalid JSON: {e}") from e
+    if not isinstance(row, dict):
+        raise ValueError("Row must be a JSON object.")
+    return row
+
+def _parse_flag(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise ValueError(f"Invalid exclude_weekends value: {value}")
+
+def validate_row(row: Dict[str, Any]) -> CalculationData:
+    missing = [name for name in INPUT_FIELDS[:6] if row.get(name) in (None, "")]
+    if missing:
+        raise ValueError(f"Missing fields: {', '.join(missing)}")
+    start_date = parse_ordinal(str(row["start_date"]).strip())
+    end_date = parse_ordinal(str(row["end_date"]).strip())
+    if end_date <= start_date:
+        raise ValueError("End date must be after start date.")
+    method = str(row.get("method") or "simple").strip().lower()
+    if method not in ("simple", "compound"):
+        raise ValueError(f"Unknown method: {method}")
+    calendar = str(row.get("calendar") or "").strip().upper() or None
+    if calendar:
+        get_calendar(calendar)
+    rate_curve = str(row.get("rate_curve") or "").strip().upper() or None
+    if rate_curve:
+        get_rate_curve(rate_curve)
+    rounding = str(row.get("rounding") or "").strip().lower() or None
+    calc = CalculationData(
+        start_date=iso_date(start_date),
+        end_date=iso_date(end_date),
+        amount=float(row["amount"]),
+        currency=str(row["currency"]).strip().upper(),
+        base_rate=float(row["base_rate"]),
+        margin=float(row["margin"]),
+        exclude_weekends=_parse_flag(row.get("exclude_weekends", False)),
+        method=method,
+        calendar=calendar,
+        rate_curve=rate_curve,
+        rounding=rounding
+    )
+    if rounding:
+        check_fixed_point(calc)
+    return calc
+
+def process_chunk(chunk: Sequence[Tuple[int, Dict[str, Any] | str]], schedules: bool = False) -> List[Dict[str, Any]]:
+    results: List[Dict[str, Any]] = []
+    valid: List[Tuple[Dict[str, Any], CalculationData]] = []
+    for row_number, row in chunk:
+        result: Dict[str, Any] = {"row": row_number}
+        try:
+            row = _decode_row(row)
+            calc = validate_row(row)
+        except (ValueError, TypeError) as e:
+            fields = row if isinstance(row, dict) else {}
+            result.update({name: fields.get(name) for name in INPUT_FIELDS})
+            result.update(total_interest=None, total_interest_no_margin=None, error=str(e))
+        else:
+            result.update(asdict(calc))
+            valid.append((result, calc))
+        results.append(result)
+
+    if valid:
+        calcs = [calc for _, calc in valid]
+        with_margin = portfolio_total_interest(calcs, with_margin=True).tolist()
+        no_margin = portfolio_total_interest(calcs, with_margin=False).tolist()
+        for (result, calc), total, base_total in zip(valid, with_margin, no_margin):
+            result.update(total_interest=total, total_interest_no_margin=base_total, error=None)
+            if schedules:
+                result["schedule"] = daily_interest_columns(calc).to_dicts()
+    return results
+
+def _serialize(results: Iterable[Dict[str, Any]], jsonl: bool) -> str:
+    buffer = io.StringIO()
+    if jsonl:
+        for result in results:
+            buffer.write(json.dumps(result) + "\n")
+    else:
+        csv.DictWriter(buffer, OUTPUT_FIELDS).writerows(results)
+    return buffer.getvalue()
+
+def process_text_chunk(
+    lines: Sequence[str],
+    first_row: int,
+    fieldnames: Sequence[str] | None,
+    jsonl_output: bool,
+    schedules: bool = False,
+) -> Tuple[str, int, int]:
+    # Parsing and serializing happen in the worker so the parent process
+    # only moves text, which keeps it from becoming the bottleneck.
+    if fieldnames is None:
+        rows = read_rows(lines, jsonl=True)
+    else:
+        rows = csv.DictReader(lines, fieldnames)
+    results = process_chunk(list(enumerate(rows, start=first_row)), schedules)
+    failed = sum(1 for result in results if result["error"] is not None)
+    return _serialize(results, jsonl_output), len(results), failed
+
+class _InlineExecutor(Executor):
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        future: Future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+def _ordered_map(fn: Callable, tasks: Iterable[tuple], workers: int | None) -> Iterator[Any]:
+    workers = workers or os.cpu_count() or 1
+    executor = _InlineExecutor() if workers == 1 else ProcessPoolExecutor(max_workers=workers)
+    # At most two tasks per worker are in flight, so memory stays bounded
+    # no matter how large the input is; results are released in input order.
+    pending: Deque[Future] = deque()
+    with executor:
+        for task in tasks:
+            pending.append(executor.submit(fn, *task))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def run_batch(
+    rows: Iterable[Dict[str, Any]],
+    workers: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    schedules: bool = False,
+) -> Iterator[Dict[str, Any]]:
+    numbered = enumerate(rows, start=1)
+    chunks = iter(lambda: list(islice(numbered, chunk_size)), [])
+    for results in _ordered_map(process_chunk, ((chunk, schedules) for chunk in chunks), workers):
+        yield from results
+
+def run_batch_file(
+    input_path: str,
+    output_path: str,
+    workers: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    schedules: bool = False,
+) -> Tuple[int, int]:
+    jsonl_input = _is_jsonl(input_path)
+    jsonl_output = _is_jsonl(output_path)
+    if schedules and not jsonl_output:
+        raise ValueError("Schedules can only be written to JSONL output.")
+
+    processed = 0
+    failed = 0
+    with open(input_path, newline="") as source, open(output_path, "w", newline="") as target:
+        records = source if jsonl_input else _csv_records(source)
+        fieldnames = None if jsonl_input else next(csv.reader([next(records, "")]), None)
+        if not jsonl_input and not fieldnames:
+            raise ValueError(f"{input_path} has no CSV header.")
+        if not jsonl_output:
+            csv.DictWriter(target, OUTPUT_FIELDS).writeheader()
+
+        def tasks() -> Iterator[tuple]:
+            first_row = 1
+            while lines := [line for line in islice(records, chunk_size) if line.strip()]:
+                yield lines, first_row, fieldnames, jsonl_output, schedules
+                first_row += len(lines)
+
+        for text, count, invalid in _ordered_map(process_text_chunk, tasks(), workers):
+            target.write(text)
+            processed += count
+            failed += invalid
+    return processed, failed
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Calculate interest for every loan in a CSV or JSONL file.")
+    parser.add_argument("input", type=str, help="Input file (.csv, or .jsonl/.ndjson)")
+    parser.add_argument("output", type=str, help="Output file (.csv, or .jsonl/.ndjson)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--chunk-size", dest="chunk_size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per worker task")
+    parser.add_argument("--schedules", action="store_true", help="Include daily schedules (JSONL output only)")
+    return parser
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        processed, failed = run_batch_file(args.input, args.output, args.workers, args.chunk_size, args.schedules)
+    except (OSError, ValueError) as e:
+        print(f"An error occurred: {e}", file=sys.stderr)
+        return 1
+    print(f"Processed {processed} rows ({failed} invalid) into {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,362 @@
+import argparse
+import io
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Sequence
+from loan_calculator.data_store import CalculationData, MemoryStore, save_calculation, use_store
+
+# Results files carry this version so compare can refuse files it cannot read.
+RESULTS_VERSION = 1
+DEFAULT_REPEAT = 20
+DEFAULT_THRESHOLD = 0.2
+# Metric name -> True when a larger value is better.
+TRACKED_METRICS = {"p50_s": False, "p95_s": False, "throughput": True, "peak_bytes": False}
+
+LOAN_TERMS = {"1m": "2024-01-31", "1y": "2024-12-31", "30y": "2053-12-31"}
+SAVE_BATCH = 1000
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    # Builds the timed operation; runs once, untimed, with an empty store installed.
+    setup: Callable[[], Callable[[], Any]]
+    # Work items handled by one call, used for throughput (rows, loans, saves).
+    items: int = 1
+    repeat: int = DEFAULT_REPEAT
+    # Runs untimed before every call, e.g. to measure cold caches.
+    reset: Callable[[], None] | None = None
+    slow: bool = False
+
+@dataclass(frozen=True)
+class BenchmarkResult:
+    name: str
+    repeat: int
+    items: int
+    mean_s: float
+    p50_s: float
+    p95_s: float
+    p99_s: float
+    throughput: float
+    peak_bytes: int
+
+@dataclass(frozen=True)
+class Regression:
+    name: str
+    metric: str
+    baseline: float
+    current: float
+    change: float
+
+def percentile(samples: Sequence[float], fraction: float) -> float:
+    # Nearest-rank percentile; samples must be sorted.
+    rank = max(1, -(-len(samples) * fraction // 1))
+    return samples[int(rank) - 1]
+
+def _loan(
+    term: str, method: str, exclude_weekends: bool, amount: float = 100000.0, rounding: str | None = None
+) -> CalculationData:
+    return CalculationData(
+        start_date="2024-01-01",
+        end_date=LOAN_TERMS[term],
+        amount=amount,
+        currency="USD",
+        base_rate=5.0,
+        margin=2.0,
+        exclude_weekends=exclude_weekends,
+        method=method,
+        rounding=rounding
+    )
+
+def generate_portfolio(size: int, seed: int = 42) -> List[CalculationData]:
+    rng = random.Random(seed)
+    first_day = date(2020, 1, 1)
+    loans = []
+    for _ in range(size):
+        start = first_day + timedelta(days=rng.randrange(1500))
+        end = start + timedelta(days=rng.randrange(28, 30 * 365))
+        loans.append(CalculationData(
+            start_date=start.isoformat(),
+            end_date=end.isoformat(),
+            amount=round(rng.uniform(1000, 1000000), 2),
+            currency=rng.choice(("USD", "EUR", "GBP")),
+            base_rate=round(rng.uniform(0.5, 8.0), 2),
+            margin=round(rng.uniform(0.0, 4.0), 2),
+            exclude_weekends=rng.random() < 0.5,
+            method=rng.choice(("simple", "compound"))
+        ))
+    return loans
+
+def _clear_cache() -> None:
+    from loan_calculator.cache import result_cache
+    result_cache.clear()
+
+def _schedule_scenario(term: str, method: str, exclude_weekends: bool) -> Scenario:
+    from loan_calculator.interest_calculations import count_included_days, daily_interest_data, parse_date
+    calc = _loan(term, method, exclude_weekends)
+    rows = count_included_days(parse_date(calc.start_date), parse_date(calc.end_date), exclude_weekends)
+    weekends = "weekdays" if exclude_weekends else "all_days"
+    return Scenario(
+        f"daily_interest_data/{term}/{method}/{weekends}",
+        lambda: lambda: daily_interest_data(calc),
+        items=rows,
+        reset=_clear_cache,
+        slow=term == "30y",
+    )
+
+def _total_scenario(term: str, method: str, warm: bool, rounding: str | None = None) -> Scenario:
+    from loan_calculator.interest_calculations import total_interest
+    calc = _loan(term, method, False, rounding=rounding)
+
+    def setup() -> Callable[[], Any]:
+        total_interest(calc)
+        return lambda: total_interest(calc)
+
+    return Scenario(
+        f"{'fixed_point_' + rounding if rounding else 'total_interest'}/{term}/{method}/{'warm' if warm else 'cold'}",
+        setup,
+        repeat=DEFAULT_REPEAT * 10,
+        reset=None if warm else _clear_cache,
+    )
+
+def _save_scenario() -> Scenario:
+    calcs = [_loan("1y", "simple", False, amount=1000.0 + i) for i in range(SAVE_BATCH)]
+
+    def setup() -> Callable[[], Any]:
+        def save_all() -> None:
+            for calc in calcs:
+                save_calculation(calc)
+        return save_all
+
+    return Scenario("save_calculation/memory", setup, items=SAVE_BATCH)
+
+def _show_scenario(term: str) -> Scenario:
+    from loan_calculator.main import OneShotCommands, show_parser
+    calc = _loan(term, "simple", False)
+
+    def setup() -> Callable[[], Any]:
+        args = show_parser.parse_args([str(save_calculation(calc))])
+        return lambda: OneShotCommands(io.StringIO(), io.StringIO()).run_show(args)
+
+    rows = (date.fromisoformat(calc.end_date) - date.fromisoformat(calc.start_date)).days + 1
+    return Scenario(
+        f"show_render/{term}",
+        setup,
+        items=rows,
+        repeat=3 if term == "30y" else 10,
+        reset=_clear_cache,
+        slow=term == "30y",
+    )
+
+def _portfolio_scenario(size: int, schedules: bool = False) -> Scenario:
+    from loan_calculator.portfolio import portfolio_daily_interest, portfolio_total_interest
+    engine = portfolio_daily_interest if schedules else portfolio_total_interest
+
+    def setup() -> Callable[[], Any]:
+        loans = generate_portfolio(size)
+        return lambda: engine(loans)
+
+    if schedules:
+        return Scenario(f"portfolio_daily_interest/{size}", setup, items=size, repeat=3)
+    return Scenario(
+        f"portfolio_total_interest/{size}",
+        setup,
+        items=size,
+        repeat=5 if size > 10000 else DEFAULT_REPEAT,
+        slow=size > 10000,
+    )
+
+def default_scenarios() -> List[Scenario]:
+    scenarios = [
+        _schedule_scenario(term, method, exclude_weekends)
+        for term in LOAN_TERMS
+        for method in ("simple", "compound")
+        for exclude_weekends in (False, True)
+    ]
+    scenarios += [
+        _total_scenario(term, method, warm)
+        for term in LOAN_TERMS
+        for method in ("simple", "compound")
+        for warm in (False, True)
+    ]
+    scenarios += [
+        _total_scenario(term, method, False, rounding)
+        for term in LOAN_TERMS
+        for method in ("simple", "compound")
+        for rounding in ("daily", "total")
+    ]
+    scenarios.append(_save_scenario())
+    scenarios += [_show_scenario(term) for term in LOAN_TERMS]
+    scenarios += [_portfolio_scenario(1000), _portfolio_scenario(100000), _portfolio_scenario(1000, schedules=True)]
+    return scenarios
+
+def run_scenario(scenario: Scenario, repeat: int | None = None) -> BenchmarkResult:
+    repeat = repeat or scenario.repeat
+    previous = use_store(MemoryStore())
+    try:
+        operation = scenario.setup()
+        operation()  # Warm-up: imports, allocator and first-call costs.
+        samples = []
+        for _ in range(repeat):
+            if scenario.reset:
+                scenario.reset()
+            started = time.perf_counter()
+            operation()
+            samples.append(time.perf_counter() - started)
+
+        # Tracing slows allocation down, so memory is measured in its own run.
+        if scenario.reset:
+            scenario.reset()
+        tracemalloc.start()
+        try:
+            operation()
+            _, peak_bytes = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    finally:
+        use_store(previous)
+
+    samples.sort()
+    mean = sum(samples) / len(samples)
+    return BenchmarkResult(
+        name=scenario.name,
+        repeat=repeat,
+        items=scenario.items,
+        mean_s=mean,
+        p50_s=percentile(samples, 0.50),
+        p95_s=percentile(samples, 0.95),
+        p99_s=percentile(samples, 0.99),
+        throughput=scenario.items / mean if mean else float("inf"),
+        peak_bytes=peak_bytes,
+    )
+
+def run_benchmarks(
+    scenarios: Sequence[Scenario],
+    pattern: str | None = None,
+    repeat: int | None = None,
+    quick: bool = False,
+    progress: Callable[[BenchmarkResult], None] | None = None,
+) -> List[BenchmarkResult]:
+    results = []
+    for scenario in scenarios:
+        if pattern and pattern not in scenario.name:
+            continue
+        if quick and scenario.slow:
+            continue
+        result = run_scenario(scenario, min(repeat or scenario.repeat, 3) if quick else repeat)
+        if progress:
+            progress(result)
+        results.append(result)
+    return results
+
+def environment() -> Dict[str, str]:
+    import numpy
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "numpy": numpy.__version__,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+def write_results(path: str, results: Sequence[BenchmarkResult]) -> None:
+    document = {
+        "version": RESULTS_VERSION,
+        "environment": environment(),
+        "results": [asdict(result) for result in results],
+    }
+    with open(path, "w") as target:
+        json.dump(document, target, indent=2)
+        target.write("\n")
+
+def load_results(path: str) -> Dict[str, Dict[str, Any]]:
+    with open(path) as source:
+        document = json.load(source)
+    if document.get("version") != RESULTS_VERSION:
+        raise ValueError(f"{path} has unsupported results version {document.get('version')!r}.")
+    return {result["name"]: result for result in document["results"]}
+
+def compare_results(
+    baseline: Dict[str, Dict[str, Any]],
+    current: Dict[str, Dict[str, Any]],
+    threshold: float = DEFAULT_THRESHOLD,
+    metrics: Sequence[str] = tuple(TRACKED_METRICS),
+) -> List[Regression]:
+    regressions = []
+    for name in baseline.keys() & current.keys():
+        for metric in metrics:
+            before = baseline[name][metric]
+            after = current[name][metric]
+            if not before:
+                continue
+            change = (after - before) / before
+            # Normalise so a positive change is always "worse".
+            worse = -change if TRACKED_METRICS[metric] else change
+            if worse > threshold:
+                regressions.append(Regression(name, metric, before, after, change))
+    return sorted(regressions, key=lambda regression: (regression.name, regression.metric))
+
+def _format_result(result: BenchmarkResult) -> str:
+    return (
+        f"{result.name:<48} p50 {result.p50_s * 1000:9.3f} ms  p95 {result.p95_s * 1000:9.3f} ms  "
+        f"{result.throughput:14,.0f} items/s  peak {result.peak_bytes / 1024:10,.1f} KiB"
+    )
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark the calculation, cache and rendering hot paths.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the benchmark scenarios")
+    run_parser.add_argument("--output", type=str, default=None, help="Write results to this JSON file")
+    run_parser.add_argument("--filter", dest="pattern", type=str, default=None, help="Only run scenarios whose name contains this text")
+    run_parser.add_argument("--repeat", type=int, default=None, help="Timed calls per scenario (default: per scenario)")
+    run_parser.add_argument("--quick", action="store_true", help="Skip slow scenarios and cap repeats at 3")
+    run_parser.add_argument("--list", dest="list_only", action="store_true", help="List scenario names and exit")
+
+    compare_parser = commands.add_parser("compare", help="Fail when current results regress against a baseline")
+    compare_parser.add_argument("baseline", type=str, help="Baseline results JSON")
+    compare_parser.add_argument("current", type=str, help="Current results JSON")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed relative regression (default: 0.2 = 20%%)")
+    compare_parser.add_argument("--metric", dest="metrics", action="append", choices=list(TRACKED_METRICS), help="Metric to check (repeatable; default: all)")
+    return parser
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.command == "run":
+        scenarios = default_scenarios()
+        if args.list_only:
+            for scenario in scenarios:
+                print(scenario.name)
+            return 0
+        results = run_benchmarks(scenarios, args.pattern, args.repeat, args.quick, lambda result: print(_format_result(result)))
+        if args.output:
+            write_results(args.output, results)
+            print(f"Wrote {len(results)} results to {args.output}")
+        return 0
+
+    try:
+        baseline = load_results(args.baseline)
+        current = load_results(args.current)
+    except (OSError, ValueError) as e:
+        print(f"An error occurred: {e}", file=sys.stderr)
+        return 2
+    regressions = compare_results(baseline, current, args.threshold, args.metrics or tuple(TRACKED_METRICS))
+    for regression in regressions:
+        print(
+            f"REGRESSION {regression.name} {regression.metric}: "
+            f"{regression.baseline:.6g} -> {regression.current:.6g} ({regression.change:+.1%})"
+        )
+    missing = sorted(baseline.keys() - current.keys())
+    if missing:
+        print(f"Not in current results: {', '.join(missing)}", file=sys.stderr)
+    print(f"Compared {len(baseline.keys() & current.keys())} scenarios, {len(regressions)} regressions.")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import wraps
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, List, Set, Tuple
+
+# Rough CPython footprint of one schedule row (a four-key dict plus its
+# date string, floats and int) and of a scalar result with its cache slot.
+ROW_BYTES = 360
+ENTRY_BYTES = 120
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+def estimate_size(value: Any) -> int:
+    if hasattr(value, "nbytes"):
+        return ENTRY_BYTES + value.nbytes
+    if hasattr(value, "__len__"):
+        return ENTRY_BYTES + len(value) * ROW_BYTES
+    return ENTRY_BYTES
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+    entries: int
+    current_bytes: int
+    max_bytes: int
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+class ResultCache:
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, size_of: Callable[[Any], int] = estimate_size):
+        self.max_bytes = max_bytes
+        self.size_of = size_of
+        self._entries: OrderedDict[Hashable, Tuple[Any, int, Hashable]] = OrderedDict()
+        self._by_owner: Dict[Hashable, Set[Hashable]] = {}
+        self._lock = Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any, owner: Hashable = None) -> None:
+        size = self.size_of(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size, owner)
+            self._by_owner.setdefault(owner, set()).add(key)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, owner: Hashable) -> int:
+        with self._lock:
+            keys = self._by_owner.get(owner, ())
+            removed = len(keys)
+            for key in list(keys):
+                self._remove(key)
+            self.invalidations += removed
+            return removed
+
+    def invalidate_matching(self, predicate: Callable[[Hashable], bool]) -> int:
+        with self._lock:
+            owners = [owner for owner in self._by_owner if predicate(owner)]
+        return sum(self.invalidate(owner) for owner in owners)
+
+    def resize(self, max_bytes: int) -> None:
+        with self._lock:
+            self.max_bytes = max_bytes
+            while self._entries and self.current_bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_owner.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self.hits,
+                misses=self.misses,
+                evictions=self.evictions,
+                invalidations=self.invalidations,
+                entries=len(self._entries),
+                current_bytes=self.current_bytes,
+                max_bytes=self.max_bytes,
+            )
+
+    def _remove(self, key: Hashable) -> None:
+        _, size, owner = self._entries.pop(key)
+        self.current_bytes -= size
+        keys = self._by_owner[owner]
+        keys.discard(key)
+        if not keys:
+            del self._by_owner[owner]
+
+result_cache = ResultCache()
+
+def cached(cache: ResultCache = result_cache) -> Callable:
+    missing = object()
+
+    def decorator(func: Callable) -> Callable:
+        def cache_key(owner: Hashable, *args: Any, **kwargs: Any) -> Hashable:
+            return (func.__qualname__, owner, args, tuple(sorted(kwargs.items())))
+
+        @wraps(func)
+        def wrapper(owner: Hashable, *args: Any, **kwargs: Any) -> Any:
+            key = cache_key(owner, *args, **kwargs)
+            value = cache.get(key, missing)
+            if value is missing:
+                value = func(owner, *args, **kwargs)
+                cache.put(key, value, owner)
+            return value
+
+        wrapper.cache = cache
+        wrapper.cache_key = cache_key
+        return wrapper
+
+    return decorator
+
+def invalidate_calculation(calc_data: Hashable) -> int:
+    return result_cache.invalidate(calc_data)
+
+OwnerPredicate = Callable[[Hashable], bool]
+# Called after invalidate_inputs, for state kept outside the result cache
+# that is derived from the same inputs.
+_invalidation_hooks: List[Callable[[OwnerPredicate], None]] = []
+
+def add_invalidation_hook(hook: Callable[[OwnerPredicate], None]) -> None:
+    _invalidation_hooks.append(hook)
+
+def remove_invalidation_hook(hook: Callable[[OwnerPredicate], None]) -> None:
+    _invalidation_hooks.remove(hook)
+
+def invalidate_inputs(predicate: OwnerPredicate) -> int:
+    # A shared input such as a rate curve or calendar changed: every owner
+    # the predicate matches is priced differently from now on.
+    removed = result_cache.invalidate_matching(predicate)
+    for hook in _invalidation_hooks:
+        hook(predicate)
+    return removed
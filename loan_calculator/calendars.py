@@ -0,0 +1,135 @@
+import os
+import re
+from dataclasses import dataclass
+from threading import Lock
+from typing import Dict, Iterable, List
+import numpy as np
+from loan_calculator.cache import invalidate_inputs
+from loan_calculator.dates import EPOCH_ORDINAL, parse_ordinal
+
+# Directory of <NAME>.txt holiday files, one YYYY-MM-DD date per line.
+CALENDAR_DIR_ENV = "LOAN_CALCULATOR_CALENDAR_DIR"
+# Names that may become a file name in that directory.
+CALENDAR_NAME = re.compile(r"[A-Z0-9_]+")
+
+def _weekdays_before(day_numbers: np.ndarray) -> np.ndarray:
+    # Weekdays from a fixed Monday up to each datetime64 day number; only
+    # differences are meaningful. 1970-01-01 was a Thursday.
+    monday_index = day_numbers + 3
+    return (monday_index // 7) * 5 + np.minimum(monday_index % 7, 5)
+
+@dataclass(frozen=True)
+class HolidayCalendar:
+    name: str
+    # Day number (days since 1970-01-01) of January 1st of the first covered year.
+    first_day: int
+    # One bit per covered day, set for business days (np.packbits order).
+    bitset: np.ndarray
+    # Entry k is the number of business days before first_day + k.
+    cumulative: np.ndarray
+    holidays: frozenset
+
+    @property
+    def last_day(self) -> int:
+        return self.first_day + len(self.cumulative) - 2
+
+    @property
+    def nbytes(self) -> int:
+        return self.bitset.nbytes + self.cumulative.nbytes
+
+    def business_days_before(self, day_numbers: np.ndarray) -> np.ndarray:
+        # Business days from first_day up to, but not including, each day.
+        # Outside the covered years only weekends are excluded.
+        day_numbers = np.asarray(day_numbers, dtype=np.int64)
+        end = self.last_day + 1
+        inside = np.clip(day_numbers, self.first_day, end)
+        counts = self.cumulative[inside - self.first_day].astype(np.int64)
+        counts -= _weekdays_before(inside) - _weekdays_before(day_numbers)
+        return counts
+
+    def business_days_between(self, first: np.ndarray, last: np.ndarray) -> np.ndarray:
+        first = np.asarray(first, dtype=np.int64)
+        last = np.asarray(last, dtype=np.int64)
+        return np.maximum(self.business_days_before(last + 1) - self.business_days_before(first), 0)
+
+    def is_business_day(self, day_numbers: np.ndarray) -> np.ndarray:
+        day_numbers = np.asarray(day_numbers, dtype=np.int64)
+        offsets = day_numbers - self.first_day
+        inside = (offsets >= 0) & (day_numbers <= self.last_day)
+        mask = (day_numbers + 3) % 7 < 5
+        if inside.any():
+            positions = offsets[inside]
+            mask[inside] = (self.bitset[positions >> 3] >> (7 - (positions & 7))) & 1 == 1
+        return mask
+
+def compile_calendar(name: str, holidays: Iterable[str | int]) -> HolidayCalendar:
+    # Holidays are ISO strings or datetime64 day numbers; the calendar covers
+    # every full year from the earliest to the latest holiday.
+    days = sorted({parse_ordinal(day) - EPOCH_ORDINAL if isinstance(day, str) else int(day) for day in holidays})
+    if not days:
+        raise ValueError(f"Calendar {name} has no holidays.")
+    first_year = np.datetime64(days[0], "D").astype("datetime64[Y]")
+    last_year = np.datetime64(days[-1], "D").astype("datetime64[Y]")
+    first_day = int(first_year.astype("datetime64[D]").astype(np.int64))
+    end_day = int((last_year + 1).astype("datetime64[D]").astype(np.int64))
+
+    day_numbers = np.arange(first_day, end_day, dtype=np.int64)
+    business = (day_numbers + 3) % 7 < 5
+    business[np.asarray(days, dtype=np.int64) - first_day] = False
+    cumulative = np.zeros(len(business) + 1, dtype=np.int32)
+    np.cumsum(business, out=cumulative[1:])
+    return HolidayCalendar(
+        name=name,
+        first_day=first_day,
+        bitset=np.packbits(business),
+        cumulative=cumulative,
+        holidays=frozenset(days),
+    )
+
+def read_holidays(path: str) -> List[str]:
+    holidays = []
+    with open(path) as source:
+        for line in source:
+            text = line.split("#", 1)[0].strip()
+            if text:
+                holidays.append(text.split()[0])
+    return holidays
+
+_calendars: Dict[str, HolidayCalendar] = {}
+_lock = Lock()
+
+def register_calendar(name: str, holidays: Iterable[str | int]) -> HolidayCalendar:
+    calendar = compile_calendar(name.upper(), holidays)
+    with _lock:
+        replaced = _calendars.get(calendar.name)
+        _calendars[calendar.name] = calendar
+    if replaced is not None:
+        # Results cached for loans on the old holidays are no longer valid.
+        invalidate_inputs(lambda owner: getattr(owner, "calendar", None) == calendar.name)
+    return calendar
+
+def load_calendar(name: str, path: str) -> HolidayCalendar:
+    return register_calendar(name, read_holidays(path))
+
+def get_calendar(name: str) -> HolidayCalendar:
+    key = name.upper()
+    calendar = _calendars.get(key)
+    if calendar is not None:
+        return calendar
+    directory = os.environ.get(CALENDAR_DIR_ENV)
+    if directory and CALENDAR_NAME.fullmatch(key):
+        path = os.path.join(directory, f"{key}.txt")
+        if os.path.exists(path):
+            return load_calendar(key, path)
+    raise ValueError(f"Unknown calendar: {name}")
+
+def has_calendar(name: str) -> bool:
+    try:
+        get_calendar(name)
+    except ValueError:
+        return False
+    return True
+
+def unregister_calendar(name: str) -> None:
+    with _lock:
+        _calendars.pop(name.upper(), None)
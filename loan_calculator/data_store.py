@@ -1,5 +1,13 @@
-from typing import Dict, Any, Tuple, ItemsView
+from typing import Dict, Any, Tuple, ItemsView, Iterable, Iterator, List, Protocol, Callable, Set
+from bisect import bisect_left, bisect_right, insort
+from contextlib import ExitStack, contextmanager
 from dataclasses import dataclass
+from heapq import merge
+from itertools import islice
+from threading import Lock
+from loan_calculator.cache import invalidate_calculation
+from loan_calculator.metrics import timed
+from loan_calculator.dates import parse_ordinal
 
 @dataclass
 class CalculationData:
@@ -11,27 +19,413 @@ class CalculationData:
     margin: float
     exclude_weekends: bool
     method: str
+    # Holiday calendar name; when set, only its business days accrue.
+    calendar: str | None = None
+    # Rate curve name; when set, its fixings replace base_rate from their
+    # dates on, and base_rate only applies before the first fixing.
+    rate_curve: str | None = None
+    # Fixed-point rounding ("daily" or "total"); when set, interest accrues
+    # exactly in integer minor units instead of binary floats.
+    rounding: str | None = None
     
     def __hash__(self) -> int:
-        return hash((self.start_date, self.end_date, self.amount, self.currency, self.base_rate, self.margin, self.exclude_weekends, self.method))
+        return hash((self.start_date, self.end_date, self.amount, self.currency, self.base_rate, self.margin, self.exclude_weekends, self.method, self.calendar, self.rate_curve, self.rounding))
     def __eq__(self, other: Any) -> bool:
         if not isinstance(other, CalculationData):
             return False
-        return self.start_date == other.start_date and self.end_date == other.end_date and self.amount == other.amount and self.currency == other.currency and self.base_rate == other.base_rate and self.margin == other.margin and self.exclude_weekends == other.exclude_weekends and self.method == other.method
+        return self.start_date == other.start_date and self.end_date == other.end_date and self.amount == other.amount and self.currency == other.currency and self.base_rate == other.base_rate and self.margin == other.margin and self.exclude_weekends == other.exclude_weekends and self.method == other.method and self.calendar == other.calendar and self.rate_curve == other.rate_curve and self.rounding == other.rounding
 
-calculations: Dict[int, CalculationData] = {}
-next_id: int = 0
+SORT_FIELDS = ("id", "start_date", "end_date", "amount")
+EQUALITY_FIELDS = ("currency", "method")
 
+@dataclass(frozen=True)
+class ListQuery:
+    currency: str | None = None
+    method: str | None = None
+    # Inclusive bounds; dates are YYYY-MM-DD.
+    start_from: str | None = None
+    start_to: str | None = None
+    end_from: str | None = None
+    end_to: str | None = None
+    min_amount: float | None = None
+    max_amount: float | None = None
+    sort: str = "id"
+    descending: bool = False
+    limit: int | None = None
+    offset: int = 0
+    # Opaque position returned as Page.next_cursor; the page starts after it.
+    cursor: str | None = None
+
+    def ranges(self) -> Dict[str, Tuple[Any, Any]]:
+        bounds = {
+            "start_date": (self.start_from, self.start_to),
+            "end_date": (self.end_from, self.end_to),
+            "amount": (self.min_amount, self.max_amount),
+        }
+        return {name: bound for name, bound in bounds.items() if bound != (None, None)}
+
+@dataclass
+class Page:
+    items: List[Tuple[int, CalculationData]]
+    # Matches for the filters, ignoring cursor, offset and limit.
+    total: int
+    next_cursor: str | None = None
+
+def check_query(query: ListQuery) -> None:
+    if query.sort not in SORT_FIELDS:
+        raise ValueError(f"Unknown sort field: {query.sort}")
+    if query.offset < 0 or (query.limit is not None and query.limit < 1):
+        raise ValueError("Limit must be positive and offset must not be negative.")
+
+def encode_cursor(sort: str, calc_id: int, caldata: CalculationData) -> str:
+    return f"{calc_id if sort == 'id' else getattr(caldata, sort)}@{calc_id}"
+
+def decode_cursor(sort: str, cursor: str) -> Tuple[Any, int]:
+    # Dates stay ISO strings here; each store converts them as it needs.
+    value, separator, calc_id = cursor.rpartition("@")
+    try:
+        if not separator:
+            raise ValueError
+        if sort == "amount":
+            return float(value), int(calc_id)
+        if sort == "id":
+            return int(value), int(calc_id)
+        parse_ordinal(value)
+        return value, int(calc_id)
+    except ValueError:
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+def _index_value(name: str, calc_id: int, caldata: CalculationData) -> Any:
+    if name == "id":
+        return calc_id
+    if name == "amount":
+        return caldata.amount
+    # Ordinals, so dates order correctly however they were typed.
+    return parse_ordinal(getattr(caldata, name))
+
+def _bound_value(name: str, value: Any) -> Any:
+    return parse_ordinal(value) if name in ("start_date", "end_date") else value
+
+# Rough cost of sorting one candidate by value, in keys walked.
+SORT_COST = 10
+
+def _walk_length(candidates: int, keys: int, wanted: int | None) -> int:
+    # Keys a walk over the sort order visits to collect `wanted` of the
+    # candidates, assuming they are spread evenly.
+    if wanted is None or candidates == 0:
+        return keys
+    return min(keys, wanted * keys // candidates)
+
+@dataclass
+class IndexMatch:
+    # The (value, id) keys of a page in page order, plus one more when
+    # another page follows, and the number of filter matches.
+    keys: List[Tuple[Any, int]]
+    total: int
+
+class CalculationIndex:
+    # Id sets per currency and method, plus (value, id) keys kept sorted for
+    # every sort field, so filters and ordered pages come from set
+    # intersections and binary searches instead of a scan of the store.
+    def __init__(self):
+        self._groups: Dict[str, Dict[Any, Set[int]]] = {name: {} for name in EQUALITY_FIELDS}
+        self._sorted: Dict[str, List[Tuple[Any, int]]] = {name: [] for name in SORT_FIELDS}
+
+    def __len__(self) -> int:
+        return len(self._sorted["id"])
+
+    def add(self, calc_id: int, caldata: CalculationData) -> None:
+        for name, groups in self._groups.items():
+            groups.setdefault(getattr(caldata, name), set()).add(calc_id)
+        for name, keys in self._sorted.items():
+            insort(keys, (_index_value(name, calc_id, caldata), calc_id))
+
+    def remove(self, calc_id: int, caldata: CalculationData) -> None:
+        for name, groups in self._groups.items():
+            members = groups.get(getattr(caldata, name))
+            if members is not None:
+                members.discard(calc_id)
+                if not members:
+                    del groups[getattr(caldata, name)]
+        for name, keys in self._sorted.items():
+            key = (_index_value(name, calc_id, caldata), calc_id)
+            position = bisect_left(keys, key)
+            if position < len(keys) and keys[position] == key:
+                del keys[position]
+
+    def replace(self, calc_id: int, previous: CalculationData | None, caldata: CalculationData) -> None:
+        if previous is not None:
+            self.remove(calc_id, previous)
+        self.add(calc_id, caldata)
+
+    def clear(self) -> None:
+        self.__init__()
+
+    def match(self, query: ListQuery, get: Callable[[int], CalculationData | None]) -> IndexMatch:
+        candidates: Set[int] | None = None
+        for name, value in (("currency", query.currency), ("method", query.method)):
+            if value is not None:
+                members = self._groups[name].get(value, set())
+                candidates = members if candidates is None else candidates & members
+
+        keys = self._sorted[query.sort]
+        low, high = 0, len(keys)
+        for name, (first, last) in query.ranges().items():
+            entries = self._sorted[name]
+            begin = bisect_left(entries, (_bound_value(name, first),)) if first is not None else 0
+            end = bisect_right(entries, (_bound_value(name, last), float("inf"))) if last is not None else len(entries)
+            if name == query.sort:
+                low, high = begin, end
+            elif candidates is not None and len(candidates) < end - begin:
+                # Checking the candidates is cheaper than collecting the range.
+                first_key = (_bound_value(name, first),) if first is not None else ()
+                last_key = (_bound_value(name, last), float("inf")) if last is not None else (float("inf"),)
+                candidates = {
+                    calc_id for calc_id in candidates
+                    if first_key <= (_index_value(name, calc_id, get(calc_id)), calc_id) <= last_key
+                }
+            else:
+                members = {calc_id for _, calc_id in entries[begin:end]}
+                candidates = members if candidates is None else candidates & members
+
+        wanted = None if query.limit is None else query.offset + query.limit + 1
+        if candidates is not None and len(candidates) * SORT_COST < _walk_length(len(candidates), high - low, wanted):
+            # Few candidates: sort them directly by their stored values.
+            lowest, highest = keys[low], keys[high - 1]
+            candidate_keys = ((_index_value(query.sort, calc_id, get(calc_id)), calc_id) for calc_id in candidates)
+            keys = sorted(key for key in candidate_keys if lowest <= key <= highest)
+            low, high = 0, len(keys)
+            candidates = None
+        elif candidates is not None and (low, high) != (0, len(keys)):
+            candidates = candidates & {calc_id for _, calc_id in keys[low:high]}
+        total = high - low if candidates is None else len(candidates)
+
+        if query.cursor is not None:
+            value, calc_id = decode_cursor(query.sort, query.cursor)
+            cursor_key = (_bound_value(query.sort, value), calc_id)
+            if query.descending:
+                high = bisect_left(keys, cursor_key, low, high)
+            else:
+                low = max(low, bisect_right(keys, cursor_key, low, high))
+        # Many candidates: walk the sort order and stop once the page is full.
+        positions = range(high - 1, low - 1, -1) if query.descending else range(low, high)
+        walked = (keys[position] for position in positions)
+        if candidates is not None:
+            walked = (key for key in walked if key[1] in candidates)
+        return IndexMatch(list(islice(walked, wanted)), total)
+
+def merge_matches(
+    matches: List[IndexMatch], query: ListQuery, get: Callable[[int], CalculationData | None]
+) -> Page:
+    keys = merge(*(match.keys for match in matches), reverse=query.descending)
+    end = None if query.limit is None else query.offset + query.limit + 1
+    selected = list(islice(keys, query.offset, end))
+    items = [(calc_id, get(calc_id)) for _, calc_id in selected[:query.limit]]
+    next_cursor = None
+    if query.limit is not None and len(selected) > query.limit:
+        next_cursor = encode_cursor(query.sort, *items[-1])
+    return Page(items=items, total=sum(match.total for match in matches), next_cursor=next_cursor)
+
+class CalculationStore(Protocol):
+    def save(self, caldata: CalculationData, calc_id: int = -1) -> int: ...
+    def save_many(self, calcs: Iterable[CalculationData]) -> List[int]: ...
+    def get(self, calc_id: int) -> CalculationData | None: ...
+    def list(self) -> List[Tuple[int, CalculationData]]: ...
+    def iter(self, batch_size: int = 1000) -> Iterator[Tuple[int, CalculationData]]: ...
+    def query(self, query: ListQuery) -> Page: ...
+    def __len__(self) -> int: ...
+
+class MemoryStore:
+    def __init__(self, calculations: Dict[int, CalculationData] | None = None):
+        self.calculations = {} if calculations is None else calculations
+        self.next_id = 0
+        self.index = CalculationIndex()
+        for calc_id, caldata in self.calculations.items():
+            self.index.add(calc_id, caldata)
+
+    def save(self, caldata: CalculationData, calc_id: int = -1) -> int:
+        if calc_id == -1:
+            calc_id = self.next_id
+            self.next_id += 1
+        self.index.replace(calc_id, self.calculations.get(calc_id), caldata)
+        self.calculations[calc_id] = caldata
+        return calc_id
+
+    def save_many(self, calcs: Iterable[CalculationData]) -> List[int]:
+        return [self.save(caldata) for caldata in calcs]
+
+    def get(self, calc_id: int) -> CalculationData | None:
+        return self.calculations.get(calc_id)
+
+    def list(self) -> List[Tuple[int, CalculationData]]:
+        return list(self.calculations.items())
+
+    def iter(self, batch_size: int = 1000) -> Iterator[Tuple[int, CalculationData]]:
+        return iter(self.list())
+
+    def query(self, query: ListQuery) -> Page:
+        check_query(query)
+        return merge_matches([self.index.match(query, self.calculations.get)], query, self.calculations.get)
+
+    def __len__(self) -> int:
+        return len(self.calculations)
+
+DEFAULT_SHARDS = 16
+
+class ShardedMemoryStore:
+    # Calculations are spread over shards by id, each behind its own lock,
+    # so writes to different ids rarely contend; ids come from one counter
+    # with its own lock, so concurrent saves never share an id. Each shard
+    # keeps its own secondary index, updated under the same lock.
+    def __init__(self, shards: int = DEFAULT_SHARDS):
+        self._shards: List[Dict[int, CalculationData]] = [{} for _ in range(shards)]
+        self._indexes = [CalculationIndex() for _ in range(shards)]
+        self._locks = [Lock() for _ in range(shards)]
+        self._id_lock = Lock()
+        self._next_id = 0
+
+    @property
+    def next_id(self) -> int:
+        return self._next_id
+
+    @next_id.setter
+    def next_id(self, value: int) -> None:
+        with self._id_lock:
+            self._next_id = value
+
+    def _allocate_ids(self, count: int) -> int:
+        with self._id_lock:
+            first_id = self._next_id
+            self._next_id += count
+        return first_id
+
+    @contextmanager
+    def _all_shards(self) -> Iterator[None]:
+        # Always taken in shard order, so two callers can't deadlock.
+        with ExitStack() as stack:
+            for lock in self._locks:
+                stack.enter_context(lock)
+            yield
+
+    def save(self, caldata: CalculationData, calc_id: int = -1) -> int:
+        if calc_id == -1:
+            calc_id = self._allocate_ids(1)
+        shard = calc_id % len(self._shards)
+        with self._locks[shard]:
+            self._indexes[shard].replace(calc_id, self._shards[shard].get(calc_id), caldata)
+            self._shards[shard][calc_id] = caldata
+        return calc_id
+
+    def save_many(self, calcs: Iterable[CalculationData]) -> List[int]:
+        calcs = list(calcs)
+        if not calcs:
+            return []
+        first_id = self._allocate_ids(len(calcs))
+        ids = list(range(first_id, first_id + len(calcs)))
+        count = len(self._shards)
+        # All shards are held so a snapshot sees the whole batch or none of it.
+        with self._all_shards():
+            for shard, calculations in enumerate(self._shards):
+                begin = (shard - first_id) % count
+                for calc_id, caldata in zip(ids[begin::count], calcs[begin::count]):
+                    self._indexes[shard].add(calc_id, caldata)
+                    calculations[calc_id] = caldata
+        return ids
+
+    def get(self, calc_id: int) -> CalculationData | None:
+        # A single dict lookup is atomic, so reads don't need the lock.
+        return self._shards[calc_id % len(self._shards)].get(calc_id)
+
+    def list(self) -> List[Tuple[int, CalculationData]]:
+        with self._all_shards():
+            items = [item for calculations in self._shards for item in calculations.items()]
+        items.sort(key=lambda item: item[0])
+        return items
+
+    def iter(self, batch_size: int = 1000) -> Iterator[Tuple[int, CalculationData]]:
+        return iter(self.list())
+
+    def query(self, query: ListQuery) -> Page:
+        check_query(query)
+        with self._all_shards():
+            return merge_matches(
+                [index.match(query, shard.get) for index, shard in zip(self._indexes, self._shards)], query, self.get
+            )
+
+    def clear(self) -> None:
+        with self._all_shards(), self._id_lock:
+            for calculations, index in zip(self._shards, self._indexes):
+                calculations.clear()
+                index.clear()
+            self._next_id = 0
+
+    def __len__(self) -> int:
+        with self._all_shards():
+            return sum(len(calculations) for calculations in self._shards)
+
+_store: CalculationStore = ShardedMemoryStore()
+
+def use_store(store: CalculationStore) -> CalculationStore:
+    global _store
+    previous = _store
+    _store = store
+    return previous
+
+def get_store() -> CalculationStore:
+    return _store
+
+SaveHook = Callable[[int, CalculationData, CalculationData | None], None]
+_save_hooks: List[SaveHook] = []
+
+def add_save_hook(hook: SaveHook) -> None:
+    _save_hooks.append(hook)
+
+def remove_save_hook(hook: SaveHook) -> None:
+    _save_hooks.remove(hook)
+
+# Saves to one explicit ID are serialized, so the version a hook sees as
+# previous is the one this save replaced and hooks run in the store's order.
+# New IDs have no previous version and skip the locks.
+_id_locks = [Lock() for _ in range(64)]
+
+def _save_and_notify(caldata: CalculationData, calc_id: int) -> int:
+    previous = _store.get(calc_id) if calc_id != -1 else None
+    calc_id = _store.save(caldata, calc_id)
+    # Hooks run before the previous version's cache entries are dropped so
+    # they can reuse its results for the new version.
+    for hook in _save_hooks:
+        hook(calc_id, caldata, previous)
+    if previous is not None and previous != caldata:
+        invalidate_calculation(previous)
+    return calc_id
+
+@timed("store.save")
 def save_calculation(caldata: CalculationData, calc_id: int = -1) -> int:
-    global next_id
     if calc_id == -1:
-        calc_id = next_id
-        next_id += 1
-    calculations[calc_id] = caldata
-    return calc_id
+        return _save_and_notify(caldata, calc_id)
+    with _id_locks[calc_id % len(_id_locks)]:
+        return _save_and_notify(caldata, calc_id)
 
+@timed("store.save_many", rows=len)
+def save_calculations(calcs: Iterable[CalculationData]) -> List[int]:
+    calcs = list(calcs)
+    ids = _store.save_many(calcs)
+    for hook in _save_hooks:
+        for calc_id, caldata in zip(ids, calcs):
+            hook(calc_id, caldata, None)
+    return ids
+
+@timed("store.get")
 def get_calculation(calc_id: int) -> CalculationData:
-    return calculations.get(calc_id)
+    return _store.get(calc_id)
 
+@timed("store.list", rows=len)
 def list_calculations() -> list[tuple[int, CalculationData]]:
-    return list(calculations.items())
+    return _store.list()
+
+@timed("store.query", rows=lambda page: len(page.items))
+def query_calculations(query: ListQuery) -> Page:
+    return _store.query(query)
+
+def iter_calculations(batch_size: int = 1000) -> Iterator[Tuple[int, CalculationData]]:
+    return _store.iter(batch_size)
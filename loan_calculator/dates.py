@@ -0,0 +1,37 @@
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Iterable, List
+
+# Proleptic Gregorian ordinal of 1970-01-01, the datetime64 epoch.
+EPOCH_ORDINAL = 719163
+# Roughly three centuries of distinct dates; each entry is a 10-character string.
+ISO_TABLE_SIZE = 1 << 17
+
+@lru_cache(maxsize=4096)
+def parse_ordinal(date_str: str) -> int:
+    # Canonical YYYY-MM-DD strings take the C fast path; anything else gets
+    # the same lenient parsing (and errors) as strptime always gave.
+    if len(date_str) == 10 and date_str[4] == "-" and date_str[7] == "-" and date_str[:4].isdigit():
+        try:
+            return date.fromisoformat(date_str).toordinal()
+        except ValueError:
+            pass
+    return datetime.strptime(date_str, "%Y-%m-%d").toordinal()
+
+@lru_cache(maxsize=ISO_TABLE_SIZE)
+def iso_date(ordinal: int) -> str:
+    return date.fromordinal(ordinal).isoformat()
+
+def iso_dates(ordinals: Iterable[int]) -> List[str]:
+    return list(map(iso_date, ordinals))
+
+def weekday(ordinal: int) -> int:
+    # Monday == 0, like date.weekday(); ordinal 1 (0001-01-01) was a Monday.
+    return (ordinal - 1) % 7
+
+def is_weekend_ordinal(ordinal: int) -> bool:
+    return weekday(ordinal) >= 5
+
+def epoch_day(date_str: str) -> int:
+    # Days since 1970-01-01, the integer behind a datetime64[D].
+    return parse_ordinal(date_str) - EPOCH_ORDINAL
@@ -0,0 +1,190 @@
+from decimal import Decimal
+from fractions import Fraction
+from functools import lru_cache
+from math import exp, floor, log1p
+from typing import List, Sequence
+import numpy as np
+from loan_calculator.data_store import CalculationData
+
+ROUNDING_MODES = ("daily", "total")
+# Rates are held as integers in millionths of a percent, so one day's
+# interest is amount * rate / YEAR_DENOMINATOR minor units.
+RATE_SCALE = 10 ** 6
+YEAR_DENOMINATOR = 100 * 365 * RATE_SCALE
+# ISO 4217 currencies whose minor unit is not a hundredth.
+MINOR_DIGITS = {
+    "BHD": 3, "BIF": 0, "CLP": 0, "DJF": 0, "GNF": 0, "IQD": 3, "ISK": 0, "JOD": 3,
+    "JPY": 0, "KMF": 0, "KRW": 0, "KWD": 3, "LYD": 3, "OMR": 3, "PYG": 0, "RWF": 0,
+    "TND": 3, "UGX": 0, "UYI": 0, "VND": 0, "VUV": 0, "XAF": 0, "XOF": 0, "XPF": 0,
+}
+# Relative precision of a float64.
+EPSILON = 2.0 ** -52
+
+def minor_digits(currency: str) -> int:
+    return MINOR_DIGITS.get(currency.upper(), 2)
+
+def _scaled(value: float, scale: int, what: str) -> int:
+    # Floats are read through their shortest repr, so 0.1 is one tenth.
+    exact = Decimal(repr(float(value))) * scale
+    if exact != exact.to_integral_value():
+        raise ValueError(f"{what} {value} has more decimal places than fixed-point accrual supports.")
+    return int(exact)
+
+def to_minor(amount: float, currency: str) -> int:
+    return _scaled(amount, 10 ** minor_digits(currency), "Amount")
+
+# Portfolios reuse a handful of rates, so their conversions are memoized.
+@lru_cache(maxsize=4096)
+def scaled_rate(rate: float) -> int:
+    return _scaled(rate, RATE_SCALE, "Rate")
+
+def check_fixed_point(calc_data: CalculationData) -> None:
+    if calc_data.rounding not in ROUNDING_MODES:
+        raise ValueError(f"Unknown rounding: {calc_data.rounding}")
+    to_minor(calc_data.amount, calc_data.currency)
+    scaled_rate(calc_data.base_rate)
+    scaled_rate(calc_data.margin)
+
+def round_div(numerator, denominator):
+    # Nearest integer to numerator / denominator with halves rounded up.
+    # Works on ints and integer arrays alike, and adding a whole number to
+    # the quotient never changes how the rest rounds.
+    return (2 * numerator + denominator) // (2 * denominator)
+
+def _overlaps(days: np.ndarray, starts: List[int]) -> np.ndarray:
+    # Days spent in each constant-rate segment during the first `days`
+    # included days; one row per entry of `days`.
+    begins = np.array(starts, dtype=np.int64)
+    ends = np.append(begins[1:], np.iinfo(np.int64).max)
+    return np.clip(days[:, None], begins, ends) - begins
+
+def simple_cumulative(
+    amount: int, starts: List[int], rates: List[int], days: np.ndarray, rounding: str
+) -> np.ndarray:
+    # Simple interest in minor units over the first `days` included days,
+    # with rates[i] in effect from included day starts[i] on.
+    overlaps = _overlaps(days, starts) if len(starts) > 1 else days
+    if rounding == "daily":
+        daily = [round_div(amount * rate, YEAR_DENOMINATOR) for rate in rates]
+        return _weigh(overlaps, daily)
+    # Split each day's exact accrual into whole minor units and a remainder
+    # in 1/YEAR_DENOMINATOR units, so nothing overflows int64.
+    whole, remainder = zip(*(divmod(amount * rate, YEAR_DENOMINATOR) for rate in rates))
+    return _weigh(overlaps, whole) + round_div(_weigh(overlaps, remainder), YEAR_DENOMINATOR)
+
+def _weigh(overlaps: np.ndarray, per_day: Sequence[int]) -> np.ndarray:
+    if overlaps.ndim == 1:
+        return overlaps * per_day[0]
+    return overlaps @ np.array(per_day, dtype=np.int64)
+
+def compound_daily_cumulative(
+    amount: int, starts: List[int], total_rates: List[int], base_rates: List[int], count: int
+) -> np.ndarray:
+    # Each day's interest is rounded and added to the balance before the
+    # next day accrues, as a ledger posts it, so this is a loop by nature.
+    # Returns cumulative base and total interest after 0..count days.
+    twice = 2 * YEAR_DENOMINATOR
+    balances = [amount]
+    append = balances.append
+    balance = amount
+    ends = [*starts[1:], count]
+    for start, end, total_rate in zip(starts, ends, total_rates):
+        doubled = 2 * total_rate
+        for _ in range(start, end):
+            balance += (balance * doubled + YEAR_DENOMINATOR) // twice
+            append(balance)
+
+    day_rates = np.repeat(base_rates, np.subtract(ends, starts))
+    largest = max(balances) * max(map(abs, base_rates))
+    # Base interest doesn't feed back into the balance, so it is rounded in
+    # one pass, in int64 unless the products could overflow it.
+    opening = np.array(balances[:-1], dtype=np.int64 if largest < 2 ** 61 else object)
+    base = np.cumsum(round_div(opening * day_rates.astype(opening.dtype), YEAR_DENOMINATOR))
+    return np.array([np.concatenate(([0], base)), np.array(balances) - amount], dtype=np.int64)
+
+def _exact_compound(
+    amount: int, starts: List[int], total_rates: List[int], base_rates: List[int], day: int, with_margin: bool
+) -> int:
+    balance = Fraction(amount)
+    base = Fraction(0)
+    for start, end, total_rate, base_rate in zip(starts, [*starts[1:], day], total_rates, base_rates):
+        length = min(end, day) - start
+        if length <= 0:
+            break
+        grown = balance * Fraction(YEAR_DENOMINATOR + total_rate, YEAR_DENOMINATOR) ** length
+        if total_rate:
+            base += (grown - balance) * Fraction(base_rate, total_rate)
+        else:
+            base += balance * Fraction(base_rate * length, YEAR_DENOMINATOR)
+        balance = grown
+    return floor((balance - amount if with_margin else base) + Fraction(1, 2))
+
+def _segment_estimates(
+    amount: int, starts: List[int], total_rates: List[int], base_rates: List[int], days: np.ndarray, with_margin: bool
+) -> np.ndarray:
+    begins = np.array(starts, dtype=np.int64)
+    logs = np.log1p(np.array(total_rates, dtype=np.float64) / YEAR_DENOMINATOR)
+    lengths = np.diff(begins)
+    openings = amount * np.exp(np.concatenate(([0.0], np.cumsum(lengths * logs[:-1]))))
+    segment = np.maximum(np.searchsorted(begins, days, side="right") - 1, 0)
+    within = days - begins[segment]
+    balances = openings[segment] * np.exp(within * logs[segment])
+    if with_margin:
+        return balances - amount
+    # Within a segment, base interest is the total interest times
+    # base_rate / total_rate; without growth it is just linear.
+    rates = np.array(base_rates, dtype=np.float64)
+    totals = np.array(total_rates, dtype=np.float64)
+    flat = totals == 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratios = np.where(flat, 0.0, rates / totals)
+    full = np.where(flat[:-1], openings[:-1] * rates[:-1] * lengths / YEAR_DENOMINATOR, ratios[:-1] * np.diff(openings))
+    partial = np.where(
+        flat[segment],
+        openings[segment] * rates[segment] * within / YEAR_DENOMINATOR,
+        ratios[segment] * (balances - openings[segment]),
+    )
+    return np.concatenate(([0.0], np.cumsum(full)))[segment] + partial
+
+def compound_total_cumulative(
+    amount: int,
+    starts: List[int],
+    total_rates: List[int],
+    base_rates: List[int],
+    days: np.ndarray,
+    with_margin: bool,
+) -> np.ndarray:
+    # Exactly compounded interest over the first `days` included days,
+    # rounded once. Floats give the answer unless it lies within their
+    # error bound of a half unit; those few are redone in exact fractions.
+    last = int(days.max(initial=0))
+    if len(starts) > 1:
+        estimates = _segment_estimates(amount, starts, total_rates, base_rates, days, with_margin)
+        logs = np.abs(np.log1p(np.array(total_rates, dtype=np.float64) / YEAR_DENOMINATOR))
+        spread = float(logs @ _overlaps(np.array([last]), starts)[0])
+    else:
+        # Most loans have one rate throughout.
+        log = log1p(total_rates[0] / YEAR_DENOMINATOR)
+        if with_margin:
+            estimates = amount * np.expm1(days * log)
+        elif total_rates[0]:
+            estimates = amount * np.expm1(days * log) * (base_rates[0] / total_rates[0])
+        else:
+            estimates = amount * days * (base_rates[0] / YEAR_DENOMINATOR)
+        spread = abs(log) * last
+
+    # Base interest is a weighted sum of balances, so its error scales with
+    # the weights.
+    weight = 1.0 if with_margin else 1.0 + sum(
+        abs(base / total) if total else abs(base) * max(last, 1) / YEAR_DENOMINATOR
+        for base, total in zip(base_rates, total_rates)
+    )
+    tolerance = 8 * EPSILON * (len(starts) + 4) * (1 + spread) * amount * exp(spread) * weight
+    results = np.floor(estimates + 0.5).astype(np.int64)
+    uncertain = np.abs(estimates - (np.floor(estimates) + 0.5)) <= tolerance
+    if amount >= 2 ** 53:
+        uncertain[:] = True
+    if uncertain.any():
+        for index in np.flatnonzero(uncertain).tolist():
+            results[index] = _exact_compound(amount, starts, total_rates, base_rates, int(days[index]), with_margin)
+    return results
@@ -1,59 +1,606 @@
-from datetime import datetime, timedelta
-from typing import List, Dict, Callable
-from loan_calculator.data_store import CalculationData
-from functools import lru_cache  
+from datetime import datetime
+from typing import List, Dict, Callable, Iterator, Tuple
+from dataclasses import dataclass
+from loan_calculator.data_store import CalculationData, add_save_hook
+from loan_calculator.cache import cached
+from loan_calculator.metrics import timed
+from loan_calculator.schedule import Schedule
+from loan_calculator.dates import EPOCH_ORDINAL, epoch_day, is_weekend_ordinal, iso_date, iso_dates, parse_ordinal, weekday
+from loan_calculator.calendars import get_calendar
+from loan_calculator.rate_curves import get_rate_curve
+from loan_calculator.fixed_point import (
+    ROUNDING_MODES,
+    compound_daily_cumulative,
+    compound_total_cumulative,
+    minor_digits,
+    scaled_rate,
+    simple_cumulative,
+    to_minor,
+)
+from array import array
+import numpy as np
+
+CHUNK_DAYS = 366
 
 def parse_date(date_str: str) -> datetime:
-    return datetime.strptime(date_str, "%Y-%m-%d")
+    return datetime.fromordinal(parse_ordinal(date_str))
 
 def is_weekend(day: datetime) -> bool:
-    return day.weekday() >= 5 
+    return is_weekend_ordinal(day.toordinal()) 
 
 def simple_interest_daily(amount: float, annual_rate: float) -> float:
     return amount * (annual_rate / 100.0) * (1/365.0)
 
-@lru_cache(maxsize=None)
+def _weekdays_before(day_index: int) -> int:
+    # Weekdays in the first `day_index` days of a Monday-aligned calendar.
+    return (day_index // 7) * 5 + min(day_index % 7, 5)
+
+def count_days_between(first_ordinal: int, last_ordinal: int, exclude_weekends: bool) -> int:
+    total_days = last_ordinal - first_ordinal + 1
+    if total_days < 1:
+        return 0
+    if not exclude_weekends:
+        return total_days
+    first = weekday(first_ordinal)
+    return _weekdays_before(first + total_days) - _weekdays_before(first)
+
+def count_included_days(start: datetime, end: datetime, exclude_weekends: bool) -> int:
+    return count_days_between(start.toordinal(), end.toordinal(), exclude_weekends)
+
+def count_calculation_days(calc_data: CalculationData, first_ordinal: int, last_ordinal: int) -> int:
+    # Accruing days in [first, last] under the calculation's calendar, or its
+    # weekend flag when it has none.
+    if calc_data.calendar:
+        calendar = get_calendar(calc_data.calendar)
+        return int(calendar.business_days_between(first_ordinal - EPOCH_ORDINAL, last_ordinal - EPOCH_ORDINAL))
+    return count_days_between(first_ordinal, last_ordinal, calc_data.exclude_weekends)
+
+@dataclass(frozen=True)
+class InterestColumns:
+    dates: np.ndarray
+    base_interest: np.ndarray
+    margin_interest: np.ndarray
+    days_elapsed: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def to_dicts(self) -> List[Dict[str, str | float]]:
+        return [
+            {
+                "Accrual Date": accrual_date,
+                "Daily Interest (No Margin)": daily_base,
+                "Daily Interest (With Margin)": daily_total,
+                "Days Elapsed": days_counted
+            }
+            for accrual_date, daily_base, daily_total, days_counted in zip(
+                iso_dates((self.dates.astype(np.int64) + EPOCH_ORDINAL).tolist()),
+                self.base_interest.tolist(),
+                self.margin_interest.tolist(),
+                self.days_elapsed.tolist(),
+            )
+        ]
+
+    @property
+    def nbytes(self) -> int:
+        return self.dates.nbytes + self.base_interest.nbytes + self.margin_interest.nbytes + self.days_elapsed.nbytes
+
+    def to_schedule(self) -> Schedule:
+        ordinals = array("i")
+        ordinals.frombytes((self.dates.astype(np.int64) + EPOCH_ORDINAL).astype(np.intc).tobytes())
+        base_interest = array("d")
+        base_interest.frombytes(self.base_interest.astype(np.float64).tobytes())
+        margin_interest = array("d")
+        margin_interest.frombytes(self.margin_interest.astype(np.float64).tobytes())
+        days_elapsed = array("i")
+        days_elapsed.frombytes(self.days_elapsed.astype(np.intc).tobytes())
+        return Schedule(ordinals, base_interest, margin_interest, days_elapsed)
+
+@dataclass(frozen=True)
+class ScheduleProfile:
+    # Everything a float schedule depends on except the amount. Accrual is
+    # linear in the amount, so loans sharing a profile share one schedule
+    # computed for a unit principal.
+    start_date: str
+    end_date: str
+    base_rate: float
+    margin: float
+    exclude_weekends: bool
+    method: str
+    calendar: str | None = None
+    rate_curve: str | None = None
+
+    def unit_calculation(self) -> CalculationData:
+        return CalculationData(
+            self.start_date, self.end_date, 1.0, "", self.base_rate, self.margin,
+            self.exclude_weekends, self.method, self.calendar, self.rate_curve,
+        )
+
+def schedule_profile(calc_data: CalculationData) -> ScheduleProfile:
+    # Dates are normalized so equal days share a profile however they were typed.
+    return ScheduleProfile(
+        iso_date(parse_ordinal(calc_data.start_date)),
+        iso_date(parse_ordinal(calc_data.end_date)),
+        calc_data.base_rate,
+        calc_data.margin,
+        calc_data.exclude_weekends,
+        calc_data.method,
+        calc_data.calendar,
+        calc_data.rate_curve,
+    )
+
+def _empty_columns() -> InterestColumns:
+    return InterestColumns(
+        dates=np.empty(0, dtype="datetime64[D]"),
+        base_interest=np.empty(0, dtype=np.float64),
+        margin_interest=np.empty(0, dtype=np.float64),
+        days_elapsed=np.empty(0, dtype=np.int64),
+    )
+
+@dataclass(frozen=True)
+class UnitSchedule:
+    # A float schedule for a principal of one: each included day's balance
+    # and the rates it accrues at. Scaling the balances by the amount gives
+    # the loan's rows, since accrual is linear in the amount.
+    dates: np.ndarray
+    balances: np.ndarray
+    base_rates: np.ndarray | float
+    total_rates: np.ndarray | float
+    days_elapsed: np.ndarray
+    # Balance the day after the last row, for chunks that continue on.
+    closing_balance: float
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self.dates, self.balances, self.base_rates, self.total_rates, self.days_elapsed)
+        return sum(np.asarray(values).nbytes for values in arrays)
+
+    def scaled(self, amount: float) -> InterestColumns:
+        # Dates and day counts are shared with this schedule, not copied.
+        balances = self.balances * amount
+        return InterestColumns(
+            dates=self.dates,
+            base_interest=balances * (self.base_rates / 100.0) * (1/365.0),
+            margin_interest=balances * (self.total_rates / 100.0) * (1/365.0),
+            days_elapsed=self.days_elapsed,
+        )
+
+def _included_dates(calc_data: CalculationData, first_day: np.datetime64, last_day: np.datetime64) -> np.ndarray:
+    total_days = int((last_day - first_day).astype(np.int64)) + 1
+    dates = first_day + np.arange(max(total_days, 0))
+    if calc_data.calendar:
+        return dates[get_calendar(calc_data.calendar).is_business_day(dates.astype(np.int64))]
+    if calc_data.exclude_weekends:
+        # 1970-01-01 was a Thursday, so shifting by 3 gives Monday == 0.
+        weekdays = (dates.astype(np.int64) + 3) % 7
+        return dates[weekdays < 5]
+    return dates
+
+def _unit_schedule(calc_data: CalculationData, dates: np.ndarray, days_before: int) -> UnitSchedule:
+    days_counted = len(dates)
+    if calc_data.rate_curve:
+        base_rates = get_rate_curve(calc_data.rate_curve).rate_on(dates.astype(np.int64), calc_data.base_rate)
+    else:
+        base_rates = calc_data.base_rate
+    total_rates = base_rates + calc_data.margin
+    if days_counted == 0:
+        balances = np.empty(0)
+        closing_balance = 1.0
+    elif calc_data.method == "compound":
+        growth = np.broadcast_to(1 + (total_rates / 100.0) * (1/365.0), (days_counted,))
+        balances = np.empty(days_counted)
+        balances[0] = 1.0
+        balances[1:] = growth[:-1]
+        balances = np.cumprod(balances)
+        closing_balance = float(balances[-1] * growth[-1])
+    elif calc_data.method == "simple":
+        balances = np.ones(days_counted)
+        closing_balance = 1.0
+    else:
+        raise ValueError(f"Unknown method: {calc_data.method}")
+    return UnitSchedule(
+        dates=dates,
+        balances=balances,
+        base_rates=base_rates,
+        total_rates=total_rates,
+        days_elapsed=np.arange(days_before + 1, days_before + days_counted + 1, dtype=np.int64),
+        closing_balance=closing_balance,
+    )
+
+def _columns_between(
+    calc_data: CalculationData,
+    first_day: np.datetime64,
+    last_day: np.datetime64,
+    days_before: int,
+    opening_balance: float,
+) -> Tuple[InterestColumns, float]:
+    dates = _included_dates(calc_data, first_day, last_day)
+    if len(dates) == 0:
+        return _empty_columns(), opening_balance
+    if calc_data.rounding:
+        return _fixed_columns_between(calc_data, dates, days_before), opening_balance
+
+    unit = _unit_schedule(calc_data, dates, days_before)
+    # A simple balance never grows, so it always accrues on the amount.
+    scale = opening_balance if calc_data.method == "compound" else calc_data.amount
+    return unit.scaled(scale), opening_balance * unit.closing_balance
+
+def _fixed_columns_between(calc_data: CalculationData, dates: np.ndarray, days_before: int) -> InterestColumns:
+    # Each row is the step in exact cumulative interest, so rows always sum
+    # to the rounded total in whole minor units.
+    boundaries = np.arange(days_before, days_before + len(dates) + 1, dtype=np.int64)
+    unit = 10 ** minor_digits(calc_data.currency)
+    return InterestColumns(
+        dates=dates,
+        base_interest=np.diff(cumulative_minor_interest(calc_data, boundaries, with_margin=False)) / unit,
+        margin_interest=np.diff(cumulative_minor_interest(calc_data, boundaries, with_margin=True)) / unit,
+        days_elapsed=boundaries[1:],
+    )
+
+@cached()
+def unit_schedule(profile: ScheduleProfile) -> UnitSchedule:
+    calc_data = profile.unit_calculation()
+    first_day = np.datetime64(epoch_day(calc_data.start_date), "D")
+    unit = _unit_schedule(calc_data, _included_dates(calc_data, first_day, np.datetime64(epoch_day(calc_data.end_date), "D")), 0)
+    freeze_unit_schedule(unit)
+    return unit
+
+def freeze_unit_schedule(unit: UnitSchedule) -> None:
+    # Shared by every loan on the profile, so nobody may write to it.
+    for values in (unit.dates, unit.balances, unit.base_rates, unit.total_rates, unit.days_elapsed):
+        if isinstance(values, np.ndarray):
+            values.flags.writeable = False
+
+@timed("daily_interest_columns", rows=len)
+def daily_interest_columns(calc_data: CalculationData) -> InterestColumns:
+    if calc_data.rounding:
+        # Exact minor-unit rounding isn't linear in the amount.
+        columns, _ = _columns_between(
+            calc_data,
+            np.datetime64(epoch_day(calc_data.start_date), "D"),
+            np.datetime64(epoch_day(calc_data.end_date), "D"),
+            0,
+            calc_data.amount,
+        )
+        return columns
+    return unit_schedule(schedule_profile(calc_data)).scaled(calc_data.amount)
+
+def iter_interest_chunks(
+    calc_data: CalculationData,
+    from_date: str | None = None,
+    chunk_days: int = CHUNK_DAYS,
+) -> Iterator[InterestColumns]:
+    start = parse_ordinal(calc_data.start_date)
+    end = parse_ordinal(calc_data.end_date)
+    days_before = 0
+    balance = calc_data.amount
+    if from_date is not None and parse_ordinal(from_date) > start:
+        first = parse_ordinal(from_date)
+        days_before = count_calculation_days(calc_data, start, first - 1)
+        if calc_data.method == "compound" and calc_data.rate_curve:
+            # A compound balance is the amount plus everything accrued so far.
+            balance = calc_data.amount + float(cumulative_interest(calc_data, [days_before])[0])
+        elif calc_data.method == "compound":
+            total_rate = calc_data.base_rate + calc_data.margin
+            balance = calc_data.amount * (1 + (total_rate / 100.0) * (1/365.0)) ** days_before
+        start = first
+
+    chunk_start = np.datetime64(start - EPOCH_ORDINAL, "D")
+    last_day = np.datetime64(end - EPOCH_ORDINAL, "D")
+    while chunk_start <= last_day:
+        chunk_end = min(chunk_start + (chunk_days - 1), last_day)
+        columns, balance = _columns_between(calc_data, chunk_start, chunk_end, days_before, balance)
+        if len(columns):
+            yield columns
+            days_before += len(columns)
+        chunk_start = chunk_end + 1
+
+def included_day_after(calc_data: CalculationData, first_ordinal: int, count: int) -> int | None:
+    # Ordinal of the included day with `count` included days between
+    # first_ordinal and it, found by bisection over the day counts; None
+    # when the loan ends first.
+    low, high = first_ordinal, parse_ordinal(calc_data.end_date)
+    if count_calculation_days(calc_data, low, high) <= count:
+        return None
+    while low < high:
+        middle = (low + high) // 2
+        if count_calculation_days(calc_data, first_ordinal, middle) > count:
+            high = middle
+        else:
+            low = middle + 1
+    return low
+
+@timed("iter_daily_interest_data")
+def iter_daily_interest_data(
+    calc_data: CalculationData,
+    from_date: str | None = None,
+    skip: int = 0,
+    chunk_days: int = CHUNK_DAYS,
+) -> Iterator[Dict[str, str | float]]:
+    if skip:
+        # Skipped rows are never built: the first wanted day becomes the
+        # from_date, where accrual resumes in closed form.
+        first = parse_ordinal(calc_data.start_date)
+        if from_date is not None:
+            first = max(first, parse_ordinal(from_date))
+        resume = included_day_after(calc_data, first, skip)
+        if resume is None:
+            return
+        from_date = iso_date(resume)
+    for columns in iter_interest_chunks(calc_data, from_date, chunk_days):
+        yield from columns.to_dicts()
+
+@cached()
+def daily_schedule(calc_data: CalculationData) -> Schedule:
+    return daily_interest_columns(calc_data).to_schedule()
+
+def _schedule_from_columns(
+    ordinals: np.ndarray, base_interest: np.ndarray, margin_interest: np.ndarray, days_elapsed: np.ndarray
+) -> Schedule:
+    columns = []
+    for values, typecode, dtype in (
+        (ordinals, "i", np.intc),
+        (base_interest, "d", np.float64),
+        (margin_interest, "d", np.float64),
+        (days_elapsed, "i", np.intc),
+    ):
+        column = array(typecode)
+        column.frombytes(np.ascontiguousarray(values, dtype=dtype).tobytes())
+        columns.append(column)
+    return Schedule(*columns)
+
+def derive_schedule(
+    previous: CalculationData, current: CalculationData, schedule: Schedule
+) -> Schedule | None:
+    # Rebuilds `current`'s schedule from `previous`'s, touching only what
+    # the change affects. Returns None when a full recompute is needed.
+    if (
+        previous.start_date != current.start_date
+        or previous.exclude_weekends != current.exclude_weekends
+        or previous.calendar != current.calendar
+        or previous.method != current.method
+        or current.method not in ("simple", "compound")
+        or previous.rate_curve
+        or current.rate_curve
+        or previous.rounding
+        or current.rounding
+    ):
+        return None
+    previous_total_rate = previous.base_rate + previous.margin
+    total_rate = current.base_rate + current.margin
+    compound = current.method == "compound"
+    if compound and (previous_total_rate != total_rate or previous_total_rate == 0 or previous.amount == 0):
+        # The balance grows at the total rate, so every row moves.
+        return None
+
+    ordinals = np.frombuffer(schedule.ordinals, dtype=np.intc)
+    base_interest = np.frombuffer(schedule.base_interest, dtype=np.float64)
+    margin_interest = np.frombuffer(schedule.margin_interest, dtype=np.float64)
+    days_elapsed = np.frombuffer(schedule.days_elapsed, dtype=np.intc)
+
+    last_day = np.datetime64(epoch_day(current.end_date), "D")
+    kept = int(np.searchsorted(ordinals, last_day.astype(np.int64) + EPOCH_ORDINAL, side="right"))
+    ordinals, base_interest, margin_interest, days_elapsed = (
+        ordinals[:kept], base_interest[:kept], margin_interest[:kept], days_elapsed[:kept]
+    )
+
+    if (previous.amount, previous.base_rate, previous.margin) != (current.amount, current.base_rate, current.margin):
+        if compound:
+            # Balances are linear in the amount and the total rate is
+            # unchanged, so both columns are rescaled margin interest.
+            balances_daily = margin_interest * (current.amount / previous.amount)
+            base_interest = balances_daily * (current.base_rate / total_rate)
+            margin_interest = balances_daily
+        else:
+            base_interest = np.full(kept, simple_interest_daily(current.amount, current.base_rate))
+            margin_interest = np.full(kept, simple_interest_daily(current.amount, total_rate))
+
+    previous_last_day = np.datetime64(epoch_day(previous.end_date), "D")
+    if last_day > previous_last_day:
+        opening_balance = current.amount
+        if compound:
+            opening_balance *= (1 + (total_rate / 100.0) * (1/365.0)) ** kept
+        tail, _ = _columns_between(current, previous_last_day + 1, last_day, kept, opening_balance)
+        ordinals = np.concatenate((ordinals, tail.dates.astype(np.int64) + EPOCH_ORDINAL))
+        base_interest = np.concatenate((base_interest, tail.base_interest))
+        margin_interest = np.concatenate((margin_interest, tail.margin_interest))
+        days_elapsed = np.concatenate((days_elapsed, tail.days_elapsed))
+
+    return _schedule_from_columns(ordinals, base_interest, margin_interest, days_elapsed)
+
+def _reuse_schedule(calc_id: int, calc_data: CalculationData, previous: CalculationData | None) -> None:
+    if previous is None or previous == calc_data:
+        return
+    cache = daily_schedule.cache
+    key = daily_schedule.cache_key(calc_data)
+    previous_key = daily_schedule.cache_key(previous)
+    if previous_key not in cache or key in cache:
+        return
+    schedule = cache.get(previous_key)
+    if schedule is None:
+        return
+    derived = derive_schedule(previous, calc_data, schedule)
+    if derived is not None:
+        cache.put(key, derived, calc_data)
+
+add_save_hook(_reuse_schedule)
+
+@timed("daily_interest_data", rows=len)
 def daily_interest_data(
     calc_data: CalculationData 
 ) -> List[Dict[str, str | float]]:
-    start = parse_date(calc_data.start_date)
-    end = parse_date(calc_data.end_date)
-    total_days = (end - start).days + 1
-    if total_days < 1:
-        return []
-
-    results: List[Dict[str, str | float]] = []
-    days_counted = 0
-    current_amount = calc_data.amount 
-    for i in range(0, total_days):
-        accrual_date = start + timedelta(days=i)
-        if calc_data.exclude_weekends and is_weekend(accrual_date):
-            continue
-        days_counted += 1
-
-        if calc_data.method == "compound":
-            daily_base = simple_interest_daily(current_amount, calc_data.base_rate)
-            daily_total = simple_interest_daily(current_amount, calc_data.base_rate + calc_data.margin)
-            current_amount += daily_total
-        elif calc_data.method == "simple":
-            daily_base = simple_interest_daily(calc_data.amount, calc_data.base_rate)
-            daily_total = simple_interest_daily(calc_data.amount, calc_data.base_rate + calc_data.margin)
-        else:
-            raise ValueError(f"Unknown method: {calc_data.method}")
+    return daily_schedule(calc_data).to_dicts()
+
+def closed_form_totals(
+    amounts: np.ndarray,
+    base_rates: np.ndarray,
+    margins: np.ndarray,
+    days: np.ndarray,
+    compound: np.ndarray,
+    with_margin: bool = True,
+) -> np.ndarray:
+    # Shared by the per-loan and portfolio paths so both round identically.
+    total_rates = base_rates + margins
+    rates = total_rates if with_margin else base_rates
+    daily = amounts * (rates / 100.0) * (1/365.0)
+    simple_totals = daily * days
+    # The balance grows by the full rate every included day, so compound
+    # accruals form a geometric series.
+    growth = (total_rates / 100.0) * (1/365.0)
+    factors = np.power(1 + growth, days) - 1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        compound_totals = amounts * factors if with_margin else daily * factors / growth
+    totals = np.where(compound & (growth != 0), compound_totals, simple_totals)
+    return np.where(days == 0, 0.0, totals)
+
+def _weekdays_before_many(day_index: np.ndarray) -> np.ndarray:
+    return (day_index // 7) * 5 + np.minimum(day_index % 7, 5)
+
+def included_days_before(calc_data: CalculationData, days: np.ndarray) -> np.ndarray:
+    # Included days from the loan start up to, but not including, each day.
+    first_day = np.datetime64(epoch_day(calc_data.start_date), "D")
+    last_day = np.datetime64(epoch_day(calc_data.end_date), "D")
+    clipped = np.clip(np.asarray(days).astype("datetime64[D]"), first_day, last_day + 1)
+    if calc_data.calendar:
+        calendar = get_calendar(calc_data.calendar)
+        return calendar.business_days_before(clipped.astype(np.int64)) - calendar.business_days_before(first_day.astype(np.int64))
+    offsets = (clipped - first_day).astype(np.int64)
+    if not calc_data.exclude_weekends:
+        return offsets
+    # 1970-01-01 was a Thursday, so shifting by 3 gives Monday == 0.
+    first = (first_day.astype(np.int64) + 3) % 7
+    return _weekdays_before_many(first + offsets) - _weekdays_before_many(first)
+
+def curve_segments(calc_data: CalculationData) -> Tuple[np.ndarray, np.ndarray]:
+    # Constant-rate segments of a loan on a rate curve: the included-day
+    # offset where each starts and the base rate it accrues at.
+    curve = get_rate_curve(calc_data.rate_curve)
+    first_day = epoch_day(calc_data.start_date)
+    begin, end = curve.fixing_range(first_day, epoch_day(calc_data.end_date))
+    starts = np.concatenate(([0], included_days_before(calc_data, curve.days[begin:end])))
+    rates = np.concatenate((curve.rate_on(np.array([first_day]), calc_data.base_rate), curve.rates[begin:end]))
+    return starts, rates
+
+def _curve_cumulative_interest(calc_data: CalculationData, days: np.ndarray, with_margin: bool) -> np.ndarray:
+    starts, rates = curve_segments(calc_data)
+    lengths = np.diff(starts).astype(np.float64)
+    margins = np.full(len(rates), calc_data.margin, dtype=np.float64)
+    compound = np.full(len(rates), calc_data.method == "compound")
+    openings = np.full(len(rates), calc_data.amount, dtype=np.float64)
+    if calc_data.method == "compound":
+        # Each segment opens on the balance the previous ones compounded to.
+        growth = np.power(1 + ((rates[:-1] + calc_data.margin) / 100.0) * (1/365.0), lengths)
+        openings[1:] *= np.cumprod(growth)
+    segment_totals = closed_form_totals(openings[:-1], rates[:-1], margins[:-1], lengths, compound[:-1], with_margin)
+    before = np.concatenate(([0.0], np.cumsum(segment_totals)))
+
+    # Binary search for each boundary's segment, then close the partial one.
+    segment = np.maximum(np.searchsorted(starts, days, side="right") - 1, 0)
+    partial = closed_form_totals(
+        openings[segment], rates[segment], margins[segment], days - starts[segment], compound[segment], with_margin
+    )
+    return before[segment] + partial
+
+def _fixed_segments(calc_data: CalculationData) -> Tuple[List[int], List[int]]:
+    # Included-day offsets where each base rate starts, and the rates scaled
+    # to integers.
+    if calc_data.rate_curve:
+        starts, rates = curve_segments(calc_data)
+        return starts.tolist(), [scaled_rate(rate) for rate in rates.tolist()]
+    return [0], [scaled_rate(calc_data.base_rate)]
+
+@cached()
+def _compound_daily_minor(calc_data: CalculationData) -> np.ndarray:
+    starts, base_rates = _fixed_segments(calc_data)
+    margin = scaled_rate(calc_data.margin)
+    count = count_calculation_days(calc_data, parse_ordinal(calc_data.start_date), parse_ordinal(calc_data.end_date))
+    return compound_daily_cumulative(
+        to_minor(calc_data.amount, calc_data.currency),
+        starts,
+        [rate + margin for rate in base_rates],
+        base_rates,
+        count,
+    )
+
+def cumulative_minor_interest(calc_data: CalculationData, days: np.ndarray, with_margin: bool = True) -> np.ndarray:
+    # Exact interest in integer minor units over the first `days` included
+    # days of a fixed-point loan: rounded each day, or once per boundary
+    # for rounding "total".
+    if calc_data.rounding not in ROUNDING_MODES:
+        raise ValueError(f"Unknown rounding: {calc_data.rounding}")
+    if calc_data.method not in ("simple", "compound"):
+        raise ValueError(f"Unknown method: {calc_data.method}")
+    days = np.asarray(days, dtype=np.int64)
+    if calc_data.method == "compound" and calc_data.rounding == "daily":
+        cumulative = _compound_daily_minor(calc_data)[int(with_margin)]
+        return cumulative[np.clip(days, 0, len(cumulative) - 1)]
+
+    amount = to_minor(calc_data.amount, calc_data.currency)
+    starts, base_rates = _fixed_segments(calc_data)
+    margin = scaled_rate(calc_data.margin)
+    total_rates = [rate + margin for rate in base_rates]
+    if calc_data.method == "simple":
+        return simple_cumulative(amount, starts, total_rates if with_margin else base_rates, days, calc_data.rounding)
+    return compound_total_cumulative(amount, starts, total_rates, base_rates, days, with_margin)
+
+def total_minor_interest(calc_data: CalculationData, with_margin: bool = True) -> int:
+    days = count_calculation_days(
+        calc_data,
+        parse_ordinal(calc_data.start_date),
+        parse_ordinal(calc_data.end_date),
+    )
+    return int(cumulative_minor_interest(calc_data, [days], with_margin)[0])
+
+def cumulative_interest(calc_data: CalculationData, days: np.ndarray, with_margin: bool = True) -> np.ndarray:
+    # Interest accrued over the first `days` included days of the loan, in
+    # closed form, so any number of boundaries costs one vectorized call.
+    if calc_data.method not in ("simple", "compound"):
+        raise ValueError(f"Unknown method: {calc_data.method}")
+    if calc_data.rounding:
+        return cumulative_minor_interest(calc_data, days, with_margin) / 10 ** minor_digits(calc_data.currency)
+    days = np.asarray(days, dtype=np.float64)
+    if calc_data.rate_curve:
+        return _curve_cumulative_interest(calc_data, days, with_margin)
+    return closed_form_totals(
+        np.full(days.shape, calc_data.amount, dtype=np.float64),
+        np.full(days.shape, calc_data.base_rate, dtype=np.float64),
+        np.full(days.shape, calc_data.margin, dtype=np.float64),
+        days,
+        np.full(days.shape, calc_data.method == "compound"),
+        with_margin,
+    )
+
+def closed_form_interest(
+    calc_data: CalculationData, with_margin: bool = True
+) -> float:
+    days = count_calculation_days(
+        calc_data,
+        parse_ordinal(calc_data.start_date),
+        parse_ordinal(calc_data.end_date),
+    )
+    if days == 0:
+        return 0.0
+    if calc_data.method not in ("simple", "compound"):
+        raise ValueError(f"Unknown method: {calc_data.method}")
+    if calc_data.rate_curve or calc_data.rounding:
+        return float(cumulative_interest(calc_data, [days], with_margin)[0])
 
-        results.append({
-            "Accrual Date": accrual_date.strftime("%Y-%m-%d"),
-            "Daily Interest (No Margin)": daily_base,
-            "Daily Interest (With Margin)": daily_total,
-            "Days Elapsed": days_counted
-        })
-    return results
+    totals = closed_form_totals(
+        np.array([calc_data.amount], dtype=np.float64),
+        np.array([calc_data.base_rate], dtype=np.float64),
+        np.array([calc_data.margin], dtype=np.float64),
+        np.array([days], dtype=np.float64),
+        np.array([calc_data.method == "compound"]),
+        with_margin,
+    )
+    return float(totals[0])
 
-@lru_cache(maxsize=None)
+@timed("total_interest")
+@cached()
 def total_interest(
     calc_data: CalculationData, with_margin: bool = True
 ) -> float:
-    data = daily_interest_data(calc_data)
-    if with_margin:
-        return sum(d["Daily Interest (With Margin)"] for d in data)
-    return sum(d["Daily Interest (No Margin)"] for d in data)
+    return closed_form_interest(calc_data, with_margin)
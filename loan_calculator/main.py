@@ -1,114 +1,310 @@
-import cmd2
 import argparse
-from loan_calculator.interest_calculations import daily_interest_data, total_interest, parse_date
-from loan_calculator.data_store import save_calculation, get_calculation, list_calculations, CalculationData
-from loguru import logger
-from tabulate import tabulate
+import atexit
+import os
+import sys
+import time
 from datetime import datetime
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+from loan_calculator.metrics import METRICS_FILE_ENV, metrics, write_metrics
+from loan_calculator.data_store import save_calculation, get_calculation, query_calculations, ListQuery, use_store, add_save_hook, get_store, MemoryStore, ShardedMemoryStore, CalculationData
 
-class LoanCalculator(cmd2.Cmd):
-    intro = "Welcome to the Enhanced Loan Calculator. Type help or ? to list commands.\n"
-    prompt = "loan_calc> "
-
-    calculate_parser = argparse.ArgumentParser()
-    calculate_parser.add_argument("start_date", type=str, help="Start date in YYYY-MM-DD format")
-    calculate_parser.add_argument("end_date", type=str, help="End date in YYYY-MM-DD format")
-    calculate_parser.add_argument("amount", type=float, help="Loan amount")
-    calculate_parser.add_argument("currency", type=str, help="Currency code (e.g., USD)")
-    calculate_parser.add_argument("base_rate", type=float, help="Base interest rate (%)")
-    calculate_parser.add_argument("margin", type=float, help="Margin (%)")
-    calculate_parser.add_argument("--exclude_weekends", action="store_true", help="Exclude weekends from calculation")
-    calculate_parser.add_argument("--method", choices=["simple", "compound"], default="simple", help="Interest calculation method")
-
-    @cmd2.with_argparser(calculate_parser)
-    def do_calculate(self, args):
-        """Calculate loan interest with parameters:
-        
-        start_date end_date amount currency base_rate margin [--exclude_weekends] [--method {simple,compound}]
-        
-        Example:
-            calculate 2024-01-01 2024-02-01 10000 USD 5.0 2.0 --exclude_weekends --method simple
-        """
+# Heavy dependencies (cmd2, tabulate, loguru, numpy and the engines built on
+# it) are imported inside the commands that use them, so scripted one-shot
+# calls and library imports of this module stay fast.
+
+DEFAULT_PROFILE_PATH = "loan_calculator.prof"
+
+def _render_table(table: List[list], headers: List[str]) -> str:
+    from tabulate import tabulate
+    started = time.perf_counter()
+    text = tabulate(table, headers, tablefmt="fancy_grid")
+    metrics.observe("render_table", time.perf_counter() - started, len(table))
+    return text
+
+# fancy_grid's header rule turned into the rule between two body rows.
+_ROW_RULE = str.maketrans("╞═╪╡", "├─┼┤")
+
+def _render_chunks(chunks: Iterable[List[list]], headers: List[str]) -> Iterator[str]:
+    # One table streamed in pieces: the header comes with the first chunk
+    # and later chunks only add rows. The headers are wider than any value
+    # these tables hold, so every chunk renders with the same column widths.
+    bottom = None
+    for table in chunks:
+        lines = _render_table(table, headers).splitlines()
+        if bottom is None:
+            yield "\n".join(lines[:-1])
+        else:
+            yield "\n".join([lines[2].translate(_ROW_RULE)] + lines[3:-1])
+        bottom = lines[-1]
+    if bottom is not None:
+        yield bottom
+
+def _log_error(message: str) -> None:
+    from loguru import logger
+    logger.error(message)
+
+calculate_parser = argparse.ArgumentParser(prog="calculate")
+calculate_parser.add_argument("start_date", type=str, help="Start date in YYYY-MM-DD format")
+calculate_parser.add_argument("end_date", type=str, help="End date in YYYY-MM-DD format")
+calculate_parser.add_argument("amount", type=float, help="Loan amount")
+calculate_parser.add_argument("currency", type=str, help="Currency code (e.g., USD)")
+calculate_parser.add_argument("base_rate", type=float, help="Base interest rate (%)")
+calculate_parser.add_argument("margin", type=float, help="Margin (%)")
+calculate_parser.add_argument("--exclude_weekends", action="store_true", help="Exclude weekends from calculation")
+calculate_parser.add_argument("--method", choices=["simple", "compound"], default="simple", help="Interest calculation method")
+calculate_parser.add_argument("--calendar", type=str, default=None, help="Holiday calendar (e.g. USD); only its business days accrue")
+calculate_parser.add_argument("--rate-curve", dest="rate_curve", type=str, default=None, help="Base rate curve (e.g. SOFR) that replaces base_rate from each fixing on")
+calculate_parser.add_argument("--rounding", choices=["daily", "total"], default=None, help="Accrue exactly in integer minor units, rounding each day's interest or only the total")
+calculate_parser.add_argument("--period", choices=["daily", "weekly", "monthly", "quarterly", "yearly"], default="daily", help="Aggregate accrual by calendar period")
+
+show_parser = argparse.ArgumentParser(prog="show")
+show_parser.add_argument("calculation_id", type=int, help="ID of the calculation to show")
+show_parser.add_argument("--page", type=int, default=1, help="Page to show when --limit is set (starting at 1)")
+show_parser.add_argument("--limit", type=int, default=None, help="Rows per page (default: stream every row)")
+show_parser.add_argument("--from-date", dest="from_date", type=str, default=None, help="First accrual date to show in YYYY-MM-DD format")
+show_parser.add_argument("--period", choices=["daily", "weekly", "monthly", "quarterly", "yearly"], default="daily", help="Aggregate accrual by calendar period")
+
+DEFAULT_LIST_LIMIT = 50
+
+list_parser = argparse.ArgumentParser(prog="list")
+list_parser.add_argument("--currency", type=str, default=None, help="Only this currency (e.g. USD)")
+list_parser.add_argument("--method", choices=["simple", "compound"], default=None, help="Only this interest calculation method")
+list_parser.add_argument("--start-from", dest="start_from", type=str, default=None, help="Earliest start date in YYYY-MM-DD format")
+list_parser.add_argument("--start-to", dest="start_to", type=str, default=None, help="Latest start date in YYYY-MM-DD format")
+list_parser.add_argument("--end-from", dest="end_from", type=str, default=None, help="Earliest end date in YYYY-MM-DD format")
+list_parser.add_argument("--end-to", dest="end_to", type=str, default=None, help="Latest end date in YYYY-MM-DD format")
+list_parser.add_argument("--min-amount", dest="min_amount", type=float, default=None, help="Smallest loan amount")
+list_parser.add_argument("--max-amount", dest="max_amount", type=float, default=None, help="Largest loan amount")
+list_parser.add_argument("--sort", choices=["id", "start_date", "end_date", "amount"], default="id", help="Sort field")
+list_parser.add_argument("--desc", action="store_true", help="Sort in descending order")
+list_parser.add_argument("--limit", type=int, default=DEFAULT_LIST_LIMIT, help=f"Rows to show (default: {DEFAULT_LIST_LIMIT})")
+list_parser.add_argument("--offset", type=int, default=0, help="Rows to skip")
+list_parser.add_argument("--cursor", type=str, default=None, help="Continue after the cursor printed by the previous page")
+
+update_parser = argparse.ArgumentParser(prog="update")
+update_parser.add_argument("calculation_id", type=int, help="ID of the calculation to update")
+update_parser.add_argument("start_date", type=str, help="Start date in YYYY-MM-DD format")
+update_parser.add_argument("end_date", type=str, help="End date in YYYY-MM-DD format")
+update_parser.add_argument("amount", type=float, help="Loan amount")
+update_parser.add_argument("currency", type=str, help="Currency code (e.g., USD)")
+update_parser.add_argument("base_rate", type=float, help="Base interest rate (%)")
+update_parser.add_argument("margin", type=float, help="Margin (%)")
+update_parser.add_argument("--exclude_weekends", action="store_true", help="Exclude weekends from calculation")
+update_parser.add_argument("--method", choices=["simple", "compound"], default="simple", help="Interest calculation method")
+update_parser.add_argument("--calendar", type=str, default=None, help="Holiday calendar (e.g. USD); only its business days accrue")
+update_parser.add_argument("--rate-curve", dest="rate_curve", type=str, default=None, help="Base rate curve (e.g. SOFR) that replaces base_rate from each fixing on")
+update_parser.add_argument("--rounding", choices=["daily", "total"], default=None, help="Accrue exactly in integer minor units, rounding each day's interest or only the total")
+update_parser.add_argument("--period", choices=["daily", "weekly", "monthly", "quarterly", "yearly"], default="daily", help="Aggregate accrual by calendar period")
+
+history_parser = argparse.ArgumentParser(prog="history")
+history_parser.add_argument("calculation_id", type=int, help="ID of the calculation to show history for")
+
+stats_parser = argparse.ArgumentParser(prog="stats")
+stats_parser.add_argument("--format", choices=["table", "json", "prometheus"], default="table", help="Output format")
+stats_parser.add_argument("--output", type=str, default=None, help="Write to this file instead (.json for JSON, Prometheus text otherwise)")
+stats_parser.add_argument("--reset", action="store_true", help="Clear the counters after reporting")
+
+summary_parser = argparse.ArgumentParser(prog="summary")
+summary_parser.add_argument("--by-method", dest="by_method", action="store_true", help="One row per currency and interest calculation method")
+summary_parser.add_argument("--check", action="store_true", help="Recompute every loan and report groups that differ from the maintained totals")
+summary_parser.add_argument("--rebuild", action="store_true", help="Recompute the totals from every loan before reporting")
+
+snapshot_parser = argparse.ArgumentParser(prog="snapshot")
+snapshot_parser.add_argument("path", type=str, help="File to write the calculations to")
+
+restore_parser = argparse.ArgumentParser(prog="restore")
+restore_parser.add_argument("path", type=str, help="Snapshot file written by the snapshot command")
+
+accrued_parser = argparse.ArgumentParser(prog="accrued")
+accrued_parser.add_argument("calculation_id", type=int, help="ID of the calculation to query")
+accrued_parser.add_argument("from_date", type=str, help="First accrual date in YYYY-MM-DD format (inclusive)")
+accrued_parser.add_argument("to_date", type=str, help="Last accrual date in YYYY-MM-DD format (inclusive)")
+
+def build_batch_parser() -> argparse.ArgumentParser:
+    from loan_calculator.batch import build_parser
+    parser = build_parser()
+    parser.prog = "batch"
+    return parser
+
+class LoanCommands:
+    """Command implementations shared by the interactive shell and one-shot runs.
+
+    Subclasses provide poutput, perror, pwarning and pfeedback.
+    """
+    audit_log = None
+    show_chunk_rows = 100
+
+    def run_calculate(self, args: argparse.Namespace) -> None:
+        from loan_calculator.calendars import CALENDAR_DIR_ENV, has_calendar
+        from loan_calculator.fixed_point import check_fixed_point
+        from loan_calculator.interest_calculations import parse_date
+        from loan_calculator.rate_curves import RATE_CURVE_DIR_ENV, has_rate_curve
         try:
             start_date = parse_date(args.start_date)
             end_date = parse_date(args.end_date)
             if end_date <= start_date:
                 self.perror("End date must be after start date.")
                 return
+            if args.calendar and not has_calendar(args.calendar):
+                self.perror(f"Unknown calendar: {args.calendar}. Put {args.calendar.upper()}.txt in ${CALENDAR_DIR_ENV}.")
+                return
+            if args.rate_curve and not has_rate_curve(args.rate_curve):
+                self.perror(f"Unknown rate curve: {args.rate_curve}. Put {args.rate_curve.upper()}.csv in ${RATE_CURVE_DIR_ENV}.")
+                return
 
             calc_data = CalculationData(
-                start_date=args.start_date,
-                end_date=args.end_date,
+                start_date=start_date.date().isoformat(),
+                end_date=end_date.date().isoformat(),
                 amount=args.amount,
                 currency=args.currency.upper(),
                 base_rate=args.base_rate,
                 margin=args.margin,
                 exclude_weekends=args.exclude_weekends,
-                method=args.method
+                method=args.method,
+                calendar=args.calendar.upper() if args.calendar else None,
+                rate_curve=args.rate_curve.upper() if args.rate_curve else None,
+                rounding=args.rounding
             )
+            if calc_data.rounding:
+                try:
+                    check_fixed_point(calc_data)
+                except ValueError as e:
+                    self.perror(str(e))
+                    return
 
             calc_id = save_calculation(calc_data)
             self.pfeedback(f"Calculation saved with ID: {calc_id}")
-            self.do_show(str(calc_id))
-            details = daily_interest_data(calc_data)
-            if not details:
-                self.pwarning("No interest calculated. Check your dates.")
-                return
+            self.run_show(show_parser.parse_args([str(calc_id), "--period", args.period]))
 
         except ValueError as ve:
             self.perror(f"Date format error: {ve}")
         except Exception as e:
-            logger.error(f"Error in calculate: {str(e)}")
+            _log_error(f"Error in calculate: {str(e)}")
             self.perror(f"An error occurred: {str(e)}")
 
-    show_parser = argparse.ArgumentParser()
-    show_parser.add_argument("calculation_id", type=int, help="ID of the calculation to show")
-
-    @cmd2.with_argparser(show_parser)
-    def do_show(self, args):
-        """Show calculation details by ID.
-
-        Usage:
-            show <calculation_id>
-        """
+    def run_show(self, args: argparse.Namespace) -> None:
+        from loan_calculator.interest_calculations import iter_daily_interest_data, count_calculation_days, total_interest, parse_date
         try:
             calc = get_calculation(args.calculation_id)
             if not calc:
                 self.perror("Calculation not found.")
                 return
+            if args.page < 1 or (args.limit is not None and args.limit < 1):
+                self.perror("Page and limit must be positive.")
+                return
 
-            details = daily_interest_data(calc)
-            if not details:
+            if args.period != "daily":
+                self._show_periods(calc, args)
+                return
+
+            first_date = parse_date(calc.start_date)
+            if args.from_date:
+                first_date = max(first_date, parse_date(args.from_date))
+            remaining = count_calculation_days(calc, first_date.toordinal(), parse_date(calc.end_date).toordinal())
+            if not remaining:
                 self.pwarning("No interest calculated. Check your dates.")
                 return
 
+            skip = 0
+            row_count = remaining
+            if args.limit is not None:
+                pages = -(-remaining // args.limit)
+                skip = (args.page - 1) * args.limit
+                if skip >= remaining:
+                    self.perror(f"Page {args.page} is out of range (1-{pages}).")
+                    return
+                row_count = min(args.limit, remaining - skip)
+
             headers = ["Accrual Date", "Daily Interest (No Margin)", "Daily Interest (With Margin)", "Days Elapsed"]
-            table = [
+            details = islice(iter_daily_interest_data(calc, args.from_date, skip), row_count)
+            chunks = (
                 [
-                    d["Accrual Date"],
-                    f"{d['Daily Interest (No Margin)']:.2f}",
-                    f"{d['Daily Interest (With Margin)']:.2f}",
-                    d["Days Elapsed"]
-                ] for d in details
-            ]
+                    [
+                        d["Accrual Date"],
+                        f"{d['Daily Interest (No Margin)']:.2f}",
+                        f"{d['Daily Interest (With Margin)']:.2f}",
+                        d["Days Elapsed"]
+                    ] for d in chunk
+                ]
+                for chunk in iter(lambda: list(islice(details, self.show_chunk_rows)), [])
+            )
+            for text in _render_chunks(chunks, headers):
+                self.poutput(text)
 
-            self.poutput(tabulate(table, headers, tablefmt="fancy_grid"))
+            if args.limit is not None:
+                self.poutput(f"Page {args.page} of {pages}")
             total = total_interest(calc)
             self.poutput(f"\nTotal Interest: {total:.2f} {calc.currency}")
 
         except Exception as e:
-            logger.error(f"Error in show: {str(e)}")
+            _log_error(f"Error in show: {str(e)}")
             self.perror(f"An error occurred: {str(e)}")
 
-    def do_list(self, args):
-        """List all saved calculations."""
+    def _show_periods(self, calc: CalculationData, args: argparse.Namespace) -> None:
+        from loan_calculator.interest_calculations import total_interest
+        from loan_calculator.periods import period_breakdown
+        periods = period_breakdown(calc, args.period, args.from_date)
+        if not len(periods):
+            self.pwarning("No interest calculated. Check your dates.")
+            return
+
+        rows = periods.to_dicts()
+        if args.limit is not None:
+            pages = -(-len(rows) // args.limit)
+            if args.page > pages:
+                self.perror(f"Page {args.page} is out of range (1-{pages}).")
+                return
+            rows = rows[(args.page - 1) * args.limit:args.page * args.limit]
+
+        headers = ["Period Start", "Period End", "Days", "Interest (No Margin)", "Interest (With Margin)"]
+        chunks = (
+            [
+                [
+                    p["Period Start"],
+                    p["Period End"],
+                    p["Days"],
+                    f"{p['Interest (No Margin)']:.2f}",
+                    f"{p['Interest (With Margin)']:.2f}"
+                ] for p in rows[offset:offset + self.show_chunk_rows]
+            ]
+            for offset in range(0, len(rows), self.show_chunk_rows)
+        )
+        for text in _render_chunks(chunks, headers):
+            self.poutput(text)
+
+        if args.limit is not None:
+            self.poutput(f"Page {args.page} of {pages}")
+        total = total_interest(calc)
+        self.poutput(f"\nTotal Interest: {total:.2f} {calc.currency}")
+
+    def run_list(self, args: argparse.Namespace) -> None:
+        from loan_calculator.dates import parse_ordinal
+        from loan_calculator.interest_calculations import total_interest
         try:
-            all_calcs = list_calculations()
-            if not all_calcs:
+            for date_arg in (args.start_from, args.start_to, args.end_from, args.end_to):
+                if date_arg is not None:
+                    parse_ordinal(date_arg)
+            page = query_calculations(ListQuery(
+                currency=args.currency.upper() if args.currency else None,
+                method=args.method,
+                start_from=args.start_from,
+                start_to=args.start_to,
+                end_from=args.end_from,
+                end_to=args.end_to,
+                min_amount=args.min_amount,
+                max_amount=args.max_amount,
+                sort=args.sort,
+                descending=args.desc,
+                limit=args.limit,
+                offset=args.offset,
+                cursor=args.cursor
+            ))
+            if not page.items:
                 self.perror("No calculations found.")
                 return
 
-            headers = ["ID", "Start Date", "End Date", "Amount", "Currency", "Base Rate (%)", "Margin (%)", "Exclude Weekends", "Method"]
+            headers = ["ID", "Start Date", "End Date", "Amount", "Currency", "Base Rate (%)", "Margin (%)", "Exclude Weekends", "Calendar", "Rate Curve", "Rounding", "Method", "Total Interest"]
             table = [
                 [
                     cid,
@@ -119,41 +315,41 @@ class LoanCalculator(cmd2.Cmd):
                     f"{calc.base_rate:.2f}",
                     f"{calc.margin:.2f}",
                     calc.exclude_weekends,
-                    calc.method.capitalize()
-                ] for cid, calc in all_calcs
+                    calc.calendar or "",
+                    calc.rate_curve or "",
+                    calc.rounding or "",
+                    calc.method.capitalize(),
+                    f"{total_interest(calc):.2f}"
+                ] for cid, calc in page.items
             ]
-            self.poutput(tabulate(table, headers, tablefmt="fancy_grid"))
+            self.poutput(_render_table(table, headers))
+            self.poutput(f"Showing {len(page.items)} of {page.total} calculations.")
+            if page.next_cursor:
+                self.poutput(f"Next page: list --cursor {page.next_cursor}")
 
+        except ValueError as ve:
+            self.perror(str(ve))
         except Exception as e:
-            logger.error(f"Error in list: {str(e)}")
+            _log_error(f"Error in list: {str(e)}")
             self.perror(f"An error occurred: {str(e)}")
 
-    update_parser = argparse.ArgumentParser()
-    update_parser.add_argument("calculation_id", type=int, help="ID of the calculation to update")
-    update_parser.add_argument("start_date", type=str, help="Start date in YYYY-MM-DD format")
-    update_parser.add_argument("end_date", type=str, help="End date in YYYY-MM-DD format")
-    update_parser.add_argument("amount", type=float, help="Loan amount")
-    update_parser.add_argument("currency", type=str, help="Currency code (e.g., USD)")
-    update_parser.add_argument("base_rate", type=float, help="Base interest rate (%)")
-    update_parser.add_argument("margin", type=float, help="Margin (%)")
-    update_parser.add_argument("--exclude_weekends", action="store_true", help="Exclude weekends from calculation")
-    update_parser.add_argument("--method", choices=["simple", "compound"], default="simple", help="Interest calculation method")
-
-    @cmd2.with_argparser(update_parser)
-    def do_update(self, args):
-        """Update an existing calculation with parameters:
-        
-        calculation_id start_date end_date amount currency base_rate margin [--exclude_weekends] [--method {simple,compound}]
-        
-        Example:
-            update 1 2024-01-01 2024-02-01 10000 USD 5.0 2.0 --exclude_weekends --method compound
-        """
+    def run_update(self, args: argparse.Namespace) -> None:
+        from loan_calculator.calendars import CALENDAR_DIR_ENV, has_calendar
+        from loan_calculator.fixed_point import check_fixed_point
+        from loan_calculator.interest_calculations import parse_date
+        from loan_calculator.rate_curves import RATE_CURVE_DIR_ENV, has_rate_curve
         try:
             start_date = parse_date(args.start_date)
             end_date = parse_date(args.end_date)
             if end_date <= start_date:
                 self.perror("End date must be after start date.")
                 return
+            if args.calendar and not has_calendar(args.calendar):
+                self.perror(f"Unknown calendar: {args.calendar}. Put {args.calendar.upper()}.txt in ${CALENDAR_DIR_ENV}.")
+                return
+            if args.rate_curve and not has_rate_curve(args.rate_curve):
+                self.perror(f"Unknown rate curve: {args.rate_curve}. Put {args.rate_curve.upper()}.csv in ${RATE_CURVE_DIR_ENV}.")
+                return
 
             existing_calc = get_calculation(args.calculation_id)
             if not existing_calc:
@@ -161,50 +357,301 @@ class LoanCalculator(cmd2.Cmd):
                 return
 
             updated_calc = CalculationData(
-                start_date=args.start_date,
-                end_date=args.end_date,
+                start_date=start_date.date().isoformat(),
+                end_date=end_date.date().isoformat(),
                 amount=args.amount,
                 currency=args.currency.upper(),
                 base_rate=args.base_rate,
                 margin=args.margin,
                 exclude_weekends=args.exclude_weekends,
-                method=args.method
+                method=args.method,
+                calendar=args.calendar.upper() if args.calendar else None,
+                rate_curve=args.rate_curve.upper() if args.rate_curve else None,
+                rounding=args.rounding
             )
+            if updated_calc.rounding:
+                try:
+                    check_fixed_point(updated_calc)
+                except ValueError as e:
+                    self.perror(str(e))
+                    return
 
             save_calculation(updated_calc, args.calculation_id)
             self.pfeedback(f"Calculation with ID {args.calculation_id} updated.")
-            self.do_show(str(args.calculation_id))
-            details = daily_interest_data(updated_calc)
-            if not details:
-                self.pwarning("No interest calculated. Check your dates.")
+            self.run_show(show_parser.parse_args([str(args.calculation_id), "--period", args.period]))
+
+        except ValueError as ve:
+            self.perror(f"Date format error: {ve}")
+        except Exception as e:
+            _log_error(f"Error in update: {str(e)}")
+            self.perror(f"An error occurred: {str(e)}")
+
+    def run_accrued(self, args: argparse.Namespace) -> None:
+        from loan_calculator.accrual_index import accrual_index
+        from loan_calculator.interest_calculations import parse_date
+        try:
+            calc = get_calculation(args.calculation_id)
+            if not calc:
+                self.perror("Calculation not found.")
                 return
+            if parse_date(args.to_date) < parse_date(args.from_date):
+                self.perror("End date must not be before start date.")
+                return
+
+            index = accrual_index(calc)
+            days = int(index.days_between_many([args.from_date], [args.to_date])[0])
+            base_total = index.between(args.from_date, args.to_date, with_margin=False)
+            total = index.between(args.from_date, args.to_date)
+            self.poutput(f"Accrued from {args.from_date} to {args.to_date} ({days} days):")
+            self.poutput(f"  Interest (No Margin):   {base_total:.2f} {calc.currency}")
+            self.poutput(f"  Interest (With Margin): {total:.2f} {calc.currency}")
 
         except ValueError as ve:
             self.perror(f"Date format error: {ve}")
         except Exception as e:
-            logger.error(f"Error in update: {str(e)}")
+            _log_error(f"Error in accrued: {str(e)}")
             self.perror(f"An error occurred: {str(e)}")
 
-    def do_quit(self, args):
-        """Quit the application."""
-        self.poutput("Thank you for using the Loan Calculator. Goodbye!")
-        return True
+    def run_history(self, args: argparse.Namespace) -> None:
+        try:
+            if self.audit_log is None:
+                self.perror("Audit log is not enabled. Set LOAN_CALCULATOR_AUDIT_LOG to a file path.")
+                return
 
-    do_exit = do_quit
+            records = self.audit_log.history(args.calculation_id)
+            if not records:
+                self.perror("No history found for this calculation.")
+                return
 
-    def do_help(self, args):
-        """Provide detailed help with examples."""
-        if args:
-            super().do_help(args)
-        else:
-            self.poutput("Loan Calculator Commands:\n")
-            self.poutput("  calculate    Calculate loan interest with specified parameters.")
-            self.poutput("  show         Show details of a specific calculation by ID.")
-            self.poutput("  list         List all saved calculations.")
-            self.poutput("  update       Update an existing calculation.")
-            self.poutput("  quit/exit    Exit the application.\n")
-            self.poutput("Type 'help <command>' for more details on each command.")
+            headers = ["Seq", "Recorded At", "Change", "Start Date", "End Date", "Amount", "Currency", "Base Rate (%)", "Margin (%)", "Exclude Weekends", "Calendar", "Rate Curve", "Rounding", "Method"]
+            table = [
+                [
+                    record.seq,
+                    datetime.fromtimestamp(record.timestamp).strftime("%Y-%m-%d %H:%M:%S"),
+                    record.op.capitalize(),
+                    record.calculation.start_date,
+                    record.calculation.end_date,
+                    f"{record.calculation.amount:.2f}",
+                    record.calculation.currency,
+                    f"{record.calculation.base_rate:.2f}",
+                    f"{record.calculation.margin:.2f}",
+                    record.calculation.exclude_weekends,
+                    record.calculation.calendar or "",
+                    record.calculation.rate_curve or "",
+                    record.calculation.rounding or "",
+                    record.calculation.method.capitalize()
+                ] for record in records
+            ]
+            self.poutput(_render_table(table, headers))
+
+        except Exception as e:
+            _log_error(f"Error in history: {str(e)}")
+            self.perror(f"An error occurred: {str(e)}")
+
+    def run_batch(self, args: argparse.Namespace) -> None:
+        from loan_calculator.batch import run_batch_file
+        try:
+            processed, failed = run_batch_file(args.input, args.output, args.workers, args.chunk_size, args.schedules)
+            self.pfeedback(f"Processed {processed} rows ({failed} invalid) into {args.output}")
+            if failed:
+                self.pwarning(f"{failed} rows failed validation; see the error column in {args.output}.")
+
+        except Exception as e:
+            _log_error(f"Error in batch: {str(e)}")
+            self.perror(f"An error occurred: {str(e)}")
+
+    def run_stats(self, args: argparse.Namespace) -> None:
+        from loan_calculator.metrics import to_dict, to_json, to_prometheus
+        try:
+            if args.output:
+                write_metrics(args.output)
+                self.pfeedback(f"Metrics written to {args.output}")
+            elif args.format == "json":
+                self.poutput(to_json())
+            elif args.format == "prometheus":
+                self.poutput(to_prometheus().rstrip("\n"))
+            else:
+                report = to_dict()
+                if report["operations"]:
+                    headers = ["Operation", "Calls", "Errors", "Rows", "Mean (ms)", "p50 (ms)", "p95 (ms)", "p99 (ms)"]
+                    table = [
+                        [
+                            name,
+                            stats["calls"],
+                            stats["errors"],
+                            stats["rows"],
+                            f"{stats['mean_seconds'] * 1000:.3f}",
+                            f"{stats['p50_seconds'] * 1000:.3f}",
+                            f"{stats['p95_seconds'] * 1000:.3f}",
+                            f"{stats['p99_seconds'] * 1000:.3f}"
+                        ] for name, stats in report["operations"].items()
+                    ]
+                    self.poutput(_render_table(table, headers))
+                else:
+                    self.pwarning("No operations recorded yet.")
+                cache = report["cache"]
+                self.poutput(
+                    f"Cache: {cache['hits']} hits, {cache['misses']} misses ({cache['hit_ratio']:.1%} hit ratio), "
+                    f"{cache['entries']} entries, {cache['bytes'] / 1024 / 1024:.1f} of {cache['max_bytes'] / 1024 / 1024:.0f} MiB"
+                )
+            if args.reset:
+                metrics.reset()
+
+        except Exception as e:
+            _log_error(f"Error in stats: {str(e)}")
+            self.perror(f"An error occurred: {str(e)}")
+
+    def run_summary(self, args: argparse.Namespace) -> None:
+        from loan_calculator.aggregates import check_aggregates, portfolio_summary, rebuild_aggregates
+        try:
+            if args.rebuild:
+                rebuild_aggregates()
+            if args.check:
+                mismatches = check_aggregates()
+                for mismatch in mismatches:
+                    self.perror(
+                        f"{mismatch.currency} {mismatch.method}: maintained (loans, amount, interest) {mismatch.maintained}, "
+                        f"recomputed {mismatch.rebuilt}"
+                    )
+                if not mismatches:
+                    self.pfeedback("Aggregates match a full recomputation.")
+            rows = portfolio_summary(args.by_method)
+            if not rows:
+                self.pwarning("No calculations found.")
+                return
+            headers = ["Currency", *(["Method"] if args.by_method else []), "Loans", "Total Amount", "Total Interest"]
+            table = [
+                [
+                    row.currency,
+                    *([row.method.capitalize()] if args.by_method else []),
+                    row.loans,
+                    f"{row.amount:.2f}",
+                    f"{row.interest:.2f}"
+                ] for row in rows
+            ]
+            self.poutput(_render_table(table, headers))
+
+        except Exception as e:
+            _log_error(f"Error in summary: {str(e)}")
+            self.perror(f"An error occurred: {str(e)}")
+
+    def run_snapshot(self, args: argparse.Namespace) -> None:
+        from loan_calculator.snapshot import write_snapshot
+        try:
+            count = write_snapshot(args.path, get_store())
+            self.pfeedback(f"Saved {count} calculations to {args.path}")
+
+        except Exception as e:
+            _log_error(f"Error in snapshot: {str(e)}")
+            self.perror(f"An error occurred: {str(e)}")
+
+    def run_restore(self, args: argparse.Namespace) -> None:
+        from loan_calculator.snapshot import SnapshotStore
+        try:
+            if not isinstance(get_store(), (MemoryStore, ShardedMemoryStore, SnapshotStore)):
+                self.perror("Restore replaces the in-memory store; unset LOAN_CALCULATOR_DB to use it.")
+                return
+            store = SnapshotStore(args.path)
+            use_store(store)
+            self.pfeedback(f"Restored {len(store)} calculations from {args.path}")
+
+        except Exception as e:
+            _log_error(f"Error in restore: {str(e)}")
+            self.perror(f"An error occurred: {str(e)}")
+
+class OneShotCommands(LoanCommands):
+    def __init__(self, stdout=None, stderr=None):
+        self.stdout = stdout or sys.stdout
+        self.stderr = stderr or sys.stderr
+        self.failed = False
+
+    def poutput(self, msg: str = "") -> None:
+        print(msg, file=self.stdout)
+
+    def pfeedback(self, msg: str) -> None:
+        print(msg, file=self.stderr)
+
+    def pwarning(self, msg: str) -> None:
+        print(msg, file=self.stderr)
+
+    def perror(self, msg: str) -> None:
+        print(msg, file=self.stderr)
+        self.failed = True
+
+COMMANDS: Dict[str, Tuple[Callable[[], argparse.ArgumentParser], Callable[[LoanCommands, argparse.Namespace], None]]] = {
+    "calculate": (lambda: calculate_parser, LoanCommands.run_calculate),
+    "show": (lambda: show_parser, LoanCommands.run_show),
+    "list": (lambda: list_parser, LoanCommands.run_list),
+    "update": (lambda: update_parser, LoanCommands.run_update),
+    "accrued": (lambda: accrued_parser, LoanCommands.run_accrued),
+    "history": (lambda: history_parser, LoanCommands.run_history),
+    "batch": (build_batch_parser, LoanCommands.run_batch),
+    "stats": (lambda: stats_parser, LoanCommands.run_stats),
+    "summary": (lambda: summary_parser, LoanCommands.run_summary),
+    "snapshot": (lambda: snapshot_parser, LoanCommands.run_snapshot),
+    "restore": (lambda: restore_parser, LoanCommands.run_restore),
+}
+
+def configure_from_env() -> None:
+    if os.environ.get("LOAN_CALCULATOR_DB"):
+        from loan_calculator.sqlite_store import SQLiteStore
+        use_store(SQLiteStore(os.environ["LOAN_CALCULATOR_DB"]))
+
+    if os.environ.get("LOAN_CALCULATOR_AUDIT_LOG"):
+        from loan_calculator.audit_log import AuditLog, restore_store
+        LoanCommands.audit_log = AuditLog(os.environ["LOAN_CALCULATOR_AUDIT_LOG"])
+        # A database already persists its rows; only the memory store needs replay.
+        if isinstance(get_store(), (MemoryStore, ShardedMemoryStore)):
+            restore_store(LoanCommands.audit_log, get_store())
+        add_save_hook(LoanCommands.audit_log.append)
+        atexit.register(LoanCommands.audit_log.close)
+
+    if os.environ.get(METRICS_FILE_ENV):
+        atexit.register(write_metrics, os.environ[METRICS_FILE_ENV])
+
+def run_command(argv: Sequence[str], stdout=None, stderr=None) -> int:
+    name, *rest = argv
+    if name not in COMMANDS:
+        print(f"Unknown command: {name}. Available commands: {', '.join(COMMANDS)}", file=stderr or sys.stderr)
+        return 2
+    build_parser, command = COMMANDS[name]
+    try:
+        args = build_parser().parse_args(rest)
+    except SystemExit as e:
+        return e.code or 0
+    runner = OneShotCommands(stdout, stderr)
+    command(runner, args)
+    return 1 if runner.failed else 0
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Run one command and exit, or start the interactive shell when none is given."""
+    argv = sys.argv[1:] if argv is None else list(argv)
+    configure_from_env()
+    if argv and argv[0].startswith("--profile"):
+        # --profile[=PATH] runs the rest under cProfile and saves the stats.
+        _, _, path = argv.pop(0).partition("=")
+        return _profiled(path or DEFAULT_PROFILE_PATH, argv)
+    return _run(argv)
+
+def _run(argv: List[str]) -> int:
+    if argv:
+        return run_command(argv)
+
+    from loan_calculator.repl import LoanCalculator
+    LoanCalculator().cmdloop()
+    return 0
 
+def _profiled(path: str, argv: List[str]) -> int:
+    import cProfile
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(_run, argv)
+    finally:
+        profiler.dump_stats(path)
+        print(f"Profile written to {path}; inspect it with: python -m pstats {path}", file=sys.stderr)
 
-app = LoanCalculator()
-app.cmdloop()
\ No newline at end of file
+if __name__ == "__main__":
+    # Dispatch through the package module so the shell and this entry point
+    # share one LoanCommands class, and with it the configured audit log.
+    from loan_calculator.main import main as package_main
+    sys.exit(package_main())
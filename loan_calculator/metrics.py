@@ -0,0 +1,185 @@
+import json
+import time
+from bisect import bisect_left
+from dataclasses import dataclass
+from functools import wraps
+from inspect import isgeneratorfunction
+from threading import Lock
+from typing import Any, Callable, Dict, Iterator, List
+from loan_calculator.cache import result_cache
+
+# Latency buckets double from 1 microsecond to about 67 seconds.
+LATENCY_BUCKETS = tuple(1e-6 * 2 ** i for i in range(27))
+METRICS_FILE_ENV = "LOAN_CALCULATOR_METRICS_FILE"
+PREFIX = "loan_calculator"
+
+@dataclass
+class OperationStats:
+    calls: int = 0
+    errors: int = 0
+    rows: int = 0
+    seconds: float = 0.0
+    # Observations per LATENCY_BUCKETS entry, plus one for anything slower.
+    buckets: List[int] | None = None
+
+    def __post_init__(self):
+        if self.buckets is None:
+            self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    @property
+    def mean(self) -> float:
+        return self.seconds / self.calls if self.calls else 0.0
+
+    def quantile(self, q: float) -> float:
+        # Upper bound of the bucket holding the q-th observation, so the
+        # estimate is never below the true value.
+        if not self.calls:
+            return 0.0
+        rank = q * self.calls
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+class Metrics:
+    def __init__(self):
+        self._operations: Dict[str, OperationStats] = {}
+        self._lock = Lock()
+
+    def observe(self, name: str, seconds: float, rows: int = 0, error: bool = False) -> None:
+        with self._lock:
+            stats = self._operations.get(name)
+            if stats is None:
+                stats = self._operations[name] = OperationStats()
+            stats.calls += 1
+            stats.errors += error
+            stats.rows += rows
+            stats.seconds += seconds
+            stats.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    def snapshot(self) -> Dict[str, OperationStats]:
+        with self._lock:
+            return {
+                name: OperationStats(stats.calls, stats.errors, stats.rows, stats.seconds, list(stats.buckets))
+                for name, stats in sorted(self._operations.items())
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._operations.clear()
+
+metrics = Metrics()
+
+def timed(name: str, rows: Callable[[Any], int] | None = None, registry: Metrics = metrics) -> Callable:
+    # Records calls, latency and errors of the wrapped function under `name`;
+    # `rows` maps a result to the rows it produced. Generators are timed
+    # across all their steps and count the rows they yield.
+    def decorator(func: Callable) -> Callable:
+        if isgeneratorfunction(func):
+            @wraps(func)
+            def generator_wrapper(*args: Any, **kwargs: Any) -> Iterator[Any]:
+                elapsed = 0.0
+                produced = 0
+                failed = False
+                iterator = func(*args, **kwargs)
+                try:
+                    while True:
+                        started = time.perf_counter()
+                        try:
+                            item = next(iterator)
+                        except StopIteration:
+                            return
+                        finally:
+                            elapsed += time.perf_counter() - started
+                        produced += 1
+                        yield item
+                except Exception:
+                    failed = True
+                    raise
+                finally:
+                    iterator.close()
+                    registry.observe(name, elapsed, produced, failed)
+            return generator_wrapper
+
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                registry.observe(name, time.perf_counter() - started, error=True)
+                raise
+            registry.observe(name, time.perf_counter() - started, rows(result) if rows else 0)
+            return result
+        return wrapper
+
+    return decorator
+
+def _cache_stats() -> Dict[str, float]:
+    stats = result_cache.stats()
+    return {
+        "hits": stats.hits,
+        "misses": stats.misses,
+        "hit_ratio": stats.hit_ratio,
+        "evictions": stats.evictions,
+        "invalidations": stats.invalidations,
+        "entries": stats.entries,
+        "bytes": stats.current_bytes,
+        "max_bytes": stats.max_bytes,
+    }
+
+def to_dict(registry: Metrics = metrics) -> Dict[str, Any]:
+    return {
+        "operations": {
+            name: {
+                "calls": stats.calls,
+                "errors": stats.errors,
+                "rows": stats.rows,
+                "seconds": stats.seconds,
+                "mean_seconds": stats.mean,
+                "p50_seconds": stats.quantile(0.5),
+                "p95_seconds": stats.quantile(0.95),
+                "p99_seconds": stats.quantile(0.99),
+                "buckets": dict(zip([*map(str, LATENCY_BUCKETS), "+Inf"], stats.buckets)),
+            }
+            for name, stats in registry.snapshot().items()
+        },
+        "cache": _cache_stats(),
+    }
+
+def to_json(registry: Metrics = metrics) -> str:
+    return json.dumps(to_dict(registry), indent=2)
+
+def to_prometheus(registry: Metrics = metrics) -> str:
+    operations = registry.snapshot()
+    lines = [
+        f"# HELP {PREFIX}_calls_total Calls per operation.",
+        f"# TYPE {PREFIX}_calls_total counter",
+    ]
+    lines += [f'{PREFIX}_calls_total{{operation="{name}"}} {stats.calls}' for name, stats in operations.items()]
+    lines += [f"# HELP {PREFIX}_errors_total Calls that raised.", f"# TYPE {PREFIX}_errors_total counter"]
+    lines += [f'{PREFIX}_errors_total{{operation="{name}"}} {stats.errors}' for name, stats in operations.items()]
+    lines += [f"# HELP {PREFIX}_rows_total Rows produced.", f"# TYPE {PREFIX}_rows_total counter"]
+    lines += [f'{PREFIX}_rows_total{{operation="{name}"}} {stats.rows}' for name, stats in operations.items()]
+    lines += [f"# HELP {PREFIX}_latency_seconds Call latency.", f"# TYPE {PREFIX}_latency_seconds histogram"]
+    for name, stats in operations.items():
+        cumulative = 0
+        for bound, count in zip([*map(repr, LATENCY_BUCKETS), "+Inf"], stats.buckets):
+            cumulative += count
+            lines.append(f'{PREFIX}_latency_seconds_bucket{{operation="{name}",le="{bound}"}} {cumulative}')
+        lines.append(f'{PREFIX}_latency_seconds_sum{{operation="{name}"}} {stats.seconds!r}')
+        lines.append(f'{PREFIX}_latency_seconds_count{{operation="{name}"}} {stats.calls}')
+    cache = _cache_stats()
+    for key in ("hits", "misses", "evictions", "invalidations"):
+        lines += [f"# TYPE {PREFIX}_cache_{key}_total counter", f"{PREFIX}_cache_{key}_total {cache[key]}"]
+    for key in ("hit_ratio", "entries", "bytes", "max_bytes"):
+        lines += [f"# TYPE {PREFIX}_cache_{key} gauge", f"{PREFIX}_cache_{key} {cache[key]}"]
+    return "\n".join(lines) + "\n"
+
+def write_metrics(path: str, registry: Metrics = metrics) -> None:
+    # JSON for .json files, Prometheus text exposition format otherwise.
+    text = to_json(registry) if path.endswith(".json") else to_prometheus(registry)
+    with open(path, "w") as target:
+        target.write(text)
@@ -0,0 +1,87 @@
+from dataclasses import dataclass
+from typing import Dict, List
+import numpy as np
+from loan_calculator.cache import cached
+from loan_calculator.data_store import CalculationData
+from loan_calculator.dates import EPOCH_ORDINAL, epoch_day, iso_dates
+from loan_calculator.interest_calculations import cumulative_interest, included_days_before
+
+PERIODS = ("daily", "weekly", "monthly", "quarterly", "yearly")
+
+@dataclass(frozen=True)
+class PeriodColumns:
+    starts: np.ndarray
+    ends: np.ndarray
+    days: np.ndarray
+    base_interest: np.ndarray
+    margin_interest: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def to_dicts(self) -> List[Dict[str, str | float]]:
+        return [
+            {
+                "Period Start": period_start,
+                "Period End": period_end,
+                "Days": days_counted,
+                "Interest (No Margin)": base_total,
+                "Interest (With Margin)": margin_total
+            }
+            for period_start, period_end, days_counted, base_total, margin_total in zip(
+                iso_dates((self.starts.astype(np.int64) + EPOCH_ORDINAL).tolist()),
+                iso_dates((self.ends.astype(np.int64) + EPOCH_ORDINAL).tolist()),
+                self.days.tolist(),
+                self.base_interest.tolist(),
+                self.margin_interest.tolist(),
+            )
+        ]
+
+def period_starts(first_day: np.datetime64, last_day: np.datetime64, period: str) -> np.ndarray:
+    if period == "daily":
+        starts = np.arange(first_day, last_day + 1)
+    elif period == "weekly":
+        monday = first_day - (first_day.astype(np.int64) + 3) % 7
+        starts = np.arange(monday, last_day + 1, 7)
+    elif period == "monthly":
+        months = np.arange(first_day.astype("datetime64[M]"), last_day.astype("datetime64[M]") + 1)
+        starts = months.astype("datetime64[D]")
+    elif period == "quarterly":
+        first_month = first_day.astype("datetime64[M]")
+        first_month -= first_month.astype(np.int64) % 3
+        starts = np.arange(first_month, last_day.astype("datetime64[M]") + 1, 3).astype("datetime64[D]")
+    elif period == "yearly":
+        years = np.arange(first_day.astype("datetime64[Y]"), last_day.astype("datetime64[Y]") + 1)
+        starts = years.astype("datetime64[D]")
+    else:
+        raise ValueError(f"Unknown period: {period}")
+    starts = starts.astype("datetime64[D]")
+    if len(starts):
+        starts[0] = first_day
+    return starts
+
+@cached()
+def period_breakdown(
+    calc_data: CalculationData, period: str = "monthly", from_date: str | None = None
+) -> PeriodColumns:
+    first_day = np.datetime64(epoch_day(calc_data.start_date), "D")
+    last_day = np.datetime64(epoch_day(calc_data.end_date), "D")
+    if from_date is not None:
+        first_day = max(first_day, np.datetime64(epoch_day(from_date), "D"))
+    starts = period_starts(first_day, last_day, period)
+    ends = np.append(starts[1:] - 1, last_day) if len(starts) else starts
+
+    # One boundary per period plus the day after the loan ends; everything
+    # below is a difference of cumulative values at those boundaries.
+    boundaries = included_days_before(calc_data, np.append(starts, last_day + 1))
+    days = np.diff(boundaries)
+    keep = days > 0
+    base_cumulative = cumulative_interest(calc_data, boundaries, with_margin=False)
+    margin_cumulative = cumulative_interest(calc_data, boundaries, with_margin=True)
+    return PeriodColumns(
+        starts=starts[keep],
+        ends=ends[keep],
+        days=days[keep],
+        base_interest=np.diff(base_cumulative)[keep],
+        margin_interest=np.diff(margin_cumulative)[keep],
+    )
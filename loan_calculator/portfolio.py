@@ -0,0 +1,435 @@
+from dataclasses import dataclass, replace
+from typing import Iterable, Iterator, List, Tuple
+import numpy as np
+from loan_calculator.calendars import get_calendar
+from loan_calculator.data_store import CalculationData
+from loan_calculator.interest_calculations import (
+    InterestColumns,
+    ScheduleProfile,
+    UnitSchedule,
+    closed_form_interest,
+    closed_form_totals,
+    daily_interest_columns,
+    freeze_unit_schedule,
+    unit_schedule,
+)
+from loan_calculator.rate_curves import RateCurve, get_rate_curve
+
+METHODS = ("simple", "compound")
+
+@dataclass(frozen=True)
+class PortfolioArrays:
+    start_dates: np.ndarray
+    end_dates: np.ndarray
+    amounts: np.ndarray
+    base_rates: np.ndarray
+    margins: np.ndarray
+    exclude_weekends: np.ndarray
+    methods: np.ndarray
+    ids: np.ndarray | None = None
+    # Holiday calendar name per loan, "" for none; None when no loan has one.
+    calendars: np.ndarray | None = None
+    # Rate curve name per loan, "" for a fixed base rate; None when no loan has one.
+    rate_curves: np.ndarray | None = None
+    currencies: np.ndarray | None = None
+    # Fixed-point rounding per loan, "" for floats; None when no loan has one.
+    roundings: np.ndarray | None = None
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+def portfolio_from_calculations(
+    calcs: Iterable[CalculationData | Tuple[int, CalculationData]]
+) -> PortfolioArrays:
+    ids: List[int] = []
+    loans: List[CalculationData] = []
+    for item in calcs:
+        if isinstance(item, CalculationData):
+            loans.append(item)
+        else:
+            calc_id, calc = item
+            ids.append(calc_id)
+            loans.append(calc)
+    if ids and len(ids) != len(loans):
+        raise ValueError("Cannot mix (id, calculation) pairs with bare calculations")
+
+    return PortfolioArrays(
+        start_dates=np.array([c.start_date for c in loans], dtype="datetime64[D]"),
+        end_dates=np.array([c.end_date for c in loans], dtype="datetime64[D]"),
+        amounts=np.array([c.amount for c in loans], dtype=np.float64),
+        base_rates=np.array([c.base_rate for c in loans], dtype=np.float64),
+        margins=np.array([c.margin for c in loans], dtype=np.float64),
+        exclude_weekends=np.array([c.exclude_weekends for c in loans], dtype=bool),
+        methods=np.array([c.method for c in loans], dtype=str),
+        ids=np.array(ids, dtype=np.int64) if ids else None,
+        calendars=np.array([c.calendar or "" for c in loans], dtype=str) if any(c.calendar for c in loans) else None,
+        rate_curves=np.array([c.rate_curve or "" for c in loans], dtype=str) if any(c.rate_curve for c in loans) else None,
+        currencies=np.array([c.currency for c in loans], dtype=str),
+        roundings=np.array([c.rounding or "" for c in loans], dtype=str) if any(c.rounding for c in loans) else None,
+    )
+
+def _as_portfolio(
+    loans: PortfolioArrays | Iterable[CalculationData | Tuple[int, CalculationData]]
+) -> PortfolioArrays:
+    if isinstance(loans, PortfolioArrays):
+        return loans
+    return portfolio_from_calculations(loans)
+
+def _weekdays_before(day_index: np.ndarray) -> np.ndarray:
+    return (day_index // 7) * 5 + np.minimum(day_index % 7, 5)
+
+def included_days(portfolio: PortfolioArrays) -> np.ndarray:
+    starts = portfolio.start_dates.astype(np.int64)
+    ends = portfolio.end_dates.astype(np.int64)
+    total_days = np.maximum(ends - starts + 1, 0)
+    # 1970-01-01 was a Thursday, so shifting by 3 gives Monday == 0.
+    first = (starts + 3) % 7
+    weekdays = _weekdays_before(first + total_days) - _weekdays_before(first)
+    days = np.where(portfolio.exclude_weekends, weekdays, total_days)
+    for name, members in _calendar_groups(portfolio):
+        days[members] = get_calendar(name).business_days_between(starts[members], ends[members])
+    return days
+
+def _name_groups(names: np.ndarray | None) -> Iterator[Tuple[str, np.ndarray]]:
+    if names is None:
+        return
+    for name in np.unique(names):
+        if name:
+            yield str(name), np.flatnonzero(names == name)
+
+def _calendar_groups(portfolio: PortfolioArrays) -> Iterator[Tuple[str, np.ndarray]]:
+    return _name_groups(portfolio.calendars)
+
+def _rate_curve_groups(portfolio: PortfolioArrays) -> Iterator[Tuple[str, np.ndarray]]:
+    return _name_groups(portfolio.rate_curves)
+
+def _optional_name(names: np.ndarray | None, loan: int) -> str | None:
+    return str(names[loan]) or None if names is not None else None
+
+def _fixed_point_loans(portfolio: PortfolioArrays) -> Iterator[Tuple[int, CalculationData]]:
+    # Loans on the exact minor-unit engine are priced one by one through it.
+    if portfolio.roundings is None:
+        return
+    for loan in np.flatnonzero(portfolio.roundings != "").tolist():
+        yield loan, CalculationData(
+            start_date=str(portfolio.start_dates[loan]),
+            end_date=str(portfolio.end_dates[loan]),
+            amount=float(portfolio.amounts[loan]),
+            currency=str(portfolio.currencies[loan]),
+            base_rate=float(portfolio.base_rates[loan]),
+            margin=float(portfolio.margins[loan]),
+            exclude_weekends=bool(portfolio.exclude_weekends[loan]),
+            method=str(portfolio.methods[loan]),
+            calendar=_optional_name(portfolio.calendars, loan),
+            rate_curve=_optional_name(portfolio.rate_curves, loan),
+            rounding=str(portfolio.roundings[loan]),
+        )
+
+def _included_days_before(portfolio: PortfolioArrays, loans: np.ndarray, day_numbers: np.ndarray) -> np.ndarray:
+    # Included days of each loan from its start up to, but not including,
+    # the matching day number.
+    starts = portfolio.start_dates.astype(np.int64)[loans]
+    offsets = np.maximum(day_numbers - starts, 0)
+    first = (starts + 3) % 7
+    weekdays = _weekdays_before(first + offsets) - _weekdays_before(first)
+    days = np.where(portfolio.exclude_weekends[loans], weekdays, offsets)
+    if portfolio.calendars is not None:
+        for name in np.unique(portfolio.calendars[loans]):
+            if name:
+                rows = np.flatnonzero(portfolio.calendars[loans] == name)
+                calendar = get_calendar(str(name))
+                days[rows] = calendar.business_days_before(starts[rows] + offsets[rows]) - calendar.business_days_before(starts[rows])
+    return days
+
+@dataclass(frozen=True)
+class CurvePricing:
+    # Every loan's accrual split into constant-rate segments, laid out end
+    # to end; a new fixing only touches the segments from its date onward.
+    portfolio: PortfolioArrays
+    curve: RateCurve
+    loans: np.ndarray
+    owner: np.ndarray
+    start_days: np.ndarray
+    # Included days before each segment, and in it.
+    offsets: np.ndarray
+    lengths: np.ndarray
+    rates: np.ndarray
+    # Product of the compound growth factors before each segment, and the
+    # balance it opens on (the amount times that product).
+    growth: np.ndarray
+    openings: np.ndarray
+    base_interest: np.ndarray
+    margin_interest: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.owner)
+
+    def totals(self, with_margin: bool = True) -> np.ndarray:
+        weights = self.margin_interest if with_margin else self.base_interest
+        return np.bincount(self.owner, weights=weights, minlength=len(self.portfolio))[self.loans]
+
+def _price_segments(
+    portfolio: PortfolioArrays,
+    curve: RateCurve,
+    loans: np.ndarray,
+    first_days: np.ndarray,
+    first_offsets: np.ndarray,
+    first_growth: np.ndarray,
+) -> Tuple[np.ndarray, ...]:
+    # Segments of each loan from first_days on, given its included-day offset
+    # and growth product there; one segment per fixing inside the remaining term.
+    ends = portfolio.end_dates.astype(np.int64)[loans]
+    compound = portfolio.methods[loans] == "compound"
+    begin, end = curve.fixing_range(first_days, ends)
+    per_loan = np.where(first_days <= ends, end - begin + 1, 0)
+    loan_rows = np.repeat(np.arange(len(loans)), per_loan)
+    position = np.arange(loan_rows.size) - (np.cumsum(per_loan) - per_loan)[loan_rows]
+
+    fixing = np.maximum(begin[loan_rows] + position - 1, 0)
+    first = position == 0
+    start_days = np.where(first, first_days[loan_rows], curve.days[fixing])
+    base_rates = portfolio.base_rates[loans][loan_rows]
+    rates = np.where(first, curve.rate_on(first_days, np.nan)[loan_rows], curve.rates[fixing])
+    rates = np.where(np.isnan(rates), base_rates, rates)
+
+    owner = loans[loan_rows]
+    offsets = np.where(first, first_offsets[loan_rows], _included_days_before(portfolio, owner, start_days))
+    last = np.cumsum(per_loan) - 1
+    next_offsets = np.empty_like(offsets)
+    next_offsets[:-1] = offsets[1:]
+    next_offsets[last[per_loan > 0]] = _included_days_before(portfolio, loans, ends + 1)[per_loan > 0]
+    lengths = next_offsets - offsets
+
+    margins = portfolio.margins[owner]
+    segment_compound = compound[loan_rows]
+    lengths_f = lengths.astype(np.float64)
+    # Compound segments open on the balance the earlier ones grew to. The
+    # factors are multiplied in date order, one segment position at a time,
+    # so each product is the one the per-loan cumprod takes, bit for bit.
+    factors = np.where(segment_compound, np.power(1 + ((rates + margins) / 100.0) * (1/365.0), lengths_f), 1.0)
+    growth = first_growth[loan_rows].astype(np.float64)
+    for step in range(1, int(per_loan.max(initial=0))):
+        rows = np.flatnonzero(position == step)
+        growth[rows] = growth[rows - 1] * factors[rows - 1]
+    segment_openings = portfolio.amounts[owner] * growth
+    return (
+        owner,
+        start_days,
+        offsets,
+        lengths,
+        rates,
+        growth,
+        segment_openings,
+        closed_form_totals(segment_openings, rates, margins, lengths_f, segment_compound, False),
+        closed_form_totals(segment_openings, rates, margins, lengths_f, segment_compound, True),
+    )
+
+def price_on_curve(portfolio: PortfolioArrays, loans: np.ndarray, curve: RateCurve) -> CurvePricing:
+    loans = np.asarray(loans, dtype=np.int64)
+    starts = portfolio.start_dates.astype(np.int64)[loans]
+    return CurvePricing(
+        portfolio,
+        curve,
+        loans,
+        *_price_segments(portfolio, curve, loans, starts, np.zeros(len(loans), dtype=np.int64), np.ones(len(loans))),
+    )
+
+def reprice(pricing: CurvePricing, curve: RateCurve) -> CurvePricing:
+    # Segments that end before the first day the curves disagree keep their
+    # interest and closing balance; each loan is re-priced from there on.
+    changed = pricing.curve.first_difference(curve)
+    if changed is None:
+        return replace(pricing, curve=curve)
+    segment_ends = np.append(pricing.start_days[1:], np.iinfo(np.int64).max)
+    last = np.append(pricing.owner[1:] != pricing.owner[:-1], True)
+    segment_ends[last] = pricing.portfolio.end_dates.astype(np.int64)[pricing.owner[last]] + 1
+    keep = segment_ends <= changed
+
+    # The first segment of every loan that is not kept restarts it.
+    restart = ~keep & np.append(True, (pricing.owner[1:] != pricing.owner[:-1]) | keep[:-1])
+    tail = _price_segments(
+        pricing.portfolio,
+        curve,
+        pricing.owner[restart],
+        pricing.start_days[restart],
+        pricing.offsets[restart],
+        pricing.growth[restart],
+    )
+    kept = (
+        pricing.owner[keep],
+        pricing.start_days[keep],
+        pricing.offsets[keep],
+        pricing.lengths[keep],
+        pricing.rates[keep],
+        pricing.growth[keep],
+        pricing.openings[keep],
+        pricing.base_interest[keep],
+        pricing.margin_interest[keep],
+    )
+    # A stable sort by owner keeps each loan's segments in date order.
+    columns = [np.concatenate((old, new)) for old, new in zip(kept, tail)]
+    order = np.argsort(columns[0], kind="stable")
+    return CurvePricing(pricing.portfolio, curve, pricing.loans, *(column[order] for column in columns))
+
+def _check_methods(portfolio: PortfolioArrays, days: np.ndarray) -> np.ndarray:
+    unknown = ~np.isin(portfolio.methods, METHODS) & (days > 0)
+    if unknown.any():
+        raise ValueError(f"Unknown method: {portfolio.methods[np.argmax(unknown)]}")
+    return portfolio.methods == "compound"
+
+def portfolio_total_interest(
+    loans: PortfolioArrays | Iterable[CalculationData | Tuple[int, CalculationData]],
+    with_margin: bool = True,
+) -> np.ndarray:
+    portfolio = _as_portfolio(loans)
+    days = included_days(portfolio)
+    compound = _check_methods(portfolio, days)
+    totals = closed_form_totals(
+        portfolio.amounts,
+        portfolio.base_rates,
+        portfolio.margins,
+        days.astype(np.float64),
+        compound,
+        with_margin,
+    )
+    for name, members in _rate_curve_groups(portfolio):
+        totals[members] = price_on_curve(portfolio, members, get_rate_curve(name)).totals(with_margin)
+    for loan, calc in _fixed_point_loans(portfolio):
+        totals[loan] = closed_form_interest(calc, with_margin)
+    return totals
+
+def _take(portfolio: PortfolioArrays, loans: np.ndarray) -> PortfolioArrays:
+    return PortfolioArrays(**{name: None if values is None else values[loans] for name, values in vars(portfolio).items()})
+
+def _profile_groups(portfolio: PortfolioArrays, loans: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # One representative loan per distinct schedule profile, and the
+    # profile each of `loans` belongs to.
+    fields = [
+        portfolio.start_dates.astype(np.int64)[loans],
+        portfolio.end_dates.astype(np.int64)[loans],
+        portfolio.base_rates[loans],
+        portfolio.margins[loans],
+        portfolio.exclude_weekends[loans],
+        portfolio.methods[loans],
+    ]
+    fields += [names[loans] for names in (portfolio.calendars, portfolio.rate_curves) if names is not None]
+    _, first, inverse = np.unique(np.rec.fromarrays(fields), return_index=True, return_inverse=True)
+    return loans[first], inverse.ravel()
+
+def _profile(portfolio: PortfolioArrays, loan: int) -> ScheduleProfile:
+    return ScheduleProfile(
+        start_date=str(portfolio.start_dates[loan]),
+        end_date=str(portfolio.end_dates[loan]),
+        base_rate=float(portfolio.base_rates[loan]),
+        margin=float(portfolio.margins[loan]),
+        exclude_weekends=bool(portfolio.exclude_weekends[loan]),
+        method=str(portfolio.methods[loan]),
+        calendar=_optional_name(portfolio.calendars, loan),
+        rate_curve=_optional_name(portfolio.rate_curves, loan),
+    )
+
+def _unit_schedules(portfolio: PortfolioArrays) -> List[UnitSchedule]:
+    # Unit-principal schedules for every loan in one vectorized pass.
+    counts = included_days(portfolio)
+    compound = portfolio.methods == "compound"
+
+    # Lay every loan's calendar out end to end, then drop excluded weekends.
+    starts = portfolio.start_dates.astype(np.int64)
+    calendar_days = np.maximum(portfolio.end_dates.astype(np.int64) - starts + 1, 0)
+    owner = np.repeat(np.arange(len(portfolio)), calendar_days)
+    first_offsets = np.cumsum(calendar_days) - calendar_days
+    day_numbers = np.repeat(starts - first_offsets, calendar_days) + np.arange(owner.size)
+    keep = ~(portfolio.exclude_weekends[owner] & ((day_numbers + 3) % 7 >= 5))
+    for name, members in _calendar_groups(portfolio):
+        rows = np.flatnonzero(np.isin(owner, members))
+        keep[rows] = get_calendar(name).is_business_day(day_numbers[rows])
+    owner = owner[keep]
+    day_numbers = day_numbers[keep]
+
+    offsets = np.cumsum(counts) - counts
+    days_elapsed = np.arange(owner.size) - offsets[owner] + 1
+
+    total_rates = portfolio.base_rates + portfolio.margins
+    base_rates = portfolio.base_rates[owner]
+    on_curve = np.zeros(len(portfolio), dtype=bool)
+    for name, members in _rate_curve_groups(portfolio):
+        on_curve[members] = True
+        rows = np.flatnonzero(np.isin(owner, members))
+        base_rates[rows] = get_rate_curve(name).rate_on(day_numbers[rows], base_rates[rows])
+    day_rates = base_rates + portfolio.margins[owner]
+
+    balances = np.ones(owner.size)
+    # np.cumprod along rows multiplies sequentially, so grouping compound
+    # loans of equal length reproduces the single-loan engine bit for bit.
+    for length in np.unique(counts[compound & ~on_curve & (counts > 0)]):
+        group = np.flatnonzero(compound & ~on_curve & (counts == length))
+        growth = np.repeat((1 + (total_rates[group] / 100.0) * (1/365.0))[:, None], length, axis=1)
+        growth[:, 0] = 1.0
+        positions = offsets[group][:, None] + np.arange(length)
+        balances[positions] = np.cumprod(growth, axis=1)
+    # Rates on a curve change day to day, so those balances grow loan by loan.
+    for loan in np.flatnonzero(compound & on_curve & (counts > 0)):
+        rows = slice(offsets[loan], offsets[loan] + counts[loan])
+        growth = 1 + (day_rates[rows] / 100.0) * (1/365.0)
+        growth[1:] = growth[:-1]
+        growth[0] = 1.0
+        balances[rows] = np.cumprod(growth)
+
+    last = np.maximum(offsets + counts - 1, 0)
+    closing = np.ones(len(portfolio))
+    grown = np.flatnonzero(compound & (counts > 0))
+    closing[grown] = balances[last[grown]] * (1 + (day_rates[last[grown]] / 100.0) * (1/365.0))
+
+    dates = day_numbers.astype("datetime64[D]")
+    bounds = offsets[1:]
+    units = []
+    for loan, (loan_dates, loan_balances, loan_base, loan_total, loan_elapsed) in enumerate(zip(
+        np.split(dates, bounds),
+        np.split(balances, bounds),
+        np.split(base_rates, bounds),
+        np.split(day_rates, bounds),
+        np.split(days_elapsed, bounds),
+    )):
+        if not on_curve[loan]:
+            # A fixed rate is kept as a scalar, as the single-loan engine does.
+            loan_base = float(portfolio.base_rates[loan])
+            loan_total = loan_base + float(portfolio.margins[loan])
+        units.append(UnitSchedule(
+            dates=loan_dates,
+            balances=loan_balances,
+            base_rates=loan_base,
+            total_rates=loan_total,
+            days_elapsed=loan_elapsed,
+            closing_balance=float(closing[loan]),
+        ))
+    return units
+
+def portfolio_daily_interest(
+    loans: PortfolioArrays | Iterable[CalculationData | Tuple[int, CalculationData]]
+) -> List[InterestColumns]:
+    portfolio = _as_portfolio(loans)
+    if len(portfolio) == 0:
+        return []
+    _check_methods(portfolio, included_days(portfolio))
+
+    # Float schedules are linear in the amount, so each distinct profile is
+    # worked out once for a unit principal, through the same cache as
+    # single loans, and scaled per loan.
+    floating = np.arange(len(portfolio)) if portfolio.roundings is None else np.flatnonzero(portfolio.roundings == "")
+    representatives, profile_of = _profile_groups(portfolio, floating)
+    profiles = [_profile(portfolio, loan) for loan in representatives.tolist()]
+    cache = unit_schedule.cache
+    units = [cache.get(unit_schedule.cache_key(profile)) for profile in profiles]
+    missing = [index for index, unit in enumerate(units) if unit is None]
+    if missing:
+        for index, unit in zip(missing, _unit_schedules(_take(portfolio, representatives[missing]))):
+            freeze_unit_schedule(unit)
+            cache.put(unit_schedule.cache_key(profiles[index]), unit, profiles[index])
+            units[index] = unit
+
+    schedules: List[InterestColumns] = [None] * len(portfolio)
+    for loan, profile, amount in zip(floating.tolist(), profile_of.tolist(), portfolio.amounts[floating].tolist()):
+        schedules[loan] = units[profile].scaled(amount)
+    for loan, calc in _fixed_point_loans(portfolio):
+        schedules[loan] = daily_interest_columns(calc)
+    return schedules
@@ -0,0 +1,126 @@
+import csv
+import os
+import re
+from dataclasses import dataclass
+from itertools import count
+from threading import Lock
+from typing import Dict, Iterable, List, Tuple
+import numpy as np
+from loan_calculator.cache import invalidate_inputs
+from loan_calculator.dates import EPOCH_ORDINAL, parse_ordinal
+
+# Directory of <NAME>.csv fixing files with "date,rate" rows.
+RATE_CURVE_DIR_ENV = "LOAN_CALCULATOR_RATE_DIR"
+# Names that may become a file name in that directory.
+RATE_CURVE_NAME = re.compile(r"[A-Z0-9_]+")
+
+_versions = count(1)
+
+@dataclass(frozen=True)
+class RateCurve:
+    name: str
+    # Fixing dates as datetime64 day numbers, sorted and unique; each rate
+    # (in %) applies from its date until the next fixing.
+    days: np.ndarray
+    rates: np.ndarray
+    # Bumped on every registration so repriced results can be told apart.
+    version: int = 0
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def rate_on(self, day_numbers: np.ndarray, default: float) -> np.ndarray:
+        # Binary search for the fixing in effect; `default` applies before
+        # the first one.
+        positions = np.searchsorted(self.days, day_numbers, side="right") - 1
+        return np.where(positions >= 0, self.rates[np.maximum(positions, 0)], default)
+
+    def fixing_range(self, first_day: np.ndarray, last_day: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # Indexes [begin, end) of the fixings that take effect after
+        # first_day and on or before last_day.
+        return (
+            np.searchsorted(self.days, first_day, side="right"),
+            np.searchsorted(self.days, last_day, side="right"),
+        )
+
+    def first_difference(self, other: "RateCurve") -> int | None:
+        # Earliest day number on which the two curves quote different rates.
+        days = np.union1d(self.days, other.days)
+        mine = self.rate_on(days, np.nan)
+        theirs = other.rate_on(days, np.nan)
+        differs = ~((mine == theirs) | (np.isnan(mine) & np.isnan(theirs)))
+        if not differs.any():
+            return None
+        return int(days[np.argmax(differs)])
+
+def build_rate_curve(name: str, fixings: Iterable[Tuple[str | int, float]]) -> RateCurve:
+    # Fixing dates are ISO strings or datetime64 day numbers; a later
+    # duplicate of a date replaces the earlier one.
+    by_day: Dict[int, float] = {}
+    for day, rate in fixings:
+        by_day[parse_ordinal(day) - EPOCH_ORDINAL if isinstance(day, str) else int(day)] = float(rate)
+    if not by_day:
+        raise ValueError(f"Rate curve {name} has no fixings.")
+    days = np.array(sorted(by_day), dtype=np.int64)
+    return RateCurve(
+        name=name,
+        days=days,
+        rates=np.array([by_day[day] for day in days.tolist()], dtype=np.float64),
+        version=next(_versions),
+    )
+
+def read_fixings(path: str) -> List[Tuple[str, float]]:
+    fixings = []
+    with open(path, newline="") as source:
+        for row in csv.reader(source):
+            if not row or row[0].strip().startswith("#"):
+                continue
+            if len(row) < 2:
+                raise ValueError(f"Malformed fixing row in {path}: {row}")
+            day, rate = row[0].strip(), row[1].strip()
+            try:
+                fixings.append((day, float(rate)))
+            except ValueError:
+                if fixings:
+                    raise
+                # A header line such as "date,rate".
+    return fixings
+
+_curves: Dict[str, RateCurve] = {}
+_lock = Lock()
+
+def register_rate_curve(name: str, fixings: Iterable[Tuple[str | int, float]]) -> RateCurve:
+    curve = build_rate_curve(name.upper(), fixings)
+    with _lock:
+        replaced = _curves.get(curve.name)
+        _curves[curve.name] = curve
+    if replaced is not None:
+        # Results cached for loans on the old fixings are no longer valid.
+        invalidate_inputs(lambda owner: getattr(owner, "rate_curve", None) == curve.name)
+    return curve
+
+def load_rate_curve(name: str, path: str) -> RateCurve:
+    return register_rate_curve(name, read_fixings(path))
+
+def get_rate_curve(name: str) -> RateCurve:
+    key = name.upper()
+    curve = _curves.get(key)
+    if curve is not None:
+        return curve
+    directory = os.environ.get(RATE_CURVE_DIR_ENV)
+    if directory and RATE_CURVE_NAME.fullmatch(key):
+        path = os.path.join(directory, f"{key}.csv")
+        if os.path.exists(path):
+            return load_rate_curve(key, path)
+    raise ValueError(f"Unknown rate curve: {name}")
+
+def has_rate_curve(name: str) -> bool:
+    try:
+        get_rate_curve(name)
+    except ValueError:
+        return False
+    return True
+
+def unregister_rate_curve(name: str) -> None:
+    with _lock:
+        _curves.pop(name.upper(), None)
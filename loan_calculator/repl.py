@@ -0,0 +1,165 @@
+import cmd2
+from loan_calculator.main import LoanCommands, calculate_parser, show_parser, list_parser, update_parser, accrued_parser, history_parser, build_batch_parser, stats_parser, summary_parser, snapshot_parser, restore_parser
+
+
+class LoanCalculator(LoanCommands, cmd2.Cmd):
+    intro = "Welcome to the Enhanced Loan Calculator. Type help or ? to list commands.\n"
+    prompt = "loan_calc> "
+
+    @cmd2.with_argparser(calculate_parser)
+    def do_calculate(self, args):
+        """Calculate loan interest with parameters:
+        
+        start_date end_date amount currency base_rate margin [--exclude_weekends] [--method {simple,compound}] [--calendar NAME] [--rate-curve NAME] [--rounding {daily,total}] [--period PERIOD]
+        
+        Example:
+            calculate 2024-01-01 2024-02-01 10000 USD 5.0 2.0 --exclude_weekends --method simple
+        """
+        self.run_calculate(args)
+
+    @cmd2.with_argparser(show_parser)
+    def do_show(self, args):
+        """Show calculation details by ID.
+
+        Rows are streamed in chunks, so long schedules start printing at once.
+        --period weekly|monthly|quarterly|yearly sums accrual per calendar period.
+
+        Usage:
+            show <calculation_id> [--page N] [--limit N] [--from-date YYYY-MM-DD] [--period PERIOD]
+        """
+        self.run_show(args)
+
+    @cmd2.with_argparser(list_parser)
+    def do_list(self, args):
+        """List saved calculations, a page at a time.
+
+        Filters and sorting use the store's indexes; follow the printed
+        cursor for the next page.
+
+        Usage:
+            list [--currency CODE] [--method {simple,compound}] [--start-from DATE] [--start-to DATE]
+                 [--end-from DATE] [--end-to DATE] [--min-amount N] [--max-amount N]
+                 [--sort {id,start_date,end_date,amount}] [--desc] [--limit N] [--offset N] [--cursor CURSOR]
+        """
+        self.run_list(args)
+
+    @cmd2.with_argparser(update_parser)
+    def do_update(self, args):
+        """Update an existing calculation with parameters:
+        
+        calculation_id start_date end_date amount currency base_rate margin [--exclude_weekends] [--method {simple,compound}] [--calendar NAME] [--rate-curve NAME] [--rounding {daily,total}] [--period PERIOD]
+        
+        Example:
+            update 1 2024-01-01 2024-02-01 10000 USD 5.0 2.0 --exclude_weekends --method compound
+        """
+        self.run_update(args)
+
+    @cmd2.with_argparser(accrued_parser)
+    def do_accrued(self, args):
+        """Show the interest accrued between two dates (both inclusive).
+
+        Usage:
+            accrued <calculation_id> <from_date> <to_date>
+
+        Example:
+            accrued 0 2024-03-01 2024-03-31
+        """
+        self.run_accrued(args)
+
+    @cmd2.with_argparser(history_parser)
+    def do_history(self, args):
+        """Show every recorded version of a calculation.
+
+        Usage:
+            history <calculation_id>
+        """
+        self.run_history(args)
+
+    @cmd2.with_argparser(build_batch_parser)
+    def do_batch(self, args):
+        """Calculate interest for every loan in a CSV or JSONL file.
+
+        Rows are validated and priced in parallel; results are written in input order.
+
+        Usage:
+            batch <input> <output> [--workers N] [--chunk-size N] [--schedules]
+
+        Example:
+            batch loans.csv totals.csv --workers 4
+        """
+        self.run_batch(args)
+
+    @cmd2.with_argparser(stats_parser)
+    def do_stats(self, args):
+        """Show call counts, latency percentiles and cache hit ratio per operation.
+
+        Usage:
+            stats [--format {table,json,prometheus}] [--output PATH] [--reset]
+
+        Example:
+            stats --format prometheus
+        """
+        self.run_stats(args)
+
+    @cmd2.with_argparser(summary_parser)
+    def do_summary(self, args):
+        """Show loan count, principal and total interest per currency across all calculations.
+
+        Usage:
+            summary [--by-method] [--check] [--rebuild]
+
+        Example:
+            summary --by-method --check
+        """
+        self.run_summary(args)
+
+    @cmd2.with_argparser(snapshot_parser)
+    def do_snapshot(self, args):
+        """Write every calculation to a compact binary file.
+
+        Usage:
+            snapshot <path>
+
+        Example:
+            snapshot loans.snap
+        """
+        self.run_snapshot(args)
+
+    @cmd2.with_argparser(restore_parser)
+    def do_restore(self, args):
+        """Replace the in-memory calculations with those in a snapshot file.
+
+        Usage:
+            restore <path>
+
+        Example:
+            restore loans.snap
+        """
+        self.run_restore(args)
+
+    def do_quit(self, args):
+        """Quit the application."""
+        self.poutput("Thank you for using the Loan Calculator. Goodbye!")
+        return True
+
+    do_exit = do_quit
+
+    def do_help(self, args):
+        """Provide detailed help with examples."""
+        if args:
+            super().do_help(args)
+        else:
+            self.poutput("Loan Calculator Commands:\n")
+            self.poutput("  calculate    Calculate loan interest with specified parameters.")
+            self.poutput("  show         Show details of a specific calculation by ID.")
+            self.poutput("  list         List all saved calculations.")
+            self.poutput("  update       Update an existing calculation.")
+            self.poutput("  accrued      Show the interest accrued between two dates.")
+            self.poutput("  history      Show the recorded versions of a calculation.")
+            self.poutput("  batch        Calculate interest for every loan in a CSV or JSONL file.")
+            self.poutput("  stats        Show per-operation timings and cache statistics.")
+            self.poutput("  summary      Show total interest per currency across all calculations.")
+            self.poutput("  snapshot     Save all calculations to a binary snapshot file.")
+            self.poutput("  restore      Load calculations from a snapshot file.")
+            self.poutput("  quit/exit    Exit the application.\n")
+            self.poutput("Type 'help <command>' for more details on each command.")
@@ -0,0 +1,82 @@
+from array import array
+from typing import Dict, Iterator, List, overload
+from loan_calculator.dates import iso_date
+
+class ScheduleRow:
+    __slots__ = ("ordinal", "base_interest", "margin_interest", "days_elapsed")
+
+    def __init__(self, ordinal: int, base_interest: float, margin_interest: float, days_elapsed: int):
+        self.ordinal = ordinal
+        self.base_interest = base_interest
+        self.margin_interest = margin_interest
+        self.days_elapsed = days_elapsed
+
+    @property
+    def accrual_date(self) -> str:
+        return iso_date(self.ordinal)
+
+    def as_dict(self) -> Dict[str, str | float]:
+        return {
+            "Accrual Date": self.accrual_date,
+            "Daily Interest (No Margin)": self.base_interest,
+            "Daily Interest (With Margin)": self.margin_interest,
+            "Days Elapsed": self.days_elapsed
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"ScheduleRow({self.accrual_date}, base={self.base_interest!r}, "
+            f"with_margin={self.margin_interest!r}, days_elapsed={self.days_elapsed})"
+        )
+
+class Schedule:
+    __slots__ = ("ordinals", "base_interest", "margin_interest", "days_elapsed")
+
+    def __init__(
+        self,
+        ordinals: array | None = None,
+        base_interest: array | None = None,
+        margin_interest: array | None = None,
+        days_elapsed: array | None = None,
+    ):
+        self.ordinals = ordinals if ordinals is not None else array("i")
+        self.base_interest = base_interest if base_interest is not None else array("d")
+        self.margin_interest = margin_interest if margin_interest is not None else array("d")
+        self.days_elapsed = days_elapsed if days_elapsed is not None else array("i")
+
+    def __len__(self) -> int:
+        return len(self.ordinals)
+
+    @overload
+    def __getitem__(self, index: int) -> ScheduleRow: ...
+    @overload
+    def __getitem__(self, index: slice) -> "Schedule": ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return Schedule(
+                self.ordinals[index],
+                self.base_interest[index],
+                self.margin_interest[index],
+                self.days_elapsed[index],
+            )
+        return ScheduleRow(
+            self.ordinals[index],
+            self.base_interest[index],
+            self.margin_interest[index],
+            self.days_elapsed[index],
+        )
+
+    def __iter__(self) -> Iterator[ScheduleRow]:
+        for row in zip(self.ordinals, self.base_interest, self.margin_interest, self.days_elapsed):
+            yield ScheduleRow(*row)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            len(column) * column.itemsize
+            for column in (self.ordinals, self.base_interest, self.margin_interest, self.days_elapsed)
+        )
+
+    def to_dicts(self) -> List[Dict[str, str | float]]:
+        return [row.as_dict() for row in self]
@@ -0,0 +1,399 @@
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict
+from typing import Any, Callable, Dict, Hashable, List, Sequence, Tuple
+from urllib.parse import parse_qs, urlsplit
+import numpy as np
+from loguru import logger
+from loan_calculator.aggregates import SummaryRow, portfolio_summary
+from loan_calculator.batch import validate_row
+from loan_calculator.data_store import CalculationData, ListQuery, Page, get_calculation, get_store, MemoryStore, ShardedMemoryStore, query_calculations, save_calculation, use_store
+from loan_calculator.metrics import metrics, to_prometheus
+from loan_calculator.interest_calculations import InterestColumns, daily_interest_columns, total_interest
+from loan_calculator.periods import PERIODS, period_breakdown
+from loan_calculator.portfolio import portfolio_total_interest
+from loan_calculator.snapshot import SnapshotStore, write_snapshot
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+MAX_BODY_BYTES = 1 << 20
+JSON_TYPE = "application/json"
+PROMETHEUS_TYPE = "text/plain; version=0.0.4"
+DEFAULT_PAGE_SIZE = 100
+REASONS = {
+    200: "OK",
+    201: "Created",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+COLLECTION = re.compile(r"^/calculations/?$")
+ITEM = re.compile(r"^/calculations/(\d+)/?$")
+METRICS = re.compile(r"^/metrics/?$")
+SUMMARY = re.compile(r"^/summary/?$")
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+# The functions below run in the worker pool, so they take and return only
+# picklable values, and serialize their own JSON off the event loop.
+
+def summarize(calc_data: CalculationData) -> bytes:
+    return json.dumps({
+        "calculation": asdict(calc_data),
+        "total_interest": total_interest(calc_data),
+        "total_interest_no_margin": total_interest(calc_data, with_margin=False),
+    }).encode()
+
+def render_schedule(
+    calc_data: CalculationData, period: str, from_date: str | None, page: int, limit: int | None
+) -> bytes:
+    if period == "daily":
+        columns = daily_interest_columns(calc_data)
+        first = np.searchsorted(columns.dates, np.datetime64(from_date, "D")) if from_date else 0
+        row_count = len(columns) - first
+    else:
+        periods = period_breakdown(calc_data, period, from_date)
+        first = 0
+        row_count = len(periods)
+    pages = -(-row_count // limit) if limit else 1
+    if row_count and page > pages:
+        raise ValueError(f"Page {page} is out of range (1-{pages}).")
+    begin = first + (page - 1) * limit if limit else first
+    end = begin + limit if limit else first + row_count
+    if period == "daily":
+        rows = InterestColumns(
+            dates=columns.dates[begin:end],
+            base_interest=columns.base_interest[begin:end],
+            margin_interest=columns.margin_interest[begin:end],
+            days_elapsed=columns.days_elapsed[begin:end],
+        ).to_dicts()
+    else:
+        rows = periods.to_dicts()[begin:end]
+    return json.dumps({
+        "calculation": asdict(calc_data),
+        "period": period,
+        "page": page,
+        "pages": pages,
+        "rows": rows,
+        "total_interest": total_interest(calc_data),
+    }).encode()
+
+def render_list(page: Page) -> bytes:
+    totals = portfolio_total_interest(page.items).tolist() if page.items else []
+    return json.dumps({
+        "items": [
+            {"id": calc_id, "calculation": asdict(calc), "total_interest": total}
+            for (calc_id, calc), total in zip(page.items, totals)
+        ],
+        "total": page.total,
+        "next_cursor": page.next_cursor,
+    }).encode()
+
+def render_summary(rows: List[SummaryRow]) -> bytes:
+    return json.dumps({
+        "groups": [
+            {
+                "currency": row.currency,
+                **({"method": row.method} if row.method else {}),
+                "loans": row.loans,
+                "total_amount": row.amount,
+                "total_interest": row.interest,
+            }
+            for row in rows
+        ],
+    }).encode()
+
+def _with_id(calc_id: int, payload: bytes) -> bytes:
+    # Coalesced payloads are shared by every id holding the same loan, so
+    # the id is spliced in afterwards instead of re-encoding the payload.
+    return b'{"id": %d, ' % calc_id + payload[1:]
+
+# At most one computation per key runs at a time; callers asking for a key
+# already in flight await the same future instead of starting another.
+class Coalescer:
+    def __init__(self, executor: Executor):
+        self.executor = executor
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def run(self, key: Hashable, fn: Callable, *args: Any) -> Any:
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._forget(key, done))
+            self.started += 1
+        else:
+            self.coalesced += 1
+        # Shielded, so one caller disconnecting doesn't cancel the others.
+        return await asyncio.shield(future)
+
+    def _forget(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+
+def _query_value(query: Dict[str, List[str]], name: str, default: Any = None) -> Any:
+    values = query.get(name)
+    return values[-1] if values else default
+
+def _positive(query: Dict[str, List[str]], name: str, default: int | None) -> int | None:
+    value = _query_value(query, name)
+    if value is None:
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise HTTPError(400, f"{name} must be an integer.")
+    if number < 1:
+        raise HTTPError(400, "Page and limit must be positive.")
+    return number
+
+def _float(query: Dict[str, List[str]], name: str) -> float | None:
+    value = _query_value(query, name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        raise HTTPError(400, f"{name} must be a number.")
+
+def _list_query(query: Dict[str, List[str]]) -> ListQuery:
+    currency = _query_value(query, "currency")
+    offset = _query_value(query, "offset", "0")
+    if not offset.isdigit():
+        raise HTTPError(400, "offset must be a non-negative integer.")
+    return ListQuery(
+        currency=currency.upper() if currency else None,
+        method=_query_value(query, "method"),
+        start_from=_query_value(query, "start_from"),
+        start_to=_query_value(query, "start_to"),
+        end_from=_query_value(query, "end_from"),
+        end_to=_query_value(query, "end_to"),
+        min_amount=_float(query, "min_amount"),
+        max_amount=_float(query, "max_amount"),
+        sort=_query_value(query, "sort", "id"),
+        descending=_query_value(query, "desc", "").lower() in ("1", "true", "yes"),
+        limit=_positive(query, "limit", DEFAULT_PAGE_SIZE),
+        offset=int(offset),
+        cursor=_query_value(query, "cursor"),
+    )
+
+def _json_body(body: bytes) -> Dict[str, Any]:
+    try:
+        data = json.loads(body or b"null")
+    except ValueError:
+        raise HTTPError(400, "Request body must be JSON.")
+    if not isinstance(data, dict):
+        raise HTTPError(400, "Request body must be a JSON object.")
+    return data
+
+def _response(status: int, payload: bytes, keep_alive: bool, content_type: str = JSON_TYPE) -> bytes:
+    head = (
+        f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(payload)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode("latin-1") + payload
+
+# Store reads happen on the event loop. Saves run their hooks (pricing,
+# audit log writes, a database transaction), so they go to a thread pool in
+# this process; interest calculations and JSON encoding run on the executor.
+class LoanServer:
+    def __init__(self, executor: Executor | None = None, workers: int | None = None):
+        self.executor = executor or ThreadPoolExecutor(max_workers=workers, thread_name_prefix="loan-calculator")
+        self.store_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="loan-calculator-store")
+        self.coalescer = Coalescer(self.executor)
+        self.requests = 0
+        self._server: asyncio.AbstractServer | None = None
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> None:
+        self._server = await asyncio.start_server(self.handle_connection, host, port)
+
+    async def serve_forever(self) -> None:
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.store_executor.shutdown(wait=False, cancel_futures=True)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                parts = request_line.decode("latin-1").split()
+                headers: Dict[str, str] = {}
+                while (line := await reader.readline()).strip():
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                if len(parts) != 3:
+                    writer.write(_response(400, b'{"error": "Malformed request line."}', False))
+                    break
+                method, target, version = parts
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    writer.write(_response(400, b'{"error": "Invalid Content-Length."}', False))
+                    break
+                if length > MAX_BODY_BYTES:
+                    writer.write(_response(413, b'{"error": "Request body is too large."}', False))
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                started = time.perf_counter()
+                if method == "GET" and METRICS.match(urlsplit(target).path):
+                    status, payload, content_type = 200, to_prometheus().encode(), PROMETHEUS_TYPE
+                else:
+                    status, payload = await self.dispatch(method, target, body)
+                    content_type = JSON_TYPE
+                    metrics.observe(f"http.{method.lower()}", time.perf_counter() - started, error=status >= 500)
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+                writer.write(_response(status, payload, keep_alive, content_type))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method: str, target: str, body: bytes = b"") -> Tuple[int, bytes]:
+        self.requests += 1
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        try:
+            if COLLECTION.match(url.path):
+                if method == "GET":
+                    return 200, await self.list(_list_query(query))
+                if method == "POST":
+                    return 201, await self.calculate(_json_body(body))
+                raise HTTPError(405, f"Method {method} is not allowed on {url.path}.")
+            item = ITEM.match(url.path)
+            if item:
+                calc_id = int(item.group(1))
+                if method == "GET":
+                    return 200, await self.show(
+                        calc_id,
+                        _query_value(query, "period", "daily"),
+                        _query_value(query, "from_date"),
+                        _positive(query, "page", 1),
+                        _positive(query, "limit", None),
+                    )
+                if method == "PUT":
+                    return 200, await self.update(calc_id, _json_body(body))
+                raise HTTPError(405, f"Method {method} is not allowed on {url.path}.")
+            if SUMMARY.match(url.path):
+                if method == "GET":
+                    # Maintained on every save, so this reads one row per
+                    # group on the loop instead of pricing the store.
+                    by_method = _query_value(query, "by_method", "").lower() in ("1", "true", "yes")
+                    return 200, render_summary(portfolio_summary(by_method))
+                raise HTTPError(405, f"Method {method} is not allowed on {url.path}.")
+            raise HTTPError(404, f"Unknown path: {url.path}")
+        except HTTPError as e:
+            return e.status, json.dumps({"error": str(e)}).encode()
+        except (ValueError, TypeError) as e:
+            return 400, json.dumps({"error": str(e)}).encode()
+        except Exception as e:
+            logger.exception(f"Error handling {method} {url.path}")
+            return 500, json.dumps({"error": f"An error occurred: {e}"}).encode()
+
+    async def _in_store_thread(self, fn: Callable, *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self.store_executor, fn, *args)
+
+    async def calculate(self, fields: Dict[str, Any]) -> bytes:
+        calc = validate_row(fields)
+        calc_id = await self._in_store_thread(save_calculation, calc)
+        return _with_id(calc_id, await self.coalescer.run(("summary", calc), summarize, calc))
+
+    async def update(self, calc_id: int, fields: Dict[str, Any]) -> bytes:
+        if not await self._in_store_thread(get_calculation, calc_id):
+            raise HTTPError(404, "Calculation not found.")
+        calc = validate_row(fields)
+        await self._in_store_thread(save_calculation, calc, calc_id)
+        return _with_id(calc_id, await self.coalescer.run(("summary", calc), summarize, calc))
+
+    async def show(self, calc_id: int, period: str, from_date: str | None, page: int, limit: int | None) -> bytes:
+        calc = get_calculation(calc_id)
+        if not calc:
+            raise HTTPError(404, "Calculation not found.")
+        if period not in PERIODS:
+            raise HTTPError(400, f"Unknown period: {period}")
+        key = ("schedule", calc, period, from_date, page, limit)
+        return _with_id(calc_id, await self.coalescer.run(key, render_schedule, calc, period, from_date, page, limit))
+
+    async def list(self, query: ListQuery) -> bytes:
+        # The page comes from the store's indexes on the loop; only the
+        # interest totals and encoding go to the executor.
+        return await asyncio.get_running_loop().run_in_executor(self.executor, render_list, query_calculations(query))
+
+async def serve(host: str, port: int, executor: Executor | None = None, workers: int | None = None) -> None:
+    server = LoanServer(executor, workers)
+    await server.start(host, port)
+    print(f"Serving on http://{host}:{server.port}", flush=True)
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Serve calculate/show/list/update over HTTP as JSON.")
+    parser.add_argument("--host", type=str, default=DEFAULT_HOST, help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to listen on (0 picks a free one)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker threads or processes for calculations")
+    parser.add_argument("--processes", action="store_true", help="Calculate in worker processes instead of threads")
+    parser.add_argument("--snapshot", type=str, default=None, help="Start the in-memory store from this snapshot file if it exists and write it back on shutdown")
+    return parser
+
+def main(argv: Sequence[str] | None = None) -> int:
+    from loan_calculator.main import configure_from_env
+    args = build_parser().parse_args(argv)
+    configure_from_env()
+    # A database keeps its own rows; the snapshot only stands in for memory.
+    in_memory = isinstance(get_store(), (MemoryStore, ShardedMemoryStore))
+    if args.snapshot and in_memory and os.path.exists(args.snapshot):
+        use_store(SnapshotStore(args.snapshot))
+    executor = ProcessPoolExecutor(max_workers=args.workers) if args.processes else None
+    try:
+        asyncio.run(serve(args.host, args.port, executor, args.workers))
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        print(f"An error occurred: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if args.snapshot and in_memory:
+            write_snapshot(args.snapshot, get_store())
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,256 @@
+import mmap
+import os
+import struct
+from heapq import merge
+from threading import RLock
+from typing import Dict, Iterable, Iterator, List, Tuple
+import numpy as np
+from loan_calculator.data_store import (
+    CalculationData,
+    CalculationStore,
+    IndexMatch,
+    ListQuery,
+    MemoryStore,
+    Page,
+    check_query,
+    decode_cursor,
+    merge_matches,
+)
+from loan_calculator.dates import parse_ordinal
+
+# File layout: a header, then one fixed-width record per calculation sorted
+# by id, then the string table the records' string fields index into.
+MAGIC = b"LCSNAP01"
+# magic, next_id, record count, string table offset, string count
+HEADER = struct.Struct("<8sQQQQ")
+# id, amount, base_rate, margin, then string table indexes for start_date,
+# end_date, currency, method, calendar, rate_curve and rounding, then
+# exclude_weekends, padded to 64 bytes.
+RECORD = struct.Struct("<qdddIIIIIII?3x")
+STRING_FIELDS = ("start_date", "end_date", "currency", "method", "calendar", "rate_curve", "rounding")
+# The same layout as a numpy dtype, so columns can be filtered in place.
+RECORD_DTYPE = np.dtype(
+    [("id", "<i8"), ("amount", "<f8"), ("base_rate", "<f8"), ("margin", "<f8")]
+    + [(name, "<u4") for name in STRING_FIELDS]
+    + [("exclude_weekends", "u1"), ("padding", "V3")]
+)
+STRING_LENGTH = struct.Struct("<I")
+# String index standing for None.
+NO_STRING = 0xFFFFFFFF
+DATE_FIELDS = ("start_date", "end_date")
+
+def write_snapshot(path: str, store: CalculationStore) -> int:
+    items = sorted(store.list(), key=lambda item: item[0])
+    strings: Dict[str, int] = {}
+
+    def intern(value: str | None) -> int:
+        if value is None:
+            return NO_STRING
+        index = strings.get(value)
+        if index is None:
+            index = strings[value] = len(strings)
+        return index
+
+    records = np.zeros(len(items), dtype=RECORD_DTYPE)
+    records["id"] = [calc_id for calc_id, _ in items]
+    for name in ("amount", "base_rate", "margin", "exclude_weekends"):
+        records[name] = [getattr(caldata, name) for _, caldata in items]
+    for name in STRING_FIELDS:
+        records[name] = [intern(getattr(caldata, name)) for _, caldata in items]
+    table = b"".join(STRING_LENGTH.pack(len(encoded)) + encoded for encoded in map(str.encode, strings))
+
+    highest_id = items[-1][0] if items else -1
+    next_id = max(getattr(store, "next_id", 0), highest_id + 1)
+    strings_offset = HEADER.size + records.nbytes
+    # Written aside and renamed over the target, so a crash never leaves a
+    # half-written snapshot and a store still mapping the old file keeps it.
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as target:
+        target.write(HEADER.pack(MAGIC, next_id, len(items), strings_offset, len(strings)))
+        target.write(records.tobytes())
+        target.write(table)
+    os.replace(temporary, path)
+    return len(items)
+
+def _read_strings(data: mmap.mmap, offset: int, count: int) -> Dict[int, str | None]:
+    strings: Dict[int, str | None] = {NO_STRING: None}
+    for index in range(count):
+        (length,) = STRING_LENGTH.unpack_from(data, offset)
+        offset += STRING_LENGTH.size
+        strings[index] = data[offset:offset + length].decode()
+        offset += length
+    return strings
+
+def _date_ordinal(value: str | None) -> int:
+    try:
+        return parse_ordinal(value)
+    except (TypeError, ValueError):
+        return -1
+
+def _bound_value(name: str, value) -> int | float:
+    return parse_ordinal(value) if name in DATE_FIELDS else value
+
+# Serves a snapshot file in place: the file is memory-mapped and a record
+# is only decoded when it is read, so opening millions of calculations costs
+# the header and the string table. Saves go to an in-memory overlay that
+# shadows the mapped record with the same id.
+class SnapshotStore:
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as source:
+            data = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(data) < HEADER.size:
+            raise ValueError(f"Not a calculation snapshot: {path}")
+        magic, next_id, count, strings_offset, string_count = HEADER.unpack_from(data)
+        if magic != MAGIC or strings_offset != HEADER.size + count * RECORD.size:
+            raise ValueError(f"Not a calculation snapshot: {path}")
+        self._data = data
+        self._records = np.frombuffer(data, dtype=RECORD_DTYPE, count=count, offset=HEADER.size)
+        self._strings = _read_strings(data, strings_offset, string_count)
+        self._string_ids = {value: index for index, value in self._strings.items()}
+        self._shadowed = np.zeros(count, dtype=bool)
+        self._shadowed_count = 0
+        self._overlay = MemoryStore()
+        self._overlay.next_id = next_id
+        # Sort columns and orders, built the first time a query needs them.
+        self._columns: Dict[str, np.ndarray] = {}
+        self._orders: Dict[str, np.ndarray] = {}
+        self._lock = RLock()
+
+    @property
+    def next_id(self) -> int:
+        return self._overlay.next_id
+
+    @next_id.setter
+    def next_id(self, value: int) -> None:
+        with self._lock:
+            self._overlay.next_id = value
+
+    def _position(self, calc_id: int) -> int | None:
+        ids = self._records["id"]
+        position = int(np.searchsorted(ids, calc_id))
+        if position < len(ids) and ids[position] == calc_id and not self._shadowed[position]:
+            return position
+        return None
+
+    def _decode(self, fields: Tuple) -> CalculationData:
+        strings = self._strings
+        _, amount, base_rate, margin, start, end, currency, method, calendar, rate_curve, rounding, weekends = fields
+        return CalculationData(
+            strings[start], strings[end], amount, strings[currency], base_rate, margin, weekends,
+            strings[method], strings[calendar], strings[rate_curve], strings[rounding],
+        )
+
+    def save(self, caldata: CalculationData, calc_id: int = -1) -> int:
+        with self._lock:
+            position = self._position(calc_id) if calc_id != -1 else None
+            calc_id = self._overlay.save(caldata, calc_id)
+            if position is not None:
+                self._shadowed[position] = True
+                self._shadowed_count += 1
+            return calc_id
+
+    def save_many(self, calcs: Iterable[CalculationData]) -> List[int]:
+        # New ids start past every id in the file, so nothing is shadowed.
+        with self._lock:
+            return self._overlay.save_many(calcs)
+
+    def get(self, calc_id: int) -> CalculationData | None:
+        caldata = self._overlay.get(calc_id)
+        if caldata is not None:
+            return caldata
+        position = self._position(calc_id)
+        if position is None:
+            return None
+        return self._decode(RECORD.unpack_from(self._data, HEADER.size + position * RECORD.size))
+
+    def list(self) -> List[Tuple[int, CalculationData]]:
+        return list(self.iter())
+
+    def iter(self, batch_size: int = 1000) -> Iterator[Tuple[int, CalculationData]]:
+        with self._lock:
+            overlay = sorted(self._overlay.list(), key=lambda item: item[0])
+        return merge(self._iter_mapped(batch_size), overlay, key=lambda item: item[0])
+
+    def _iter_mapped(self, batch_size: int) -> Iterator[Tuple[int, CalculationData]]:
+        records, shadowed = self._records, self._shadowed
+        for begin in range(0, len(records), batch_size):
+            end = min(begin + batch_size, len(records))
+            chunk = self._data[HEADER.size + begin * RECORD.size:HEADER.size + end * RECORD.size]
+            for position, fields in enumerate(RECORD.iter_unpack(chunk), begin):
+                if not shadowed[position]:
+                    yield fields[0], self._decode(fields)
+
+    def _column(self, name: str) -> np.ndarray:
+        column = self._columns.get(name)
+        if column is None:
+            if name in DATE_FIELDS:
+                # Each distinct date string is parsed once, then gathered.
+                strings = [self._strings[index] for index in range(len(self._strings) - 1)]
+                ordinals = np.array([_date_ordinal(value) for value in strings], dtype=np.int64)
+                column = ordinals[self._records[name]]
+            else:
+                column = self._records["id" if name == "id" else name]
+            self._columns[name] = column
+        return column
+
+    def _order(self, name: str) -> np.ndarray:
+        # Positions sorted by (value, id); the records are already in id order.
+        order = self._orders.get(name)
+        if order is None:
+            if name == "id":
+                order = np.arange(len(self._records))
+            else:
+                order = np.lexsort((self._records["id"], self._column(name)))
+            self._orders[name] = order
+        return order
+
+    def _match(self, query: ListQuery) -> IndexMatch:
+        mask = ~self._shadowed
+        for name, value in (("currency", query.currency), ("method", query.method)):
+            if value is not None:
+                index = self._string_ids.get(value)
+                if index is None:
+                    return IndexMatch([], 0)
+                mask &= self._records[name] == index
+        for name, (first, last) in query.ranges().items():
+            values = self._column(name)
+            if first is not None:
+                mask &= values >= _bound_value(name, first)
+            if last is not None:
+                mask &= values <= _bound_value(name, last)
+        total = int(np.count_nonzero(mask))
+
+        ids = self._records["id"]
+        values = self._column(query.sort)
+        if query.cursor is not None:
+            value, calc_id = decode_cursor(query.sort, query.cursor)
+            bound = _bound_value(query.sort, value)
+            if query.descending:
+                mask &= (values < bound) | ((values == bound) & (ids < calc_id))
+            else:
+                mask &= (values > bound) | ((values == bound) & (ids > calc_id))
+        order = self._order(query.sort)
+        if query.descending:
+            order = order[::-1]
+        wanted = None if query.limit is None else query.offset + query.limit + 1
+        selected = order[mask[order]][:wanted]
+        return IndexMatch(list(zip(values[selected].tolist(), ids[selected].tolist())), total)
+
+    def query(self, query: ListQuery) -> Page:
+        check_query(query)
+        with self._lock:
+            matches = [self._match(query), self._overlay.index.match(query, self._overlay.get)]
+            return merge_matches(matches, query, self.get)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._records = self._records[:0]
+            self._shadowed = self._shadowed[:0]
+            self._shadowed_count = 0
+            self._overlay = MemoryStore()
+            self._columns.clear()
+            self._orders.clear()
+
+    def __len__(self) -> int:
+        return len(self._records) - self._shadowed_count + len(self._overlay)
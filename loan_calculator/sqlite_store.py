@@ -0,0 +1,227 @@
+import sqlite3
+from threading import RLock
+from typing import Any, Iterable, Iterator, List, Tuple
+from loan_calculator.data_store import CalculationData, ListQuery, Page, check_query, decode_cursor, encode_cursor
+from loan_calculator.dates import iso_date, parse_ordinal
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS calculations (
+    id INTEGER PRIMARY KEY,
+    start_date TEXT NOT NULL,
+    end_date TEXT NOT NULL,
+    amount REAL NOT NULL,
+    currency TEXT NOT NULL,
+    base_rate REAL NOT NULL,
+    margin REAL NOT NULL,
+    exclude_weekends INTEGER NOT NULL,
+    method TEXT NOT NULL,
+    calendar TEXT,
+    rate_curve TEXT,
+    rounding TEXT
+);
+CREATE TABLE IF NOT EXISTS store_meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO store_meta (key, value) VALUES ('next_id', 0);
+CREATE INDEX IF NOT EXISTS idx_calculations_currency ON calculations (currency);
+CREATE INDEX IF NOT EXISTS idx_calculations_method ON calculations (method);
+CREATE INDEX IF NOT EXISTS idx_calculations_start_date ON calculations (start_date);
+CREATE INDEX IF NOT EXISTS idx_calculations_end_date ON calculations (end_date);
+CREATE INDEX IF NOT EXISTS idx_calculations_amount ON calculations (amount);
+"""
+
+COLUMNS = "id, start_date, end_date, amount, currency, base_rate, margin, exclude_weekends, method, calendar, rate_curve, rounding"
+# Columns added after the first schema, with their definitions, so older
+# database files are upgraded in place when opened.
+ADDED_COLUMNS = {"calendar": "TEXT", "rate_curve": "TEXT", "rounding": "TEXT"}
+
+# Statements are kept as constants so sqlite3's statement cache reuses the
+# prepared forms instead of recompiling them on every call.
+UPSERT = (
+    f"INSERT INTO calculations ({COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (id) DO UPDATE SET start_date = excluded.start_date, end_date = excluded.end_date, "
+    "amount = excluded.amount, currency = excluded.currency, base_rate = excluded.base_rate, "
+    "margin = excluded.margin, exclude_weekends = excluded.exclude_weekends, method = excluded.method, "
+    "calendar = excluded.calendar, rate_curve = excluded.rate_curve, rounding = excluded.rounding"
+)
+SELECT_ONE = f"SELECT {COLUMNS} FROM calculations WHERE id = ?"
+SELECT_ALL = f"SELECT {COLUMNS} FROM calculations ORDER BY id"
+COUNT = "SELECT COUNT(*) FROM calculations"
+ALLOCATE_IDS = "UPDATE store_meta SET value = value + ? WHERE key = 'next_id' RETURNING value - ?"
+
+RANGE_COLUMNS = {"start_date": "start_date", "end_date": "end_date", "amount": "amount"}
+
+def _bound(name: str, value: Any) -> Any:
+    # Dates are stored as ISO text, which compares correctly only against
+    # ISO text, so a bound such as 2024-2-1 is padded first.
+    return iso_date(parse_ordinal(value)) if name in ("start_date", "end_date") else value
+
+def _filters(query: ListQuery) -> Tuple[List[str], List[Any]]:
+    clauses: List[str] = []
+    params: List[Any] = []
+    for column, value in (("currency", query.currency), ("method", query.method)):
+        if value is not None:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    for name, (first, last) in query.ranges().items():
+        if first is not None:
+            clauses.append(f"{RANGE_COLUMNS[name]} >= ?")
+            params.append(_bound(name, first))
+        if last is not None:
+            clauses.append(f"{RANGE_COLUMNS[name]} <= ?")
+            params.append(_bound(name, last))
+    return clauses, params
+
+def _where(clauses: List[str]) -> str:
+    return f" WHERE {' AND '.join(clauses)}" if clauses else ""
+
+def _row_to_calculation(row: tuple) -> Tuple[int, CalculationData]:
+    calc_id, start_date, end_date, amount, currency, base_rate, margin, exclude_weekends, method, calendar, rate_curve, rounding = row
+    return calc_id, CalculationData(
+        start_date=start_date,
+        end_date=end_date,
+        amount=amount,
+        currency=currency,
+        base_rate=base_rate,
+        margin=margin,
+        exclude_weekends=bool(exclude_weekends),
+        method=method,
+        calendar=calendar,
+        rate_curve=rate_curve,
+        rounding=rounding
+    )
+
+def _calculation_to_row(calc_id: int, caldata: CalculationData) -> tuple:
+    return (
+        calc_id,
+        caldata.start_date,
+        caldata.end_date,
+        caldata.amount,
+        caldata.currency,
+        caldata.base_rate,
+        caldata.margin,
+        int(caldata.exclude_weekends),
+        caldata.method,
+        caldata.calendar,
+        caldata.rate_curve,
+        caldata.rounding,
+    )
+
+class SQLiteStore:
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        # Autocommit mode: transactions are opened explicitly with BEGIN
+        # IMMEDIATE so ID allocation is atomic across processes.
+        self.connection = sqlite3.connect(
+            path, isolation_level=None, check_same_thread=False, cached_statements=64
+        )
+        self._lock = RLock()
+        with self._lock:
+            self.connection.execute("PRAGMA journal_mode = WAL")
+            self.connection.execute("PRAGMA synchronous = NORMAL")
+            self.connection.executescript(SCHEMA)
+            self._add_missing_columns()
+
+    def _add_missing_columns(self) -> None:
+        existing = {row[1] for row in self.connection.execute("PRAGMA table_info(calculations)")}
+        for name, definition in ADDED_COLUMNS.items():
+            if name not in existing:
+                self.connection.execute(f"ALTER TABLE calculations ADD COLUMN {name} {definition}")
+
+    def _allocate_ids(self, count: int) -> int:
+        (first_id,) = self.connection.execute(ALLOCATE_IDS, (count, count)).fetchone()
+        return first_id
+
+    def save(self, caldata: CalculationData, calc_id: int = -1) -> int:
+        with self._lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                if calc_id == -1:
+                    calc_id = self._allocate_ids(1)
+                self.connection.execute(UPSERT, _calculation_to_row(calc_id, caldata))
+            except BaseException:
+                self.connection.execute("ROLLBACK")
+                raise
+            self.connection.execute("COMMIT")
+        return calc_id
+
+    def save_many(self, calcs: Iterable[CalculationData]) -> List[int]:
+        calcs = list(calcs)
+        if not calcs:
+            return []
+        with self._lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                first_id = self._allocate_ids(len(calcs))
+                ids = list(range(first_id, first_id + len(calcs)))
+                self.connection.executemany(
+                    UPSERT, (_calculation_to_row(calc_id, caldata) for calc_id, caldata in zip(ids, calcs))
+                )
+            except BaseException:
+                self.connection.execute("ROLLBACK")
+                raise
+            self.connection.execute("COMMIT")
+        return ids
+
+    def get(self, calc_id: int) -> CalculationData | None:
+        with self._lock:
+            row = self.connection.execute(SELECT_ONE, (calc_id,)).fetchone()
+        return _row_to_calculation(row)[1] if row else None
+
+    def list(self) -> List[Tuple[int, CalculationData]]:
+        return list(self.iter())
+
+    def iter(self, batch_size: int = 1000) -> Iterator[Tuple[int, CalculationData]]:
+        # A dedicated cursor keeps a read snapshot open while rows are
+        # fetched in batches, so callers never hold the whole table.
+        with self._lock:
+            cursor = self.connection.cursor()
+            cursor.execute(SELECT_ALL)
+        try:
+            while True:
+                with self._lock:
+                    rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                for row in rows:
+                    yield _row_to_calculation(row)
+        finally:
+            cursor.close()
+
+    def query(self, query: ListQuery) -> Page:
+        # Filters and ordering map onto the column indexes; the cursor is a
+        # keyset condition, so deep pages cost the same as the first one.
+        check_query(query)
+        clauses, params = _filters(query)
+        column = query.sort
+        direction = "DESC" if query.descending else "ASC"
+        order = f"{column} {direction}" if column == "id" else f"{column} {direction}, id {direction}"
+        after_clauses, after_params = list(clauses), list(params)
+        if query.cursor is not None:
+            value, calc_id = decode_cursor(column, query.cursor)
+            operator = "<" if query.descending else ">"
+            after_clauses.append(f"({column} {operator} ? OR ({column} = ? AND id {operator} ?))")
+            after_params += [value, value, calc_id]
+        # One row past the page tells whether another page follows.
+        limit = -1 if query.limit is None else query.limit + 1
+        with self._lock:
+            (total,) = self.connection.execute(f"{COUNT}{_where(clauses)}", params).fetchone()
+            rows = self.connection.execute(
+                f"SELECT {COLUMNS} FROM calculations{_where(after_clauses)} ORDER BY {order} LIMIT ? OFFSET ?",
+                after_params + [limit, query.offset],
+            ).fetchall()
+        items = [_row_to_calculation(row) for row in rows[:query.limit]]
+        next_cursor = None
+        if query.limit is not None and len(rows) > query.limit:
+            next_cursor = encode_cursor(column, *items[-1])
+        return Page(items=items, total=total, next_cursor=next_cursor)
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self.connection.execute(COUNT).fetchone()
+        return count
+
+    def close(self) -> None:
+        with self._lock:
+            self.connection.close()
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from loan_calculator.accrual_index import accrual_index, accrued_between, accrued_between_many
+from loan_calculator.cache import invalidate_calculation, result_cache
+from loan_calculator.data_store import CalculationData
+from loan_calculator.interest_calculations import daily_interest_columns, total_interest
+
+def loan(method="compound", exclude_weekends=True):
+    return CalculationData(
+        start_date="2024-01-03",
+        end_date="2026-05-17",
+        amount=250000.0,
+        currency="EUR",
+        base_rate=4.0,
+        margin=1.5,
+        exclude_weekends=exclude_weekends,
+        method=method
+    )
+
+def filtered_sum(calc, from_date, to_date, with_margin=True):
+    columns = daily_interest_columns(calc)
+    keep = (columns.dates >= np.datetime64(from_date)) & (columns.dates <= np.datetime64(to_date))
+    values = columns.margin_interest if with_margin else columns.base_interest
+    return values[keep].sum()
+
+@pytest.mark.parametrize("method", ["simple", "compound"])
+@pytest.mark.parametrize("exclude_weekends", [False, True])
+def test_range_matches_filtered_daily_schedule(method, exclude_weekends):
+    calc = loan(method, exclude_weekends)
+    for from_date, to_date in [("2024-01-03", "2024-01-03"), ("2024-02-10", "2024-02-11"), ("2024-03-01", "2025-07-15")]:
+        assert accrued_between(calc, from_date, to_date) == pytest.approx(filtered_sum(calc, from_date, to_date))
+        assert accrued_between(calc, from_date, to_date, with_margin=False) == pytest.approx(
+            filtered_sum(calc, from_date, to_date, with_margin=False)
+        )
+
+def test_dates_outside_the_loan_are_clipped():
+    calc = loan()
+    assert accrued_between(calc, "2000-01-01", "2099-12-31") == pytest.approx(total_interest(calc))
+    assert accrued_between(calc, "2030-01-01", "2030-12-31") == 0.0
+    assert accrued_between(calc, "2024-01-06", "2024-01-07") == 0.0
+
+def test_batch_queries_match_single_queries():
+    calc = loan()
+    from_dates = ["2024-01-03", "2024-06-01", "2025-02-28"]
+    to_dates = ["2024-12-31", "2024-06-30", "2026-05-17"]
+    batch = accrued_between_many(calc, from_dates, to_dates)
+    assert batch.tolist() == [accrued_between(calc, a, b) for a, b in zip(from_dates, to_dates)]
+    assert accrual_index(calc).days_between_many(["2024-01-01"], ["2024-01-07"]).tolist() == [3]
+
+def test_reversed_range_raises():
+    with pytest.raises(ValueError):
+        accrued_between(loan(), "2024-05-01", "2024-04-01")
+
+def test_index_is_built_once_and_invalidated_with_the_calculation():
+    calc = loan("simple", False)
+    invalidate_calculation(calc)
+    first = accrual_index(calc)
+    assert accrual_index(calc) is first
+    assert result_cache.stats().current_bytes >= first.nbytes
+    invalidate_calculation(calc)
+    assert accrual_index(calc) is not first
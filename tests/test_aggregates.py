@@ -0,0 +1,109 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from loan_calculator import data_store
+from loan_calculator.aggregates import aggregates, check_aggregates, portfolio_summary
+from loan_calculator.data_store import CalculationData, MemoryStore, save_calculation, save_calculations, use_store
+from loan_calculator.interest_calculations import total_interest
+
+@pytest.fixture(autouse=True)
+def reset_data_store():
+    data_store.get_store().clear()
+    yield
+
+def loan(amount=10000.0, currency="USD", method="simple", **kwargs):
+    fields = dict(start_date="2024-01-01", end_date="2024-12-31", base_rate=5.0, margin=2.0, exclude_weekends=False)
+    fields.update(kwargs)
+    return CalculationData(amount=amount, currency=currency, method=method, **fields)
+
+def random_loan(rng):
+    currency = rng.choice(["USD", "EUR", "JPY"])
+    return loan(
+        amount=round(rng.uniform(1000, 1000000), 0 if currency == "JPY" else 2),
+        currency=currency,
+        method=rng.choice(["simple", "compound"]),
+        base_rate=round(rng.uniform(0, 8), 3),
+        end_date=rng.choice(["2024-06-30", "2025-12-31", "2030-01-01"]),
+        rounding=rng.choice([None, None, "daily", "total"]),
+    )
+
+def test_summary_totals_per_currency():
+    loans = [loan(), loan(amount=5000.0, method="compound"), loan(currency="EUR")]
+    for calc in loans:
+        save_calculation(calc)
+    rows = portfolio_summary()
+    assert [(row.currency, row.method, row.loans) for row in rows] == [("EUR", None, 1), ("USD", None, 2)]
+    usd = rows[1]
+    assert usd.amount == 15000.0
+    assert usd.interest == pytest.approx(total_interest(loans[0]) + total_interest(loans[1]), abs=0.01)
+    by_method = portfolio_summary(by_method=True)
+    assert [(row.currency, row.method) for row in by_method] == [("EUR", "simple"), ("USD", "compound"), ("USD", "simple")]
+
+def test_overwrite_moves_totals_between_groups():
+    calc_id = save_calculation(loan())
+    save_calculation(loan(currency="EUR"))
+    portfolio_summary()
+    save_calculation(loan(amount=2500.0, currency="GBP"), calc_id)
+    rows = {row.currency: row for row in portfolio_summary()}
+    assert set(rows) == {"EUR", "GBP"}
+    assert rows["GBP"].amount == 2500.0
+    assert check_aggregates() == []
+
+def test_incremental_updates_match_full_rebuild():
+    rng = random.Random(7)
+    save_calculations([random_loan(rng) for _ in range(200)])
+    portfolio_summary()
+    for _ in range(300):
+        save_calculation(random_loan(rng), rng.randrange(220) if rng.random() < 0.7 else -1)
+    save_calculations([random_loan(rng) for _ in range(50)])
+    assert check_aggregates() == []
+
+def test_concurrent_saves_stay_consistent():
+    rng = random.Random(11)
+    save_calculations([random_loan(rng) for _ in range(50)])
+    portfolio_summary()
+    updates = [(random_loan(rng), rng.randrange(60)) for _ in range(400)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda update: save_calculation(*update), updates))
+    assert check_aggregates() == []
+    assert sum(row.loans for row in portfolio_summary()) == len(data_store.get_store())
+
+def test_summary_answers_from_maintained_totals(monkeypatch):
+    save_calculations([loan(amount=1000.0 + i) for i in range(20)])
+    portfolio_summary()
+    save_calculation(loan(currency="EUR"))
+    # A summary after the first must not price the store again.
+    monkeypatch.setattr(aggregates, "rebuild", lambda: pytest.fail("rebuilt"))
+    assert [row.loans for row in portfolio_summary()] == [1, 20]
+
+def test_rebuilds_after_changes_that_bypass_saves():
+    save_calculation(loan())
+    assert portfolio_summary()[0].loans == 1
+    data_store.get_store().clear()
+    assert portfolio_summary() == []
+    previous = use_store(MemoryStore())
+    try:
+        save_calculation(loan(currency="CHF"))
+        assert [row.currency for row in portfolio_summary()] == ["CHF"]
+    finally:
+        use_store(previous)
+    assert portfolio_summary() == []
+
+def test_replacing_a_rate_curve_or_calendar_reprices_totals():
+    from loan_calculator.calendars import register_calendar, unregister_calendar
+    from loan_calculator.rate_curves import register_rate_curve, unregister_rate_curve
+    register_rate_curve("AGG_CURVE", [("2024-01-01", 4.0)])
+    register_calendar("AGG_CAL", ["2024-01-01"])
+    try:
+        save_calculation(loan(rate_curve="AGG_CURVE"))
+        save_calculation(loan(currency="EUR", calendar="AGG_CAL"))
+        before = {row.currency: row.interest_minor for row in portfolio_summary()}
+        register_rate_curve("AGG_CURVE", [("2024-01-01", 4.0), ("2024-06-01", 9.0)])
+        register_calendar("AGG_CAL", ["2024-01-01", "2024-03-01", "2024-03-04"])
+        after = {row.currency: row.interest_minor for row in portfolio_summary()}
+        assert after["USD"] > before["USD"]
+        assert after["EUR"] < before["EUR"]
+        assert check_aggregates() == []
+    finally:
+        unregister_rate_curve("AGG_CURVE")
+        unregister_calendar("AGG_CAL")
@@ -0,0 +1,124 @@
+import pytest
+from loan_calculator.audit_log import AuditLog, INDEX_ENTRY, restore_store
+from loan_calculator.data_store import (
+    CalculationData,
+    MemoryStore,
+    add_save_hook,
+    remove_save_hook,
+    get_store,
+    save_calculation
+)
+
+def make_calc(amount: float) -> CalculationData:
+    return CalculationData(
+        start_date="2024-01-01",
+        end_date="2024-06-30",
+        amount=amount,
+        currency="USD",
+        base_rate=5.0,
+        margin=2.0,
+        exclude_weekends=False,
+        method="simple"
+    )
+
+@pytest.fixture
+def log_path(tmp_path):
+    return str(tmp_path / "audit.log")
+
+@pytest.fixture
+def audit_log(log_path):
+    log = AuditLog(log_path, sync_every=2)
+    yield log
+    log.close()
+
+def test_save_hook_appends_records(audit_log):
+    get_store().clear()
+    add_save_hook(audit_log.append)
+    try:
+        calc_id = save_calculation(make_calc(1000.0))
+        save_calculation(make_calc(2000.0), calc_id)
+    finally:
+        remove_save_hook(audit_log.append)
+        get_store().clear()
+    history = audit_log.history(calc_id)
+    assert [record.op for record in history] == ["create", "update"]
+    assert [record.calculation.amount for record in history] == [1000.0, 2000.0]
+    assert [record.seq for record in history] == [0, 1]
+
+def test_history_uses_side_index(audit_log, log_path):
+    for version in range(5):
+        audit_log.append(1, make_calc(100.0 + version))
+        audit_log.append(2, make_calc(200.0 + version))
+    audit_log.sync()
+    with open(log_path + ".idx", "rb") as index:
+        entries = list(INDEX_ENTRY.iter_unpack(index.read()))
+    assert [calc_id for calc_id, _ in entries] == [1, 2] * 5
+    assert [r.calculation.amount for r in audit_log.history(2)] == [200.0, 201.0, 202.0, 203.0, 204.0]
+    assert audit_log.history(3) == []
+
+def test_replay_rebuilds_latest_versions(log_path):
+    log = AuditLog(log_path)
+    log.append(0, make_calc(1.0))
+    log.append(1, make_calc(2.0))
+    log.append(0, make_calc(3.0), make_calc(1.0))
+    log.close()
+
+    reopened = AuditLog(log_path)
+    store = MemoryStore()
+    assert restore_store(reopened, store) == 2
+    assert sorted(store.list(), key=lambda item: item[0]) == [(0, make_calc(3.0)), (1, make_calc(2.0))]
+    assert [record.calc_id for record in reopened.replay()] == [0, 1, 0]
+    assert store.next_id == 2
+    assert reopened.seq == 3
+    assert len(reopened.history(0)) == 2
+    reopened.close()
+
+def test_replay_ignores_torn_final_line(log_path):
+    log = AuditLog(log_path)
+    log.append(0, make_calc(1.0))
+    log.close()
+    with open(log_path, "ab") as raw:
+        raw.write(b'{"seq":1,"ts":0,"op":"cre')
+
+    reopened = AuditLog(log_path)
+    assert [record.calc_id for record in reopened.replay()] == [0]
+    assert restore_store(reopened, MemoryStore()) == 1
+    reopened.close()
+
+def test_append_after_torn_writes(log_path):
+    log = AuditLog(log_path)
+    log.append(0, make_calc(1.0))
+    log.append(1, make_calc(2.0))
+    log.close()
+    with open(log_path, "ab") as raw:
+        raw.write(b'[2,0,"cre')
+    with open(log_path + ".idx", "ab") as raw:
+        raw.write(b"\x01\x02\x03")
+
+    reopened = AuditLog(log_path)
+    assert reopened.seq == 2
+    reopened.append(2, make_calc(3.0))
+    reopened.append(2, make_calc(4.0), make_calc(3.0))
+    reopened.close()
+
+    recovered = AuditLog(log_path)
+    assert [record.seq for record in recovered.replay()] == [0, 1, 2, 3]
+    assert [record.calculation.amount for record in recovered.history(2)] == [3.0, 4.0]
+    assert recovered.seq == 4
+    recovered.close()
+
+def test_reindexes_lines_missing_from_index(log_path):
+    log = AuditLog(log_path)
+    for calc_id in range(3):
+        log.append(calc_id, make_calc(1.0 + calc_id))
+    log.close()
+    with open(log_path + ".idx", "r+b") as index:
+        index.truncate(INDEX_ENTRY.size)
+
+    reopened = AuditLog(log_path)
+    assert [record.calculation.amount for record in reopened.history(2)] == [3.0]
+    assert restore_store(reopened, MemoryStore()) == 3
+    reopened.close()
+
+def test_empty_log_replays_nothing(audit_log):
+    assert list(audit_log.replay()) == []
@@ -0,0 +1,137 @@
+import csv
+import json
+import pytest
+from loan_calculator.batch import (
+    OUTPUT_FIELDS,
+    main,
+    process_chunk,
+    run_batch,
+    run_batch_file,
+    validate_row
+)
+from loan_calculator.data_store import CalculationData
+from loan_calculator.interest_calculations import daily_interest_data, total_interest
+
+def make_row(index: int, **overrides) -> dict:
+    row = {
+        "start_date": "2024-01-01",
+        "end_date": f"2024-{index % 12 + 1:02d}-28",
+        "amount": str(1000 + index),
+        "currency": "usd",
+        "base_rate": "5.0",
+        "margin": "2.0",
+        "exclude_weekends": "true" if index % 2 else "false",
+        "method": "compound" if index % 3 == 0 else "simple",
+    }
+    row.update(overrides)
+    return row
+
+def write_csv(path, rows):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+def test_validate_row_normalizes_values():
+    calc = validate_row(make_row(1))
+    assert calc == CalculationData("2024-01-01", "2024-02-28", 1001.0, "USD", 5.0, 2.0, True, "simple")
+
+@pytest.mark.parametrize("overrides, message", [
+    ({"end_date": "2023-12-31"}, "End date must be after start date."),
+    ({"start_date": "01-01-2024"}, "does not match format"),
+    ({"amount": "lots"}, "could not convert"),
+    ({"method": "weird"}, "Unknown method: weird"),
+    ({"exclude_weekends": "maybe"}, "Invalid exclude_weekends value"),
+    ({"currency": ""}, "Missing fields: currency"),
+])
+def test_process_chunk_reports_invalid_rows(overrides, message):
+    [result] = process_chunk([(7, make_row(1, **overrides))])
+    assert result["row"] == 7
+    assert result["total_interest"] is None
+    assert message in result["error"]
+
+def test_process_chunk_matches_single_loan_totals():
+    rows = [(i, make_row(i)) for i in range(1, 30)]
+    for (_, row), result in zip(rows, process_chunk(rows)):
+        calc = validate_row(row)
+        assert result["error"] is None
+        assert result["total_interest"] == total_interest(calc)
+        assert result["total_interest_no_margin"] == total_interest(calc, with_margin=False)
+
+def test_run_batch_preserves_input_order_across_workers():
+    rows = [make_row(i) for i in range(1, 200)]
+    rows[50]["amount"] = "oops"
+    results = list(run_batch(rows, workers=2, chunk_size=7))
+    assert [result["row"] for result in results] == list(range(1, 200))
+    assert results[50]["error"] is not None
+    assert results == list(run_batch(rows, workers=1, chunk_size=1000))
+
+def test_run_batch_file_csv(tmp_path):
+    source = tmp_path / "loans.csv"
+    target = tmp_path / "totals.csv"
+    write_csv(source, [make_row(i) for i in range(1, 11)] + [make_row(11, end_date="2020-01-01")])
+    assert run_batch_file(str(source), str(target), workers=1, chunk_size=3) == (11, 1)
+    with open(target, newline="") as f:
+        reader = csv.DictReader(f)
+        assert reader.fieldnames == OUTPUT_FIELDS
+        output = list(reader)
+    assert [row["row"] for row in output] == [str(i) for i in range(1, 12)]
+    assert float(output[0]["total_interest"]) == total_interest(validate_row(make_row(1)))
+    assert output[-1]["error"] == "End date must be after start date."
+
+def test_run_batch_file_jsonl_with_schedules(tmp_path):
+    source = tmp_path / "loans.jsonl"
+    target = tmp_path / "totals.jsonl"
+    source.write_text("\n".join(json.dumps(make_row(i)) for i in range(1, 4)) + "\n")
+    assert run_batch_file(str(source), str(target), workers=1, schedules=True) == (3, 0)
+    output = [json.loads(line) for line in target.read_text().splitlines()]
+    assert output[1]["schedule"] == daily_interest_data(validate_row(make_row(2)))
+
+def test_schedules_require_jsonl(tmp_path):
+    source = tmp_path / "loans.csv"
+    write_csv(source, [make_row(1)])
+    with pytest.raises(ValueError, match="JSONL"):
+        run_batch_file(str(source), str(tmp_path / "out.csv"), schedules=True)
+
+def test_main_entry_point(tmp_path, capsys):
+    source = tmp_path / "loans.csv"
+    write_csv(source, [make_row(i) for i in range(1, 4)])
+    assert main([str(source), str(tmp_path / "out.csv"), "--workers", "1"]) == 0
+    assert "Processed 3 rows (0 invalid)" in capsys.readouterr().out
+    assert main([str(tmp_path / "missing.csv"), str(tmp_path / "out.csv")]) == 1
+
+def test_run_batch_file_parallel_matches_inline(tmp_path):
+    source = tmp_path / "loans.csv"
+    write_csv(source, [make_row(i) for i in range(1, 120)])
+    run_batch_file(str(source), str(tmp_path / "inline.jsonl"), workers=1, chunk_size=1000)
+    assert run_batch_file(str(source), str(tmp_path / "parallel.jsonl"), workers=3, chunk_size=8) == (119, 0)
+    assert (tmp_path / "inline.jsonl").read_text() == (tmp_path / "parallel.jsonl").read_text()
+
+def test_run_batch_file_requires_csv_header(tmp_path):
+    source = tmp_path / "empty.csv"
+    source.write_text("")
+    with pytest.raises(ValueError, match="no CSV header"):
+        run_batch_file(str(source), str(tmp_path / "out.csv"), workers=1)
+
+def test_malformed_jsonl_lines_are_invalid_rows(tmp_path):
+    source = tmp_path / "loans.jsonl"
+    target = tmp_path / "totals.jsonl"
+    source.write_text(json.dumps(make_row(1)) + "\nnot json\n[1,2]\n" + json.dumps(make_row(4)) + "\n")
+    assert run_batch_file(str(source), str(target), workers=1) == (4, 2)
+    output = [json.loads(line) for line in target.read_text().splitlines()]
+    assert [row["row"] for row in output] == [1, 2, 3, 4]
+    assert output[1]["error"].startswith("Invalid JSON")
+    assert output[2]["error"] == "Row must be a JSON object."
+    assert output[3]["error"] is None
+
+def test_csv_quoted_fields_spanning_lines_stay_in_one_chunk(tmp_path):
+    source = tmp_path / "loans.csv"
+    target = tmp_path / "totals.jsonl"
+    rows = [make_row(i) for i in range(1, 7)]
+    rows[2]["currency"] = "usd\n\"quoted\"\nmore"
+    write_csv(source, rows)
+    assert run_batch_file(str(source), str(target), workers=2, chunk_size=3) == (6, 0)
+    output = [json.loads(line) for line in target.read_text().splitlines()]
+    assert [row["row"] for row in output] == list(range(1, 7))
+    assert output[2]["currency"] == "USD\n\"QUOTED\"\nMORE"
+    assert output[3]["amount"] == 1004.0
@@ -0,0 +1,89 @@
+import json
+import pytest
+from loan_calculator.benchmarks import (
+    Scenario,
+    compare_results,
+    default_scenarios,
+    load_results,
+    main,
+    percentile,
+    run_benchmarks,
+    write_results,
+)
+
+def result(name, **metrics):
+    values = {"p50_s": 1.0, "p95_s": 2.0, "throughput": 100.0, "peak_bytes": 1000}
+    values.update(metrics)
+    return {name: {"name": name, **values}}
+
+def test_percentile_nearest_rank():
+    samples = sorted(float(i) for i in range(1, 101))
+    assert percentile(samples, 0.50) == 50.0
+    assert percentile(samples, 0.95) == 95.0
+    assert percentile([3.0], 0.99) == 3.0
+
+def test_default_scenarios_cover_requested_shapes():
+    names = [scenario.name for scenario in default_scenarios()]
+    assert len(names) == len(set(names))
+    for expected in (
+        "daily_interest_data/30y/compound/weekdays",
+        "total_interest/1m/simple/cold",
+        "save_calculation/memory",
+        "show_render/1y",
+        "portfolio_total_interest/100000",
+    ):
+        assert expected in names
+
+def test_run_benchmarks_measures_and_filters():
+    calls = []
+    resets = []
+    scenarios = [
+        Scenario("fast/one", lambda: lambda: calls.append(bytearray(4096)), items=4, repeat=5, reset=lambda: resets.append(1)),
+        Scenario("fast/slow", lambda: lambda: None, slow=True),
+        Scenario("other", lambda: lambda: None),
+    ]
+    results = run_benchmarks(scenarios, pattern="fast", quick=True)
+    assert [r.name for r in results] == ["fast/one"]
+    (measured,) = results
+    assert measured.repeat == 3
+    assert len(calls) == 1 + 3 + 1
+    assert len(resets) == 3 + 1
+    assert measured.p50_s <= measured.p95_s <= measured.p99_s
+    assert measured.throughput > 0
+    assert measured.peak_bytes >= 4096
+
+def test_compare_flags_regressions_beyond_threshold():
+    baseline = {**result("a"), **result("b"), **result("gone")}
+    current = {
+        **result("a", p50_s=1.1, throughput=70.0),
+        **result("b", p95_s=1.0, peak_bytes=1500),
+    }
+    regressions = compare_results(baseline, current, threshold=0.2)
+    assert [(r.name, r.metric) for r in regressions] == [("a", "throughput"), ("b", "peak_bytes")]
+    assert regressions[0].change == pytest.approx(-0.3)
+    assert compare_results(baseline, current, threshold=0.2, metrics=["p50_s"]) == []
+
+def test_results_round_trip_and_compare_exit_status(tmp_path, capsys):
+    scenarios = [Scenario("noop", lambda: lambda: None, repeat=2)]
+    baseline_path = tmp_path / "baseline.json"
+    write_results(str(baseline_path), run_benchmarks(scenarios))
+    assert set(load_results(str(baseline_path))) == {"noop"}
+
+    document = json.loads(baseline_path.read_text())
+    document["results"][0]["p50_s"] *= 10
+    current_path = tmp_path / "current.json"
+    current_path.write_text(json.dumps(document))
+
+    assert main(["compare", str(baseline_path), str(baseline_path)]) == 0
+    assert main(["compare", str(baseline_path), str(current_path)]) == 1
+    assert "REGRESSION noop p50_s" in capsys.readouterr().out
+
+def test_compare_rejects_unknown_version(tmp_path):
+    path = tmp_path / "old.json"
+    path.write_text(json.dumps({"version": 0, "results": []}))
+    assert main(["compare", str(path), str(path)]) == 2
+
+def test_run_command_writes_results(tmp_path):
+    output = tmp_path / "results.json"
+    assert main(["run", "--filter", "total_interest/1m/simple", "--quick", "--output", str(output)]) == 0
+    assert set(load_results(str(output))) == {"total_interest/1m/simple/cold", "total_interest/1m/simple/warm"}
@@ -0,0 +1,137 @@
+import pytest
+from loan_calculator.cache import (
+    ResultCache,
+    ENTRY_BYTES,
+    ROW_BYTES,
+    cached,
+    estimate_size,
+    result_cache
+)
+from loan_calculator.data_store import CalculationData, get_store, save_calculation
+from loan_calculator.interest_calculations import daily_schedule, schedule_profile, total_interest, unit_schedule
+
+@pytest.fixture(autouse=True)
+def reset_state():
+    get_store().clear()
+    result_cache.clear()
+    yield
+    get_store().clear()
+    result_cache.clear()
+
+@pytest.fixture
+def calc():
+    return CalculationData(
+        start_date="2024-01-01",
+        end_date="2024-01-10",
+        amount=1000.0,
+        currency="USD",
+        base_rate=5.0,
+        margin=2.0,
+        exclude_weekends=False,
+        method="simple"
+    )
+
+def test_estimate_size_counts_rows():
+    assert estimate_size(1.5) == ENTRY_BYTES
+    assert estimate_size([{}] * 10) == ENTRY_BYTES + 10 * ROW_BYTES
+
+def test_hits_and_misses():
+    cache = ResultCache(max_bytes=10_000)
+    assert cache.get("a") is None
+    cache.put("a", 1.0)
+    assert cache.get("a") == 1.0
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (1, 1, 1)
+    assert stats.hit_ratio == 0.5
+
+def test_evicts_least_recently_used_within_budget():
+    cache = ResultCache(max_bytes=3 * ENTRY_BYTES)
+    cache.put("a", 1.0)
+    cache.put("b", 2.0)
+    cache.put("c", 3.0)
+    cache.get("a")
+    cache.put("d", 4.0)
+    assert "b" not in cache
+    assert "a" in cache and "c" in cache and "d" in cache
+    assert cache.stats().evictions == 1
+    assert cache.current_bytes <= cache.max_bytes
+
+def test_oversized_value_is_not_cached():
+    cache = ResultCache(max_bytes=ENTRY_BYTES + ROW_BYTES)
+    cache.put("big", [0] * 5)
+    assert len(cache) == 0
+    assert cache.current_bytes == 0
+
+def test_resize_evicts_down_to_budget():
+    cache = ResultCache(max_bytes=10 * ENTRY_BYTES)
+    for key in range(10):
+        cache.put(key, float(key))
+    cache.resize(4 * ENTRY_BYTES)
+    assert len(cache) == 4
+    assert 9 in cache and 0 not in cache
+
+def test_invalidate_removes_all_entries_for_owner():
+    cache = ResultCache()
+    cache.put(("f", "x"), 1.0, owner="x")
+    cache.put(("g", "x"), 2.0, owner="x")
+    cache.put(("f", "y"), 3.0, owner="y")
+    assert cache.invalidate("x") == 2
+    assert len(cache) == 1
+    assert cache.stats().invalidations == 2
+
+def test_cached_decorator_memoizes():
+    cache = ResultCache()
+    calls = []
+
+    @cached(cache)
+    def double(value, factor=2):
+        calls.append(value)
+        return value * factor
+
+    assert double(3) == 6
+    assert double(3) == 6
+    assert double(3, factor=3) == 9
+    assert calls == [3, 3]
+    assert double.cache is cache
+
+def test_interest_functions_share_result_cache(calc):
+    hits_before = result_cache.stats().hits
+    schedule = daily_schedule(calc)
+    total_interest(calc)
+    assert daily_schedule(calc) is schedule
+    stats = result_cache.stats()
+    # The schedule, the total and the unit schedule behind the schedule.
+    assert stats.entries == 3
+    assert stats.hits - hits_before == 1
+    unit = unit_schedule(schedule_profile(calc))
+    assert stats.current_bytes == 3 * ENTRY_BYTES + schedule.nbytes + unit.nbytes
+
+def test_overwriting_calculation_invalidates_cache(calc):
+    calc_id = save_calculation(calc)
+    daily_schedule(calc)
+    total_interest(calc)
+    invalidations_before = result_cache.stats().invalidations
+    updated = CalculationData(
+        start_date="2024-01-01",
+        end_date="2024-02-10",
+        amount=1000.0,
+        currency="USD",
+        base_rate=5.0,
+        margin=2.0,
+        exclude_weekends=False,
+        method="simple"
+    )
+    save_calculation(updated, calc_id)
+    assert result_cache.stats().invalidations - invalidations_before == 2
+    assert daily_schedule.cache_key(calc) not in result_cache
+    # The update only extends the loan, so the old schedule is carried over;
+    # the unit schedule belongs to the profile, not the loan, and stays.
+    assert len(result_cache) == 2
+    assert daily_schedule.cache_key(updated) in result_cache
+    assert unit_schedule.cache_key(schedule_profile(calc)) in result_cache
+
+def test_resaving_same_calculation_keeps_cache(calc):
+    calc_id = save_calculation(calc)
+    total_interest(calc)
+    save_calculation(calc, calc_id)
+    assert len(result_cache) == 1
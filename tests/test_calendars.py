@@ -0,0 +1,134 @@
+from datetime import date, timedelta
+import numpy as np
+import pytest
+from loan_calculator.calendars import (
+    compile_calendar,
+    get_calendar,
+    has_calendar,
+    register_calendar,
+    unregister_calendar,
+)
+from loan_calculator.cache import result_cache
+from loan_calculator.data_store import CalculationData
+from loan_calculator.interest_calculations import closed_form_interest, daily_interest_columns, total_interest
+from loan_calculator.periods import period_breakdown
+from loan_calculator.portfolio import portfolio_daily_interest, portfolio_total_interest
+
+HOLIDAYS = ["2024-01-01", "2024-05-27", "2024-07-04", "2024-12-25", "2025-01-01", "2025-07-04", "2025-12-25"]
+
+def day_number(text):
+    return (date.fromisoformat(text) - date(1970, 1, 1)).days
+
+def brute_force(first, last, holidays):
+    day = date.fromisoformat(first)
+    count = 0
+    while day <= date.fromisoformat(last):
+        if day.weekday() < 5 and day.isoformat() not in holidays:
+            count += 1
+        day += timedelta(days=1)
+    return count
+
+@pytest.fixture
+def usd():
+    calendar = register_calendar("test_usd", HOLIDAYS)
+    result_cache.clear()
+    yield calendar
+    unregister_calendar("test_usd")
+    result_cache.clear()
+
+def loan(method="simple", start="2023-11-20", end="2026-02-10", calendar="TEST_USD"):
+    return CalculationData(
+        start_date=start,
+        end_date=end,
+        amount=50000.0,
+        currency="USD",
+        base_rate=5.0,
+        margin=1.0,
+        exclude_weekends=False,
+        method=method,
+        calendar=calendar
+    )
+
+@pytest.mark.parametrize("first, last", [
+    ("2024-01-01", "2024-01-31"),
+    ("2023-12-25", "2024-01-02"),
+    ("2022-03-01", "2027-06-30"),
+    ("2026-01-01", "2026-01-31"),
+    ("2024-07-05", "2024-07-04"),
+])
+def test_business_day_counts_match_brute_force(usd, first, last):
+    expected = brute_force(first, last, set(HOLIDAYS)) if first <= last else 0
+    assert int(usd.business_days_between(day_number(first), day_number(last))) == expected
+
+def test_counts_are_vectorized(usd):
+    firsts = np.array([day_number("2024-01-01"), day_number("2025-06-01")])
+    lasts = np.array([day_number("2024-12-31"), day_number("2025-07-31")])
+    assert usd.business_days_between(firsts, lasts).tolist() == [
+        brute_force("2024-01-01", "2024-12-31", set(HOLIDAYS)),
+        brute_force("2025-06-01", "2025-07-31", set(HOLIDAYS)),
+    ]
+
+def test_is_business_day(usd):
+    days = np.arange(day_number("2023-12-29"), day_number("2024-01-09"))
+    expected = [
+        (date(1970, 1, 1) + timedelta(days=int(d))).weekday() < 5
+        and (date(1970, 1, 1) + timedelta(days=int(d))).isoformat() not in HOLIDAYS
+        for d in days
+    ]
+    assert usd.is_business_day(days).tolist() == expected
+
+def test_calendar_covers_full_years():
+    calendar = compile_calendar("X", ["2024-03-01"])
+    assert calendar.first_day == day_number("2024-01-01")
+    assert calendar.last_day == day_number("2024-12-31")
+    with pytest.raises(ValueError):
+        compile_calendar("EMPTY", [])
+
+@pytest.mark.parametrize("method", ["simple", "compound"])
+def test_engines_agree_under_a_calendar(usd, method):
+    calc = loan(method)
+    columns = daily_interest_columns(calc)
+    assert len(columns) == brute_force(calc.start_date, calc.end_date, set(HOLIDAYS))
+    holiday_dates = np.array(HOLIDAYS, dtype="datetime64[D]")
+    assert not np.isin(columns.dates, holiday_dates).any()
+    assert closed_form_interest(calc) == pytest.approx(columns.margin_interest.sum())
+    assert period_breakdown(calc, "monthly").margin_interest.sum() == pytest.approx(total_interest(calc))
+
+def test_portfolio_matches_single_loans(usd):
+    loans = [loan("simple"), loan("compound"), loan("compound", calendar=None)]
+    totals = portfolio_total_interest(loans)
+    assert totals.tolist() == [closed_form_interest(calc) for calc in loans]
+    for calc, columns in zip(loans, portfolio_daily_interest(loans)):
+        assert np.array_equal(columns.dates, daily_interest_columns(calc).dates)
+
+def test_reregistering_a_calendar_invalidates_cached_results(usd):
+    calc = loan(start="2024-02-01", end="2024-02-29")
+    first = total_interest(calc)
+    days = len(daily_interest_columns(calc).dates)
+    register_calendar("test_usd", HOLIDAYS + ["2024-02-19", "2024-02-20"])
+    assert len(daily_interest_columns(calc).dates) == days - 2
+    assert total_interest(calc) < first
+
+def test_calendars_load_from_directory(tmp_path, monkeypatch):
+    (tmp_path / "GBPX.txt").write_text("# UK bank holidays\n2024-12-25 Christmas Day\n\n2024-12-26 Boxing Day\n")
+    monkeypatch.setenv("LOAN_CALCULATOR_CALENDAR_DIR", str(tmp_path))
+    try:
+        assert not has_calendar("nope")
+        calendar = get_calendar("gbpx")
+        assert calendar.name == "GBPX"
+        assert int(calendar.business_days_between(day_number("2024-12-23"), day_number("2024-12-27"))) == 3
+    finally:
+        unregister_calendar("GBPX")
+
+def test_unknown_calendar_raises():
+    with pytest.raises(ValueError, match="Unknown calendar"):
+        daily_interest_columns(loan(calendar="MISSING"))
+
+def test_calendar_names_cannot_leave_the_directory(tmp_path, monkeypatch):
+    directory = tmp_path / "calendars"
+    directory.mkdir()
+    (tmp_path / "OUTSIDE.txt").write_text("2024-12-25\n")
+    monkeypatch.setenv("LOAN_CALCULATOR_CALENDAR_DIR", str(directory))
+    assert not has_calendar("../outside")
+    with pytest.raises(ValueError, match="Unknown calendar"):
+        get_calendar("../OUTSIDE")
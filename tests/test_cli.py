@@ -0,0 +1,230 @@
+import io
+import subprocess
+import sys
+import time
+import pytest
+from loan_calculator import data_store
+from loan_calculator.main import main, run_command
+
+@pytest.fixture(autouse=True)
+def reset_data_store():
+    data_store.get_store().clear()
+    yield
+
+def run(*argv):
+    stdout, stderr = io.StringIO(), io.StringIO()
+    code = run_command(argv, stdout, stderr)
+    return code, stdout.getvalue(), stderr.getvalue()
+
+def test_calculate_saves_and_shows_schedule():
+    code, out, err = run("calculate", "2024-01-01", "2024-01-04", "1000", "usd", "5", "1")
+    assert code == 0
+    assert "Calculation saved with ID: 0" in err
+    assert "2024-01-04" in out
+    assert "Total Interest: 0.66 USD" in out
+
+def test_show_and_list_after_calculate():
+    run("calculate", "2024-01-01", "2024-01-04", "1000", "usd", "5", "1")
+    code, out, _ = run("show", "0", "--limit", "2", "--page", "2")
+    assert code == 0
+    assert "Page 2 of 2" in out
+    code, out, _ = run("list")
+    assert code == 0
+    assert "USD" in out
+
+def test_errors_set_exit_status():
+    code, _, err = run("show", "42")
+    assert code == 1
+    assert "Calculation not found." in err
+    code, _, err = run("calculate", "2024-01-04", "2024-01-01", "1000", "USD", "5", "1")
+    assert code == 1
+    assert "End date must be after start date." in err
+
+def test_usage_errors_return_two():
+    assert run("bogus")[0] == 2
+    assert run("calculate", "2024-01-01")[0] == 2
+
+def test_history_without_audit_log():
+    code, _, err = run("history", "0")
+    assert code == 1
+    assert "Audit log is not enabled" in err
+
+def test_main_dispatches_one_shot_command(capsys, monkeypatch):
+    monkeypatch.delenv("LOAN_CALCULATOR_DB", raising=False)
+    monkeypatch.delenv("LOAN_CALCULATOR_AUDIT_LOG", raising=False)
+    assert main(["list"]) == 1
+    assert "No calculations found." in capsys.readouterr().err
+
+def test_import_does_not_load_heavy_dependencies():
+    code = (
+        "import sys, loan_calculator.main; "
+        "print(','.join(m for m in ('cmd2', 'tabulate', 'loguru', 'numpy') if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == ""
+
+def test_importing_main_does_not_start_the_shell():
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", "import loan_calculator.main"],
+        input="", capture_output=True, text=True, timeout=30,
+    )
+    assert result.returncode == 0
+    assert "Welcome" not in result.stdout
+    assert time.perf_counter() - started < 5
+
+def test_show_streams_one_table(monkeypatch):
+    from loan_calculator.main import LoanCommands
+    monkeypatch.setattr(LoanCommands, "show_chunk_rows", 3)
+    run("calculate", "2024-01-01", "2024-01-31", "1000", "usd", "5", "1")
+    code, out, _ = run("show", "0", "--limit", "8", "--page", "3")
+    assert code == 0
+    lines = out.splitlines()
+    assert sum("Accrual Date" in line for line in lines) == 1
+    assert [line[2:12] for line in lines if line.startswith("│ 2024")] == [f"2024-01-{day}" for day in range(17, 25)]
+    assert sum(line.startswith("├") for line in lines) == 7
+    assert len({len(line) for line in lines if line and line[0] in "╒│├╞╘"}) == 1
+
+def test_show_period_breakdown():
+    run("calculate", "2024-01-15", "2024-06-30", "10000", "usd", "5", "1")
+    code, out, _ = run("show", "0", "--period", "quarterly")
+    assert code == 0
+    assert "2024-01-15" in out and "2024-04-01" in out
+    assert "2024-02-01" not in out
+    assert "Total Interest: 276.16 USD" in out
+    code, out, _ = run("show", "0", "--period", "monthly", "--limit", "4", "--page", "2")
+    assert code == 0
+    assert "2024-05-01" in out and "Page 2 of 2" in out
+
+def test_accrued_between_dates():
+    run("calculate", "2024-01-01", "2024-12-31", "10000", "usd", "5", "1")
+    code, out, _ = run("accrued", "0", "2024-03-01", "2024-03-31")
+    assert code == 0
+    assert "(31 days)" in out
+    assert "Interest (With Margin): 50.96 USD" in out
+    code, _, err = run("accrued", "0", "2024-03-31", "2024-03-01")
+    assert code == 1
+    assert "End date must not be before start date." in err
+
+def test_calculate_with_holiday_calendar(tmp_path, monkeypatch):
+    (tmp_path / "TESTCAL.txt").write_text("2024-01-01\n2024-01-15\n")
+    monkeypatch.setenv("LOAN_CALCULATOR_CALENDAR_DIR", str(tmp_path))
+    code, out, _ = run("calculate", "2024-01-01", "2024-01-20", "1000", "usd", "5", "1", "--calendar", "testcal")
+    assert code == 0
+    assert "2024-01-15" not in out
+    assert "2024-01-19" in out
+    code, out, _ = run("list")
+    assert "TESTCAL" in out
+    code, _, err = run("calculate", "2024-01-01", "2024-01-20", "1000", "usd", "5", "1", "--calendar", "nope")
+    assert code == 1
+    assert "Unknown calendar: nope" in err
+
+def test_calculate_with_rate_curve(tmp_path, monkeypatch):
+    (tmp_path / "TESTCURVE.csv").write_text("date,rate\n2024-01-10,9.0\n")
+    monkeypatch.setenv("LOAN_CALCULATOR_RATE_DIR", str(tmp_path))
+    code, out, _ = run("calculate", "2024-01-01", "2024-01-20", "36500", "usd", "5", "0", "--rate-curve", "testcurve")
+    assert code == 0
+    # Nine days at 5% and eleven at 9%.
+    assert "Total Interest: 144.00 USD" in out
+    code, out, _ = run("list")
+    assert "TESTCURVE" in out
+    code, _, err = run("calculate", "2024-01-01", "2024-01-20", "1000", "usd", "5", "1", "--rate-curve", "nope")
+    assert code == 1
+    assert "Unknown rate curve: nope" in err
+
+def test_list_filters_and_cursor():
+    for amount, currency in [("1000", "usd"), ("2000", "eur"), ("3000", "usd"), ("4000", "usd")]:
+        run("calculate", "2024-01-01", "2024-01-10", amount, currency, "5", "1", "--period", "monthly")
+    code, out, _ = run("list", "--currency", "usd", "--sort", "amount", "--desc", "--limit", "2")
+    assert code == 0
+    # Total interest of the 4000 and 3000 loans, not the 1000 one.
+    assert "6.58" in out and "4.93" in out and "1.64" not in out
+    assert "Showing 2 of 3 calculations." in out
+    cursor = out.split("list --cursor ")[1].split()[0]
+    code, out, _ = run("list", "--currency", "usd", "--sort", "amount", "--desc", "--limit", "2", "--cursor", cursor)
+    assert "1.64" in out and "6.58" not in out
+    assert "Next page" not in out
+    code, _, err = run("list", "--currency", "gbp")
+    assert code == 1
+    assert "No calculations found." in err
+    code, _, err = run("list", "--start-from", "2024-13-01")
+    assert code == 1
+
+@pytest.mark.parametrize("store", ["memory", "sharded", "sqlite"])
+def test_unpadded_dates_filter_alike_in_every_store(store):
+    from loan_calculator.sqlite_store import SQLiteStore
+    previous = data_store.use_store({"memory": data_store.MemoryStore, "sharded": data_store.ShardedMemoryStore, "sqlite": SQLiteStore}[store]())
+    try:
+        run("calculate", "2024-1-5", "2024-3-1", "1000", "usd", "5", "1")
+        run("calculate", "2024-02-10", "2024-03-01", "2000", "usd", "5", "1")
+        assert data_store.get_calculation(0).start_date == "2024-01-05"
+        code, out, _ = run("list", "--start-from", "2024-02-01")
+        assert code == 0
+        assert "2024-02-10" in out and "2024-01-05" not in out
+        page = data_store.get_store().query(data_store.ListQuery(start_to="2024-2-1"))
+        assert [calc_id for calc_id, _ in page.items] == [0]
+    finally:
+        data_store.use_store(previous)
+
+def test_stats_reports_timed_operations(tmp_path):
+    from loan_calculator.metrics import metrics
+    metrics.reset()
+    run("calculate", "2024-01-01", "2024-01-04", "1000", "usd", "5", "1")
+    code, out, _ = run("stats")
+    assert code == 0
+    assert "store.save" in out
+    assert "hit ratio" in out
+    code, out, _ = run("stats", "--format", "prometheus", "--reset")
+    assert 'loan_calculator_calls_total{operation="store.save"} 1\n' in out
+    code, out, _ = run("stats", "--format", "json")
+    assert '"store.save"' not in out
+    code, _, err = run("stats", "--output", str(tmp_path / "metrics.prom"))
+    assert code == 0
+    assert "loan_calculator_cache_hits_total" in (tmp_path / "metrics.prom").read_text()
+
+def test_profile_flag_writes_pstats_file(tmp_path, capsys):
+    import pstats
+    path = tmp_path / "run.prof"
+    assert main([f"--profile={path}", "calculate", "2024-01-01", "2024-01-04", "1000", "usd", "5", "1"]) == 0
+    assert f"Profile written to {path}" in capsys.readouterr().err
+    assert pstats.Stats(str(path)).total_calls > 0
+
+def test_calculate_with_fixed_point_rounding():
+    code, out, _ = run("calculate", "2024-01-01", "2024-01-10", "182.50", "usd", "1", "0", "--rounding", "daily")
+    assert code == 0
+    assert "Total Interest: 0.10 USD" in out
+    code, _, err = run("calculate", "2024-01-01", "2024-01-10", "182.505", "usd", "1", "0", "--rounding", "total")
+    assert code == 1
+    assert "Amount 182.505 has more decimal places" in err
+
+def test_summary_reports_currency_totals():
+    run("calculate", "2024-01-01", "2024-12-31", "1000", "usd", "5", "1")
+    run("calculate", "2024-01-01", "2024-12-31", "3000", "usd", "5", "1", "--method", "compound")
+    run("calculate", "2024-01-01", "2024-12-31", "2000", "eur", "5", "1")
+    code, out, err = run("summary", "--check")
+    assert code == 0
+    assert "Aggregates match a full recomputation." in err
+    assert "4000" in out and "EUR" in out
+    code, out, _ = run("summary", "--by-method", "--rebuild")
+    assert code == 0
+    assert "Compound" in out
+
+def test_snapshot_and_restore(tmp_path):
+    from loan_calculator.data_store import get_store, use_store
+    path = str(tmp_path / "loans.snap")
+    run("calculate", "2024-01-01", "2024-12-31", "1000", "usd", "5", "1")
+    run("calculate", "2024-01-01", "2024-12-31", "2000", "eur", "5", "1", "--rounding", "daily")
+    code, _, err = run("snapshot", path)
+    assert code == 0
+    assert f"Saved 2 calculations to {path}" in err
+    previous = get_store()
+    try:
+        code, _, err = run("restore", path)
+        assert code == 0
+        assert "Restored 2 calculations" in err
+        code, out, _ = run("show", "1", "--limit", "1")
+        assert "EUR" in out
+        code, _, err = run("calculate", "2024-01-01", "2024-12-31", "3000", "usd", "5", "1")
+        assert "Calculation saved with ID: 2" in err
+    finally:
+        use_store(previous)
@@ -1,11 +1,10 @@
 import pytest
+from loan_calculator import data_store
 from loan_calculator.data_store import (
     CalculationData,
     save_calculation,
     get_calculation,
-    list_calculations,
-    calculations,
-    next_id
+    list_calculations
 )
 from dataclasses import asdict
 
@@ -15,9 +14,7 @@ def reset_data_store():
     Fixture to reset the in-memory data store before each test.
     Ensures test isolation and prevents state leakage.
     """
-    calculations.clear()
-    global next_id
-    next_id = 0
+    data_store.get_store().clear()
     yield
 
 def test_save_calculation_new():
@@ -37,7 +34,7 @@ def test_save_calculation_new():
     )
     calc_id = save_calculation(calc_data)
     assert calc_id == 0, "First calculation ID should be 0"
-    assert calculations[calc_id] == calc_data, "Saved calculation should match input data"
+    assert get_calculation(calc_id) == calc_data, "Saved calculation should match input data"
 
 def test_save_calculation_with_id():
     """
@@ -57,7 +54,7 @@ def test_save_calculation_with_id():
     calc_id = 10
     returned_id = save_calculation(calc_data, calc_id=calc_id)
     assert returned_id == calc_id, "Returned ID should match the provided calc_id"
-    assert calculations[calc_id] == calc_data, "Saved calculation should match input data"
+    assert get_calculation(calc_id) == calc_data, "Saved calculation should match input data"
 
 def test_save_calculation_overwrite():
     """
@@ -88,7 +85,7 @@ def test_save_calculation_overwrite():
     )
     returned_id = save_calculation(updated_calc, calc_id=calc_id)
     assert returned_id == calc_id, "Returned ID should match the provided calc_id"
-    assert calculations[calc_id] == updated_calc, "Calculation should be updated with new data"
+    assert get_calculation(calc_id) == updated_calc, "Calculation should be updated with new data"
 
 def test_get_calculation_existing():
     """
@@ -175,7 +172,7 @@ def test_save_calculation_invalid_id():
     calc_id = -5
     returned_id = save_calculation(calc_data, calc_id=calc_id)
     assert returned_id == calc_id, "Returned ID should match the provided negative calc_id"
-    assert calculations[calc_id] == calc_data, "Calculation should be saved with the negative calc_id"
+    assert get_calculation(calc_id) == calc_data, "Calculation should be saved with the negative calc_id"
 
 def test_save_calculation_duplicate():
     """
@@ -206,7 +203,7 @@ def test_save_calculation_duplicate():
     returned_id = save_calculation(calc2, calc_id=calc_id)
     
     assert returned_id == calc_id, "Returned ID should match the provided calc_id"
-    assert calculations[calc_id] == calc2, "Second calculation should overwrite the first one"
+    assert get_calculation(calc_id) == calc2, "Second calculation should overwrite the first one"
 
 def test_calculation_data_equality():
     """
@@ -273,5 +270,115 @@ def test_calculation_data_hash():
     calc_set = {calc1, calc2}
     assert len(calc_set) == 1, "Identical CalculationData instances should have the same hash and be treated as one in a set"
 
+def test_sharded_store_allocates_unique_ids_under_contention():
+    """
+    Test that threads saving, batch-saving and updating at the same time
+    never share an ID and never lose a write.
+    """
+    import sys
+    import threading
+    store = data_store.ShardedMemoryStore(shards=4)
+    threads_count, saves = 8, 300
+    saved = [[] for _ in range(threads_count)]
+    start = threading.Barrier(threads_count)
+
+    def worker(index):
+        start.wait()
+        for n in range(saves):
+            calc = CalculationData("2024-01-01", "2024-12-31", float(index * saves + n), "USD", 5.0, 2.0, False, "simple")
+            if n % 10 == 0:
+                saved[index].extend(zip(store.save_many([calc, calc]), [calc, calc]))
+            else:
+                saved[index].append((store.save(calc), calc))
+        # Rewrite everything this thread owns; the last write must stick.
+        for calc_id, calc in saved[index]:
+            store.save(CalculationData(**{**asdict(calc), "margin": 3.0}), calc_id)
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(threads_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+    ids = [calc_id for items in saved for calc_id, _ in items]
+    assert len(ids) == len(set(ids)) == threads_count * saves * 11 // 10
+    assert sorted(ids) == list(range(len(ids)))
+    assert len(store) == len(ids) and store.next_id == len(ids)
+    for items in saved:
+        for calc_id, calc in items:
+            assert store.get(calc_id) == CalculationData(**{**asdict(calc), "margin": 3.0})
+
+def test_save_calculation_hooks_see_saves_in_store_order(tmp_path):
+    """
+    Test that concurrent save_calculation calls with the audit log hook give
+    every save its own sequence number and log each ID's versions in the
+    order the store applied them.
+    """
+    import sys
+    import threading
+    from loan_calculator.audit_log import AuditLog
+    log = AuditLog(str(tmp_path / "audit.log"), sync_every=1000)
+    data_store.add_save_hook(log.append)
+    threads_count, saves = 8, 400
+    start = threading.Barrier(threads_count)
+
+    def worker(index):
+        start.wait()
+        for n in range(saves):
+            calc = CalculationData("2024-01-01", "2024-12-31", float(index * saves + n), "USD", 5.0, 2.0, False, "simple")
+            # Half the saves fight over a handful of IDs far past the new ones.
+            save_calculation(calc, 10000 + n % 5 if n % 2 else -1)
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(threads_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+        data_store.remove_save_hook(log.append)
+
+    records = list(log.replay())
+    assert len(records) == threads_count * saves
+    assert sorted(record.seq for record in records) == list(range(len(records)))
+    for calc_id in range(10000, 10005):
+        history = log.history(calc_id)
+        assert history[-1].calculation == get_calculation(calc_id)
+        assert [record.op for record in history] == ["create"] + ["update"] * (len(history) - 1)
+    log.close()
+
+def test_sharded_store_snapshots_see_whole_batches():
+    """
+    Test that listing while batches are written sees each batch entirely or not at all.
+    """
+    import threading
+    store = data_store.ShardedMemoryStore(shards=8)
+    done = threading.Event()
+
+    def writer():
+        for batch in range(200):
+            calc = CalculationData("2024-01-01", "2024-12-31", float(batch), "USD", 5.0, 2.0, False, "simple")
+            store.save_many([calc] * 13)
+        done.set()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    snapshots = 0
+    while not done.is_set() or snapshots == 0:
+        items = store.list()
+        assert [calc_id for calc_id, _ in items] == list(range(len(items)))
+        assert len(items) % 13 == 0
+        snapshots += 1
+    thread.join()
+    assert len(store) == 200 * 13
+
 if __name__ == "__main__":
     pytest.main(["-v", "tests/test_data_store.py"])
\ No newline at end of file
@@ -0,0 +1,28 @@
+from datetime import date, datetime
+import pytest
+from loan_calculator.dates import EPOCH_ORDINAL, epoch_day, is_weekend_ordinal, iso_date, iso_dates, parse_ordinal, weekday
+
+def test_parse_ordinal_matches_strptime():
+    for text in ("2024-01-01", "2024-02-29", "1999-12-31", "2053-12-31"):
+        assert parse_ordinal(text) == datetime.strptime(text, "%Y-%m-%d").toordinal()
+
+def test_parse_ordinal_keeps_strptime_leniency_and_errors():
+    assert parse_ordinal("2024-1-5") == date(2024, 1, 5).toordinal()
+    for text in ("2023-02-29", "2024-13-01", "01/01/2024", "20240101", ""):
+        with pytest.raises(ValueError):
+            parse_ordinal(text)
+
+def test_iso_round_trip():
+    ordinals = [date(2024, 1, 1).toordinal() + offset for offset in range(0, 800, 37)]
+    assert iso_dates(ordinals) == [date.fromordinal(o).isoformat() for o in ordinals]
+    assert iso_date(parse_ordinal("2031-07-04")) == "2031-07-04"
+
+def test_weekday_arithmetic_matches_calendar():
+    start = date(2024, 1, 1).toordinal()
+    for ordinal in range(start, start + 14):
+        assert weekday(ordinal) == date.fromordinal(ordinal).weekday()
+        assert is_weekend_ordinal(ordinal) == (date.fromordinal(ordinal).weekday() >= 5)
+
+def test_epoch_day():
+    assert epoch_day("1970-01-01") == 0
+    assert EPOCH_ORDINAL == date(1970, 1, 1).toordinal()
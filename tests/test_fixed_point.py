@@ -0,0 +1,136 @@
+import random
+from fractions import Fraction
+from math import floor
+import numpy as np
+import pytest
+from loan_calculator.batch import validate_row
+from loan_calculator.cache import result_cache
+from loan_calculator.data_store import CalculationData
+from loan_calculator.fixed_point import YEAR_DENOMINATOR, round_div, scaled_rate, to_minor
+from loan_calculator.interest_calculations import (
+    daily_interest_columns,
+    iter_interest_chunks,
+    total_interest,
+    total_minor_interest,
+)
+from loan_calculator.periods import period_breakdown
+from loan_calculator.portfolio import portfolio_daily_interest, portfolio_total_interest
+from loan_calculator.rate_curves import register_rate_curve, unregister_rate_curve
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    result_cache.clear()
+    yield
+    result_cache.clear()
+
+def loan(method="simple", rounding="daily", amount=100000.0, currency="USD", **kwargs):
+    fields = dict(start_date="2024-01-01", end_date="2025-12-31", base_rate=5.125, margin=1.375, exclude_weekends=False)
+    fields.update(kwargs)
+    return CalculationData(amount=amount, currency=currency, method=method, rounding=rounding, **fields)
+
+def reference(calc, with_margin=True):
+    # Day by day in exact fractions, over the float engine's accrual dates.
+    float_calc = CalculationData(**{**calc.__dict__, "rounding": None})
+    dates = daily_interest_columns(float_calc).dates.astype(np.int64)
+    base_rates = [calc.base_rate] * len(dates)
+    if calc.rate_curve:
+        from loan_calculator.rate_curves import get_rate_curve
+        base_rates = get_rate_curve(calc.rate_curve).rate_on(dates, calc.base_rate).tolist()
+
+    margin = scaled_rate(calc.margin)
+    balance = Fraction(to_minor(calc.amount, calc.currency))
+    base_total = total = Fraction(0)
+    for base_rate in base_rates:
+        rate = scaled_rate(base_rate)
+        base_day = balance * rate / YEAR_DENOMINATOR
+        total_day = balance * (rate + margin) / YEAR_DENOMINATOR
+        if calc.rounding == "daily":
+            base_day, total_day = floor(base_day + Fraction(1, 2)), floor(total_day + Fraction(1, 2))
+        base_total += base_day
+        total += total_day
+        if calc.method == "compound":
+            balance += total_day
+    return floor((total if with_margin else base_total) + Fraction(1, 2))
+
+@pytest.mark.parametrize("method", ["simple", "compound"])
+@pytest.mark.parametrize("rounding", ["daily", "total"])
+def test_matches_exact_day_by_day_reference(method, rounding):
+    rng = random.Random(7)
+    # Exactly compounded fractions grow with every day, so keep those short.
+    years = (2024, 2025) if (method, rounding) == ("compound", "total") else (2024, 2026)
+    for _ in range(8):
+        calc = loan(
+            method,
+            rounding,
+            amount=round(rng.uniform(100, 5000000), 2),
+            base_rate=round(rng.uniform(0, 9), 3),
+            margin=round(rng.uniform(0, 3), 4),
+            exclude_weekends=rng.random() < 0.5,
+            end_date=f"{rng.randrange(*years)}-{rng.randrange(2, 13):02d}-15",
+        )
+        assert total_minor_interest(calc) == reference(calc)
+        assert total_minor_interest(calc, with_margin=False) == reference(calc, with_margin=False)
+
+@pytest.mark.parametrize("method", ["simple", "compound"])
+@pytest.mark.parametrize("rounding", ["daily", "total"])
+def test_rate_curve_matches_reference(method, rounding):
+    register_rate_curve("test_fixed", [("2024-03-01", 5.3), ("2024-09-02", 4.55), ("2025-01-06", 0.0)])
+    try:
+        calc = loan(method, rounding, rate_curve="TEST_FIXED", margin=0.0, exclude_weekends=True)
+        assert total_minor_interest(calc) == reference(calc)
+        assert total_minor_interest(calc, with_margin=False) == reference(calc, with_margin=False)
+    finally:
+        unregister_rate_curve("test_fixed")
+
+def test_amounts_beyond_float_precision_are_exact():
+    # 10^16 cents can't be held exactly in a float, so every boundary takes
+    # the exact path.
+    calc = loan("compound", "total", amount=1e14, end_date="2024-02-15")
+    assert total_minor_interest(calc) == reference(calc)
+    assert total_minor_interest(calc, with_margin=False) == reference(calc, with_margin=False)
+
+def test_halves_round_up():
+    # 182.50 at 1% accrues exactly half a cent a day.
+    assert round_div(18250 * scaled_rate(1.0), YEAR_DENOMINATOR) == 1
+    daily = loan(amount=182.5, base_rate=1.0, margin=0.0, end_date="2024-01-10")
+    assert total_minor_interest(daily) == 10
+    assert total_minor_interest(loan(amount=182.5, base_rate=1.0, margin=0.0, end_date="2024-01-10", rounding="total")) == 5
+    assert total_minor_interest(loan(amount=182.5, base_rate=1.0, margin=0.0, end_date="2024-01-09", rounding="total")) == 5
+
+@pytest.mark.parametrize("method", ["simple", "compound"])
+@pytest.mark.parametrize("rounding", ["daily", "total"])
+def test_rows_and_periods_add_up_to_the_total(method, rounding):
+    calc = loan(method, rounding, exclude_weekends=True)
+    cents = total_minor_interest(calc)
+    columns = daily_interest_columns(calc)
+    assert round(columns.margin_interest.sum() * 100) == cents
+    assert np.array_equal(np.round(columns.margin_interest * 100) / 100, columns.margin_interest)
+    assert round(period_breakdown(calc, "monthly").margin_interest.sum() * 100) == cents
+    assert total_interest(calc) == cents / 100
+
+    resumed = np.concatenate([chunk.margin_interest for chunk in iter_interest_chunks(calc, "2025-02-03", 40)])
+    assert np.array_equal(resumed, columns.margin_interest[-len(resumed):])
+
+def test_minor_units_follow_the_currency():
+    assert total_minor_interest(loan(amount=1000000.0, currency="JPY")) == total_minor_interest(loan(amount=10000.0))
+    assert to_minor(12.345, "KWD") == 12345
+    with pytest.raises(ValueError, match="Amount 10.5 has more decimal places"):
+        to_minor(10.5, "JPY")
+    with pytest.raises(ValueError, match="Rate 5.0000001"):
+        scaled_rate(5.0000001)
+
+def test_portfolio_prices_fixed_point_loans_exactly():
+    calcs = [loan("compound"), loan("simple", rounding="total"), loan("compound", rounding=None)]
+    totals = portfolio_total_interest(calcs)
+    assert totals.tolist() == [total_interest(calc) for calc in calcs]
+    schedules = portfolio_daily_interest(calcs)
+    assert np.array_equal(schedules[0].margin_interest, daily_interest_columns(calcs[0]).margin_interest)
+
+def test_batch_rows_select_rounding():
+    row = {"start_date": "2024-01-01", "end_date": "2024-02-01", "amount": "1000.25", "currency": "usd",
+           "base_rate": "5", "margin": "1", "rounding": "Daily"}
+    assert validate_row(row).rounding == "daily"
+    with pytest.raises(ValueError, match="Unknown rounding: weekly"):
+        validate_row({**row, "rounding": "weekly"})
+    with pytest.raises(ValueError, match="more decimal places"):
+        validate_row({**row, "amount": "1000.255"})
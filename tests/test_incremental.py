@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+from dataclasses import replace
+from loan_calculator.cache import result_cache
+from loan_calculator.data_store import CalculationData, get_store, save_calculation
+from loan_calculator.interest_calculations import daily_interest_columns, daily_schedule, derive_schedule
+
+@pytest.fixture(autouse=True)
+def reset_state():
+    get_store().clear()
+    result_cache.clear()
+    yield
+    result_cache.clear()
+
+def loan(method="compound", exclude_weekends=True):
+    return CalculationData(
+        start_date="2024-01-03",
+        end_date="2026-05-17",
+        amount=250000.0,
+        currency="EUR",
+        base_rate=4.0,
+        margin=1.5,
+        exclude_weekends=exclude_weekends,
+        method=method
+    )
+
+def assert_matches_full(schedule, calc):
+    expected = daily_interest_columns(calc)
+    assert list(schedule.ordinals) == (expected.dates.astype(np.int64) + 719163).tolist()
+    assert list(schedule.days_elapsed) == expected.days_elapsed.tolist()
+    assert np.allclose(schedule.base_interest, expected.base_interest, rtol=1e-12)
+    assert np.allclose(schedule.margin_interest, expected.margin_interest, rtol=1e-12)
+
+CHANGES = [
+    {"end_date": "2031-02-01"},
+    {"end_date": "2025-01-10"},
+    {"amount": 90000.0},
+    {"base_rate": 3.0, "margin": 2.5},
+    {"currency": "USD"},
+    {"amount": 1.0, "end_date": "2027-12-31"},
+]
+
+@pytest.mark.parametrize("method", ["simple", "compound"])
+@pytest.mark.parametrize("exclude_weekends", [False, True])
+@pytest.mark.parametrize("change", CHANGES)
+def test_derived_schedule_matches_full_recompute(method, exclude_weekends, change):
+    previous = loan(method, exclude_weekends)
+    current = replace(previous, **change)
+    derived = derive_schedule(previous, current, daily_schedule(previous))
+    assert derived is not None
+    assert_matches_full(derived, current)
+
+@pytest.mark.parametrize("change", [
+    {"start_date": "2024-01-02"},
+    {"exclude_weekends": False},
+    {"method": "simple"},
+    {"margin": 3.0},
+])
+def test_changes_that_move_every_compound_row_need_a_recompute(change):
+    previous = loan("compound")
+    assert derive_schedule(previous, replace(previous, **change), daily_schedule(previous)) is None
+
+def test_margin_change_on_simple_interest_is_derived():
+    previous = loan("simple")
+    current = replace(previous, margin=3.0)
+    derived = derive_schedule(previous, current, daily_schedule(previous))
+    assert list(derived.base_interest) == list(daily_schedule(previous).base_interest)
+    assert_matches_full(derived, current)
+
+def test_update_carries_cached_schedule_over():
+    previous = loan()
+    calc_id = save_calculation(previous)
+    daily_schedule(previous)
+    current = replace(previous, end_date="2027-05-17")
+    save_calculation(current, calc_id)
+    assert daily_schedule.cache_key(previous) not in result_cache
+    assert daily_schedule.cache_key(current) in result_cache
+    assert_matches_full(daily_schedule(current), current)
+
+def test_update_without_cached_schedule_computes_nothing():
+    previous = loan()
+    calc_id = save_calculation(previous)
+    save_calculation(replace(previous, amount=1.0), calc_id)
+    assert len(result_cache) == 0
@@ -1,12 +1,18 @@
 
 import pytest
+import numpy as np
 from datetime import datetime
 from loan_calculator.data_store import CalculationData
 from loan_calculator.interest_calculations import (
     parse_date,
     is_weekend,
     simple_interest_daily,
+    count_included_days,
+    closed_form_interest,
+    daily_interest_columns,
     daily_interest_data,
+    iter_daily_interest_data,
+    iter_interest_chunks,
     total_interest
 )
 
@@ -174,19 +180,19 @@ def test_total_interest_simple(simple_calc):
     data = daily_interest_data(simple_calc)
     total = total_interest(simple_calc, with_margin=True)
     expected_total = sum(day["Daily Interest (With Margin)"] for day in data)
-    assert total == expected_total
+    assert total == pytest.approx(expected_total)
 
 def test_total_interest_compound(compound_calc):
     data = daily_interest_data(compound_calc)
     total = total_interest(compound_calc, with_margin=True)
     expected_total = sum(day["Daily Interest (With Margin)"] for day in data)
-    assert total == expected_total
+    assert total == pytest.approx(expected_total)
 
 def test_total_interest_no_margin(simple_calc):
     data = daily_interest_data(simple_calc)
     total = total_interest(simple_calc, with_margin=False)
     expected_total = sum(day["Daily Interest (No Margin)"] for day in data)
-    assert total == expected_total
+    assert total == pytest.approx(expected_total)
 
 def test_total_interest_zero_days():
     calc = CalculationData(
@@ -215,7 +221,210 @@ def test_total_interest_negative_amount():
     )
     total = total_interest(calc)
     expected_total = sum(day["Daily Interest (With Margin)"] for day in daily_interest_data(calc))
-    assert total == expected_total, "total_interest should handle negative amounts correctly"
+    assert total == pytest.approx(expected_total), "total_interest should handle negative amounts correctly"
+
+def test_count_included_days_matches_calendar():
+    start = datetime(2024, 1, 1)
+    for offset in range(0, 7):
+        for length in range(0, 40):
+            first = datetime(2024, 1, 1 + offset)
+            last = datetime.fromordinal(first.toordinal() + length)
+            expected = sum(
+                1 for i in range(length + 1)
+                if not is_weekend(datetime.fromordinal(first.toordinal() + i))
+            )
+            assert count_included_days(first, last, True) == expected
+            assert count_included_days(first, last, False) == length + 1
+    assert count_included_days(start, datetime(2023, 12, 31), True) == 0
+
+@pytest.mark.parametrize("method", ["simple", "compound"])
+@pytest.mark.parametrize("exclude_weekends", [False, True])
+@pytest.mark.parametrize("with_margin", [False, True])
+def test_closed_form_interest_matches_daily_sum(method, exclude_weekends, with_margin):
+    calc = CalculationData(
+        start_date="2024-01-03",
+        end_date="2026-07-19",
+        amount=25000.0,
+        currency="USD",
+        base_rate=4.25,
+        margin=1.75,
+        exclude_weekends=exclude_weekends,
+        method=method
+    )
+    key = "Daily Interest (With Margin)" if with_margin else "Daily Interest (No Margin)"
+    expected = sum(day[key] for day in daily_interest_data(calc))
+    assert closed_form_interest(calc, with_margin) == pytest.approx(expected, rel=1e-12)
+
+def test_closed_form_interest_zero_rate_compound():
+    calc = CalculationData(
+        start_date="2024-01-01",
+        end_date="2024-01-10",
+        amount=1000.0,
+        currency="USD",
+        base_rate=0.0,
+        margin=0.0,
+        exclude_weekends=False,
+        method="compound"
+    )
+    assert closed_form_interest(calc) == 0.0
+
+def test_closed_form_interest_weekend_only_range():
+    calc = CalculationData(
+        start_date="2024-01-06",
+        end_date="2024-01-07",
+        amount=1000.0,
+        currency="USD",
+        base_rate=5.0,
+        margin=2.0,
+        exclude_weekends=True,
+        method="compound"
+    )
+    assert closed_form_interest(calc) == 0.0
+
+def test_closed_form_interest_invalid_method():
+    calc = CalculationData(
+        start_date="2024-01-01",
+        end_date="2024-01-10",
+        amount=1000.0,
+        currency="USD",
+        base_rate=5.0,
+        margin=2.0,
+        exclude_weekends=False,
+        method="invalid_method"
+    )
+    with pytest.raises(ValueError, match="Unknown method: invalid_method"):
+        closed_form_interest(calc)
+
+def test_daily_interest_columns_dtypes(simple_calc):
+    columns = daily_interest_columns(simple_calc)
+    assert len(columns) == 10
+    assert columns.dates.dtype == np.dtype("datetime64[D]")
+    assert columns.base_interest.dtype == np.float64
+    assert columns.margin_interest.dtype == np.float64
+    assert columns.days_elapsed.tolist() == list(range(1, 11))
+    assert columns.dates[0] == np.datetime64("2024-01-01")
+
+def test_daily_interest_columns_exclude_weekends(exclude_weekends_calc):
+    columns = daily_interest_columns(exclude_weekends_calc)
+    weekdays = [parse_date(str(day)).weekday() for day in columns.dates]
+    assert len(columns) == 8
+    assert all(weekday < 5 for weekday in weekdays)
+    assert columns.days_elapsed[-1] == 8
+
+def test_daily_interest_columns_compound_growth(compound_calc):
+    columns = daily_interest_columns(compound_calc)
+    growth = 1 + 0.07 / 365.0
+    ratios = columns.margin_interest[1:] / columns.margin_interest[:-1]
+    assert ratios == pytest.approx(np.full(9, growth))
+
+def test_daily_interest_columns_empty():
+    calc = CalculationData(
+        start_date="2024-01-10",
+        end_date="2024-01-05",
+        amount=1000.0,
+        currency="USD",
+        base_rate=5.0,
+        margin=2.0,
+        exclude_weekends=False,
+        method="simple"
+    )
+    columns = daily_interest_columns(calc)
+    assert len(columns) == 0
+    assert columns.to_dicts() == []
+
+def test_daily_interest_data_is_view_of_columns(compound_calc):
+    columns = daily_interest_columns(compound_calc)
+    data = daily_interest_data(compound_calc)
+    assert [day["Accrual Date"] for day in data] == np.datetime_as_string(columns.dates).tolist()
+    assert [day["Daily Interest (With Margin)"] for day in data] == columns.margin_interest.tolist()
+
+@pytest.mark.parametrize("method", ["simple", "compound"])
+@pytest.mark.parametrize("chunk_days", [1, 3, 7, 366])
+def test_iter_daily_interest_data_matches_full_schedule(method, chunk_days):
+    calc = CalculationData(
+        start_date="2024-01-01",
+        end_date="2024-03-31",
+        amount=1000.0,
+        currency="USD",
+        base_rate=5.0,
+        margin=2.0,
+        exclude_weekends=True,
+        method=method
+    )
+    streamed = list(iter_daily_interest_data(calc, chunk_days=chunk_days))
+    expected = daily_interest_data(calc)
+    assert [day["Accrual Date"] for day in streamed] == [day["Accrual Date"] for day in expected]
+    assert [day["Days Elapsed"] for day in streamed] == [day["Days Elapsed"] for day in expected]
+    assert [day["Daily Interest (With Margin)"] for day in streamed] == pytest.approx(
+        [day["Daily Interest (With Margin)"] for day in expected], rel=1e-12
+    )
+
+def test_iter_interest_chunks_bounded(compound_calc):
+    chunks = list(iter_interest_chunks(compound_calc, chunk_days=4))
+    assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+
+@pytest.mark.parametrize("method", ["simple", "compound"])
+def test_iter_daily_interest_data_from_date_and_skip(method):
+    calc = CalculationData(
+        start_date="2024-01-01",
+        end_date="2024-02-29",
+        amount=1000.0,
+        currency="USD",
+        base_rate=5.0,
+        margin=2.0,
+        exclude_weekends=True,
+        method=method
+    )
+    expected = [day for day in daily_interest_data(calc) if day["Accrual Date"] >= "2024-01-20"][5:]
+    streamed = list(iter_daily_interest_data(calc, from_date="2024-01-20", skip=5, chunk_days=4))
+    assert [day["Accrual Date"] for day in streamed] == [day["Accrual Date"] for day in expected]
+    assert [day["Days Elapsed"] for day in streamed] == [day["Days Elapsed"] for day in expected]
+    assert [day["Daily Interest (No Margin)"] for day in streamed] == pytest.approx(
+        [day["Daily Interest (No Margin)"] for day in expected], rel=1e-12
+    )
+
+@pytest.mark.parametrize("exclude_weekends", [False, True])
+@pytest.mark.parametrize("skip", [1, 9, 40, 41, 500])
+def test_skip_matches_dropping_rows(exclude_weekends, skip):
+    calc = CalculationData("2024-01-03", "2024-02-29", 1000.0, "USD", 5.0, 2.0, exclude_weekends, "compound")
+    expected = daily_interest_data(calc)[skip:]
+    streamed = list(iter_daily_interest_data(calc, skip=skip, chunk_days=7))
+    assert [day["Accrual Date"] for day in streamed] == [day["Accrual Date"] for day in expected]
+    assert [day["Days Elapsed"] for day in streamed] == [day["Days Elapsed"] for day in expected]
+    assert [day["Daily Interest (With Margin)"] for day in streamed] == pytest.approx(
+        [day["Daily Interest (With Margin)"] for day in expected], rel=1e-12
+    )
+
+def test_skip_does_not_build_skipped_rows(monkeypatch):
+    from loan_calculator import interest_calculations
+    calc = CalculationData("2000-01-01", "2039-12-31", 1000.0, "USD", 5.0, 2.0, True, "compound")
+    built = []
+    columns_between = interest_calculations._columns_between
+    monkeypatch.setattr(
+        interest_calculations, "_columns_between",
+        lambda *args: built.append(args[1]) or columns_between(*args),
+    )
+    row = next(iter_daily_interest_data(calc, skip=10000, chunk_days=100))
+    assert len(built) == 1
+    assert row["Days Elapsed"] == 10001
+
+def test_iter_daily_interest_data_from_date_before_start(simple_calc):
+    streamed = list(iter_daily_interest_data(simple_calc, from_date="2023-12-01"))
+    assert streamed == daily_interest_data(simple_calc)
+
+def test_iter_daily_interest_data_invalid_method():
+    calc = CalculationData(
+        start_date="2024-01-01",
+        end_date="2024-01-10",
+        amount=1000.0,
+        currency="USD",
+        base_rate=5.0,
+        margin=2.0,
+        exclude_weekends=False,
+        method="invalid_method"
+    )
+    with pytest.raises(ValueError, match="Unknown method: invalid_method"):
+        next(iter_daily_interest_data(calc))
 
 if __name__ == "__main__":
     pytest.main(["-v", "test_interest_calculations.py"])
\ No newline at end of file
@@ -0,0 +1,86 @@
+import random
+import pytest
+from loan_calculator.data_store import CalculationData, ListQuery, MemoryStore, ShardedMemoryStore
+from loan_calculator.sqlite_store import SQLiteStore
+
+CURRENCIES = ["USD", "EUR", "GBP"]
+
+def make_calcs(count, seed=7):
+    rng = random.Random(seed)
+    calcs = []
+    for _ in range(count):
+        start = f"202{rng.randint(0, 4)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        end = f"203{rng.randint(0, 4)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        calcs.append(CalculationData(
+            start, end, float(rng.choice([1000, 2500, 5000, 10000, 25000])), rng.choice(CURRENCIES),
+            5.0, 1.0, False, rng.choice(["simple", "compound"])
+        ))
+    return calcs
+
+@pytest.fixture(params=["memory", "sharded", "sqlite"])
+def store(request):
+    store = {"memory": MemoryStore, "sharded": ShardedMemoryStore, "sqlite": SQLiteStore}[request.param]()
+    calcs = make_calcs(400)
+    store.save_many(calcs)
+    # Updates move entries between index buckets.
+    for calc_id in range(0, 400, 7):
+        store.save(CalculationData(**{**calcs[calc_id].__dict__, "currency": "JPY", "amount": 777.0}), calc_id)
+    yield store
+    if request.param == "sqlite":
+        store.close()
+
+def brute_force(store, query):
+    def keep(item):
+        calc = item[1]
+        checks = [
+            query.currency is None or calc.currency == query.currency,
+            query.method is None or calc.method == query.method,
+            query.start_from is None or calc.start_date >= query.start_from,
+            query.start_to is None or calc.start_date <= query.start_to,
+            query.end_from is None or calc.end_date >= query.end_from,
+            query.end_to is None or calc.end_date <= query.end_to,
+            query.min_amount is None or calc.amount >= query.min_amount,
+            query.max_amount is None or calc.amount <= query.max_amount,
+        ]
+        return all(checks)
+
+    def sort_key(item):
+        return (item[0] if query.sort == "id" else getattr(item[1], query.sort), item[0])
+    return sorted(filter(keep, store.list()), key=sort_key, reverse=query.descending)
+
+QUERIES = [
+    ListQuery(),
+    ListQuery(currency="USD", limit=10),
+    ListQuery(currency="JPY", method="compound", sort="amount", descending=True, limit=5),
+    ListQuery(start_from="2022-01-01", start_to="2023-06-30", sort="start_date", limit=25),
+    ListQuery(end_to="2031-12-31", min_amount=5000, sort="end_date", descending=True, limit=30, offset=3),
+    ListQuery(currency="EUR", min_amount=2500, max_amount=10000, sort="start_date", limit=7),
+    ListQuery(currency="GBP", start_from="2024-06-01", sort="amount", limit=4),
+    ListQuery(currency="CHF"),
+]
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_pages_walk_the_same_rows_as_a_scan(store, query):
+    expected = brute_force(store, query)
+    walked = []
+    page = store.query(query)
+    assert page.total == len(expected)
+    walked += page.items
+    while page.next_cursor:
+        page = store.query(ListQuery(**{**query.__dict__, "offset": 0, "cursor": page.next_cursor}))
+        assert page.total == len(expected)
+        walked += page.items
+    assert walked == expected[query.offset:]
+
+def test_offset_and_limit(store):
+    expected = brute_force(store, ListQuery(sort="amount"))
+    page = store.query(ListQuery(sort="amount", limit=20, offset=40))
+    assert page.items == expected[40:60]
+
+def test_invalid_queries(store):
+    with pytest.raises(ValueError, match="Unknown sort field: rate"):
+        store.query(ListQuery(sort="rate"))
+    with pytest.raises(ValueError, match="Invalid cursor: nope"):
+        store.query(ListQuery(sort="amount", cursor="nope"))
+    with pytest.raises(ValueError, match="Limit must be positive"):
+        store.query(ListQuery(limit=0))
@@ -0,0 +1,79 @@
+import json
+import pytest
+from loan_calculator.data_store import CalculationData
+from loan_calculator.interest_calculations import daily_interest_columns, iter_daily_interest_data, total_interest
+from loan_calculator.metrics import LATENCY_BUCKETS, Metrics, metrics, timed, to_dict, to_prometheus, write_metrics
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+def test_timed_counts_calls_rows_and_errors():
+    registry = Metrics()
+
+    @timed("double", rows=len, registry=registry)
+    def double(values):
+        if not values:
+            raise ValueError("empty")
+        return values * 2
+
+    assert double([1, 2]) == [1, 2, 1, 2]
+    with pytest.raises(ValueError):
+        double([])
+    stats = registry.snapshot()["double"]
+    assert (stats.calls, stats.errors, stats.rows) == (2, 1, 4)
+    assert sum(stats.buckets) == 2
+    assert double.__name__ == "double"
+
+def test_timed_generator_counts_yielded_rows():
+    registry = Metrics()
+
+    @timed("count", registry=registry)
+    def count(n):
+        yield from range(n)
+
+    assert list(count(5)) == [0, 1, 2, 3, 4]
+    # A generator closed early is still recorded.
+    partial = count(10)
+    next(partial)
+    partial.close()
+    stats = registry.snapshot()["count"]
+    assert (stats.calls, stats.rows) == (2, 6)
+
+def test_quantiles_are_bucket_upper_bounds():
+    registry = Metrics()
+    for _ in range(90):
+        registry.observe("op", 1.5e-6)
+    for _ in range(10):
+        registry.observe("op", 0.001)
+    stats = registry.snapshot()["op"]
+    assert stats.quantile(0.5) == LATENCY_BUCKETS[1]
+    assert 0.001 <= stats.quantile(0.99) < 0.002
+    assert stats.mean == pytest.approx((90 * 1.5e-6 + 10 * 0.001) / 100)
+
+def test_calculation_paths_are_instrumented():
+    calc = CalculationData("2024-01-01", "2024-03-31", 10000.0, "USD", 5.0, 2.0, False, "compound")
+    days = len(daily_interest_columns(calc))
+    rows = list(iter_daily_interest_data(calc))
+    total_interest(calc)
+    total_interest(calc)
+    report = to_dict()["operations"]
+    assert report["daily_interest_columns"]["rows"] >= days
+    assert report["iter_daily_interest_data"]["rows"] == len(rows) == days
+    assert report["total_interest"]["calls"] == 2
+
+def test_prometheus_and_json_exports(tmp_path):
+    metrics.observe("store.get", 0.002, rows=1)
+    text = to_prometheus()
+    assert 'loan_calculator_calls_total{operation="store.get"} 1' in text
+    assert 'loan_calculator_latency_seconds_bucket{operation="store.get",le="+Inf"} 1' in text
+    assert "# TYPE loan_calculator_cache_hits_total counter" in text
+
+    write_metrics(str(tmp_path / "metrics.json"))
+    report = json.loads((tmp_path / "metrics.json").read_text())
+    assert report["operations"]["store.get"]["calls"] == 1
+    assert "hit_ratio" in report["cache"]
+    write_metrics(str(tmp_path / "metrics.prom"))
+    assert (tmp_path / "metrics.prom").read_text() == to_prometheus()
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+from loan_calculator.data_store import CalculationData
+from loan_calculator.interest_calculations import daily_interest_columns, total_interest
+from loan_calculator.periods import PERIODS, cumulative_interest, included_days_before, period_breakdown, period_starts
+
+def loan(method="simple", exclude_weekends=False, start="2024-01-03", end="2027-11-20"):
+    return CalculationData(
+        start_date=start,
+        end_date=end,
+        amount=100000.0,
+        currency="USD",
+        base_rate=5.0,
+        margin=2.0,
+        exclude_weekends=exclude_weekends,
+        method=method
+    )
+
+@pytest.mark.parametrize("method", ["simple", "compound"])
+@pytest.mark.parametrize("exclude_weekends", [False, True])
+@pytest.mark.parametrize("period", PERIODS)
+def test_breakdown_matches_grouped_daily_schedule(method, exclude_weekends, period):
+    calc = loan(method, exclude_weekends)
+    daily = daily_interest_columns(calc)
+    periods = period_breakdown(calc, period)
+    group = np.searchsorted(periods.starts, daily.dates, side="right") - 1
+    assert np.array_equal(np.bincount(group, minlength=len(periods)), periods.days)
+    assert np.allclose(np.bincount(group, daily.base_interest, len(periods)), periods.base_interest, rtol=1e-9)
+    assert np.allclose(np.bincount(group, daily.margin_interest, len(periods)), periods.margin_interest, rtol=1e-9)
+    assert periods.margin_interest.sum() == pytest.approx(total_interest(calc))
+
+def test_period_boundaries_are_calendar_aligned():
+    starts = period_starts(np.datetime64("2024-02-14"), np.datetime64("2025-01-05"), "quarterly")
+    assert np.datetime_as_string(starts).tolist() == ["2024-02-14", "2024-04-01", "2024-07-01", "2024-10-01", "2025-01-01"]
+    weeks = period_starts(np.datetime64("2024-01-03"), np.datetime64("2024-01-20"), "weekly")
+    assert np.datetime_as_string(weeks).tolist() == ["2024-01-03", "2024-01-08", "2024-01-15"]
+    with pytest.raises(ValueError):
+        period_starts(np.datetime64("2024-01-01"), np.datetime64("2024-02-01"), "fortnightly")
+
+def test_monthly_rows_and_labels():
+    periods = period_breakdown(loan(start="2024-01-15", end="2024-03-10"), "monthly")
+    rows = periods.to_dicts()
+    assert [(r["Period Start"], r["Period End"], r["Days"]) for r in rows] == [
+        ("2024-01-15", "2024-01-31", 17),
+        ("2024-02-01", "2024-02-29", 29),
+        ("2024-03-01", "2024-03-10", 10),
+    ]
+
+def test_weekend_only_periods_are_dropped():
+    # Saturday to the following Sunday: only the Monday-Friday week remains.
+    periods = period_breakdown(loan(exclude_weekends=True, start="2024-01-06", end="2024-01-14"), "weekly")
+    assert np.datetime_as_string(periods.starts).tolist() == ["2024-01-08"]
+    assert periods.days.tolist() == [5]
+
+def test_from_date_starts_mid_loan_with_compounded_balance():
+    calc = loan("compound")
+    full = period_breakdown(calc, "monthly")
+    tail = period_breakdown(calc, "monthly", from_date="2025-03-01")
+    assert tail.starts[0] == np.datetime64("2025-03-01")
+    assert np.allclose(tail.margin_interest, full.margin_interest[-len(tail):])
+
+def test_cumulative_helpers():
+    calc = loan(exclude_weekends=True, start="2024-01-01", end="2024-01-31")
+    days = np.array(["2023-12-25", "2024-01-01", "2024-01-08", "2024-02-05"], dtype="datetime64[D]")
+    assert included_days_before(calc, days).tolist() == [0, 0, 5, 23]
+    assert cumulative_interest(calc, np.array([0, 23]))[1] == pytest.approx(total_interest(calc))
+    with pytest.raises(ValueError):
+        cumulative_interest(CalculationData("2024-01-01", "2024-01-02", 1.0, "USD", 1.0, 0.0, False, "weird"), np.array([1]))
@@ -0,0 +1,118 @@
+import random
+import pytest
+from datetime import date
+import numpy as np
+from loan_calculator.data_store import (
+    CalculationData,
+    save_calculation,
+    list_calculations,
+    get_store
+)
+from loan_calculator.interest_calculations import (
+    daily_interest_columns,
+    closed_form_interest
+)
+from loan_calculator.portfolio import (
+    portfolio_from_calculations,
+    portfolio_total_interest,
+    portfolio_daily_interest,
+    included_days
+)
+
+@pytest.fixture
+def loans():
+    rng = random.Random(1234)
+    result = []
+    for _ in range(300):
+        start = 738886 + rng.randrange(0, 400)
+        length = rng.choice([-3, 0, 1, 2, 6, 7, 30, 31, 365, 1000])
+        result.append(CalculationData(
+            start_date=date.fromordinal(start).isoformat(),
+            end_date=date.fromordinal(start + length).isoformat(),
+            amount=rng.choice([0.0, 1000.0, 12345.67, -500.0, 2500000.0]),
+            currency="USD",
+            base_rate=rng.choice([0.0, 1.5, 4.25, 7.0]),
+            margin=rng.choice([0.0, 0.5, 2.0]),
+            exclude_weekends=rng.random() < 0.5,
+            method=rng.choice(["simple", "compound"])
+        ))
+    return result
+
+@pytest.fixture(autouse=True)
+def reset_data_store():
+    get_store().clear()
+    yield
+    get_store().clear()
+
+@pytest.mark.parametrize("with_margin", [True, False])
+def test_portfolio_totals_match_per_loan(loans, with_margin):
+    totals = portfolio_total_interest(loans, with_margin)
+    expected = [closed_form_interest(calc, with_margin) for calc in loans]
+    assert totals.tolist() == expected
+
+def test_portfolio_daily_interest_matches_per_loan(loans):
+    for calc, columns in zip(loans, portfolio_daily_interest(loans)):
+        expected = daily_interest_columns(calc)
+        assert np.array_equal(columns.dates, expected.dates)
+        assert np.array_equal(columns.days_elapsed, expected.days_elapsed)
+        assert columns.base_interest.tolist() == expected.base_interest.tolist()
+        assert columns.margin_interest.tolist() == expected.margin_interest.tolist()
+
+def test_included_days_from_structure_of_arrays():
+    portfolio = portfolio_from_calculations([])
+    assert len(portfolio) == 0
+    assert portfolio_daily_interest(portfolio) == []
+    assert portfolio_total_interest(portfolio).size == 0
+
+    portfolio = portfolio_from_calculations([
+        CalculationData("2024-01-01", "2024-01-10", 1000.0, "USD", 5.0, 2.0, True, "simple"),
+        CalculationData("2024-01-06", "2024-01-07", 1000.0, "USD", 5.0, 2.0, True, "simple"),
+        CalculationData("2024-01-06", "2024-01-07", 1000.0, "USD", 5.0, 2.0, False, "simple"),
+    ])
+    assert included_days(portfolio).tolist() == [8, 0, 2]
+
+def test_portfolio_from_list_calculations():
+    first = save_calculation(CalculationData("2024-01-01", "2024-12-31", 1000.0, "USD", 5.0, 2.0, False, "simple"))
+    second = save_calculation(CalculationData("2024-02-01", "2024-03-31", 2000.0, "EUR", 3.0, 1.0, True, "compound"))
+    portfolio = portfolio_from_calculations(list_calculations())
+    assert portfolio.ids.tolist() == [first, second]
+    totals = portfolio_total_interest(list_calculations())
+    assert totals.tolist() == [closed_form_interest(calc) for _, calc in list_calculations()]
+
+def test_portfolio_invalid_method():
+    loans = [
+        CalculationData("2024-01-01", "2024-01-10", 1000.0, "USD", 5.0, 2.0, False, "simple"),
+        CalculationData("2024-01-01", "2024-01-10", 1000.0, "USD", 5.0, 2.0, False, "invalid_method"),
+    ]
+    with pytest.raises(ValueError, match="Unknown method: invalid_method"):
+        portfolio_total_interest(loans)
+    with pytest.raises(ValueError, match="Unknown method: invalid_method"):
+        portfolio_daily_interest(loans)
+
+def test_unit_schedules_match_single_loan_engine_without_cache(loans):
+    from loan_calculator.cache import result_cache
+    result_cache.clear()
+    portfolio = portfolio_daily_interest(loans)
+    result_cache.clear()
+    for calc, columns in zip(loans, portfolio):
+        expected = daily_interest_columns(calc)
+        assert columns.base_interest.tolist() == expected.base_interest.tolist()
+        assert columns.margin_interest.tolist() == expected.margin_interest.tolist()
+    result_cache.clear()
+
+def test_loans_differing_only_in_amount_share_one_schedule():
+    from loan_calculator.cache import result_cache
+    from loan_calculator.interest_calculations import schedule_profile, unit_schedule
+    result_cache.clear()
+    template = CalculationData("2024-01-01", "2026-12-31", 1.0, "USD", 4.25, 1.5, True, "compound")
+    calcs = [CalculationData(**{**template.__dict__, "amount": 1000.0 + i}) for i in range(200)]
+    calcs.append(CalculationData(**{**template.__dict__, "margin": 2.0}))
+    schedules = portfolio_daily_interest(calcs)
+    assert len(result_cache) == 2
+    assert schedules[0].dates is schedules[199].dates
+    unit = unit_schedule(schedule_profile(calcs[0]))
+    assert unit.balances.flags.writeable is False
+    # Single loans read the unit schedule the portfolio cached.
+    assert daily_interest_columns(calcs[5]).dates is schedules[0].dates
+    assert len(result_cache) == 2
+    result_cache.clear()
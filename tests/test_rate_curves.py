@@ -0,0 +1,157 @@
+import numpy as np
+import pytest
+from loan_calculator.cache import result_cache
+from loan_calculator.calendars import register_calendar, unregister_calendar
+from loan_calculator.data_store import CalculationData
+from loan_calculator.interest_calculations import (
+    closed_form_interest,
+    daily_interest_columns,
+    iter_interest_chunks,
+    total_interest,
+)
+from loan_calculator.periods import period_breakdown
+from loan_calculator.portfolio import (
+    portfolio_daily_interest,
+    portfolio_from_calculations,
+    portfolio_total_interest,
+    price_on_curve,
+    reprice,
+)
+from loan_calculator.rate_curves import (
+    build_rate_curve,
+    get_rate_curve,
+    has_rate_curve,
+    register_rate_curve,
+    unregister_rate_curve,
+)
+
+FIXINGS = [("2024-01-15", 5.3), ("2024-03-01", 5.1), ("2024-06-17", 4.8), ("2024-09-02", 4.5), ("2025-01-06", 4.3)]
+
+@pytest.fixture
+def sofr():
+    curve = register_rate_curve("test_sofr", FIXINGS)
+    result_cache.clear()
+    yield curve
+    unregister_rate_curve("test_sofr")
+    result_cache.clear()
+
+def loan(method="simple", start="2024-01-01", end="2025-03-31", exclude_weekends=False, calendar=None):
+    return CalculationData(
+        start_date=start,
+        end_date=end,
+        amount=100000.0,
+        currency="USD",
+        base_rate=5.0,
+        margin=1.5,
+        exclude_weekends=exclude_weekends,
+        method=method,
+        calendar=calendar,
+        rate_curve="TEST_SOFR"
+    )
+
+def test_rate_on_steps_at_each_fixing(sofr):
+    days = np.array(["2024-01-14", "2024-01-15", "2024-02-29", "2024-03-01", "2030-01-01"], dtype="datetime64[D]")
+    assert sofr.rate_on(days.astype(np.int64), 9.9).tolist() == [9.9, 5.3, 5.3, 5.1, 4.3]
+
+def test_daily_columns_follow_the_curve(sofr):
+    columns = daily_interest_columns(loan())
+    rates = columns.base_interest * 36500 / 100000.0
+    assert rates[0] == pytest.approx(5.0)
+    assert rates[14] == pytest.approx(5.3)
+    assert rates[-1] == pytest.approx(4.3)
+
+@pytest.mark.parametrize("method", ["simple", "compound"])
+@pytest.mark.parametrize("exclude_weekends", [False, True])
+def test_segment_totals_match_daily_sum(sofr, method, exclude_weekends):
+    calc = loan(method, exclude_weekends=exclude_weekends)
+    columns = daily_interest_columns(calc)
+    assert closed_form_interest(calc) == pytest.approx(columns.margin_interest.sum(), rel=1e-9)
+    assert closed_form_interest(calc, with_margin=False) == pytest.approx(columns.base_interest.sum(), rel=1e-9)
+    assert total_interest(calc) == pytest.approx(columns.margin_interest.sum(), rel=1e-9)
+
+def test_segment_totals_with_holiday_calendar(sofr):
+    register_calendar("test_curve_cal", ["2024-01-15", "2024-07-04", "2024-12-25"])
+    try:
+        calc = loan("compound", calendar="TEST_CURVE_CAL")
+        columns = daily_interest_columns(calc)
+        assert closed_form_interest(calc) == pytest.approx(columns.margin_interest.sum(), rel=1e-9)
+    finally:
+        unregister_calendar("test_curve_cal")
+
+def test_chunks_resume_on_the_curve_balance(sofr):
+    calc = loan("compound")
+    full = daily_interest_columns(calc)
+    resumed = np.concatenate([chunk.margin_interest for chunk in iter_interest_chunks(calc, "2024-06-20", 50)])
+    assert resumed == pytest.approx(full.margin_interest[-len(resumed):], rel=1e-12)
+
+def test_period_breakdown_on_curve(sofr):
+    calc = loan("compound")
+    breakdown = period_breakdown(calc, "monthly")
+    assert breakdown.margin_interest.sum() == pytest.approx(daily_interest_columns(calc).margin_interest.sum(), rel=1e-9)
+
+@pytest.mark.parametrize("method", ["simple", "compound"])
+def test_portfolio_matches_single_loans(sofr, method):
+    calcs = [
+        loan(method),
+        loan(method, start="2024-05-01", exclude_weekends=True),
+        loan(method, start="2025-02-01"),
+        CalculationData("2024-01-01", "2024-12-31", 5000.0, "USD", 4.0, 1.0, False, method),
+    ]
+    totals = portfolio_total_interest(calcs)
+    assert totals.tolist() == [total_interest(calc) for calc in calcs]
+    for columns, calc in zip(portfolio_daily_interest(calcs), calcs):
+        assert np.array_equal(columns.margin_interest, daily_interest_columns(calc).margin_interest)
+
+def test_reprice_only_touches_later_segments(sofr):
+    calcs = [loan("compound"), loan("simple", start="2024-04-01"), loan("compound", end="2024-05-31")]
+    portfolio = portfolio_from_calculations(calcs)
+    loans = np.arange(len(calcs))
+    pricing = price_on_curve(portfolio, loans, sofr)
+
+    moved = build_rate_curve("TEST_SOFR", FIXINGS[:3] + [("2024-09-02", 4.75), FIXINGS[4], ("2025-03-03", 4.1)])
+    repriced = reprice(pricing, moved)
+    fresh = price_on_curve(portfolio, loans, moved)
+    assert repriced.totals() == pytest.approx(fresh.totals(), rel=1e-12)
+    assert repriced.totals(False) == pytest.approx(fresh.totals(False), rel=1e-12)
+    # The loan that ends before the change keeps its pricing outright.
+    assert repriced.totals()[2] == pricing.totals()[2]
+    before = np.datetime64("2024-06-17").astype(np.int64)
+    assert np.array_equal(
+        repriced.margin_interest[repriced.start_days < before], pricing.margin_interest[pricing.start_days < before]
+    )
+
+    assert reprice(pricing, build_rate_curve("TEST_SOFR", FIXINGS)).totals().tolist() == pricing.totals().tolist()
+
+def test_reregistering_a_curve_invalidates_cached_results(sofr):
+    calc = loan()
+    first = total_interest(calc)
+    register_rate_curve("test_sofr", [("2024-01-15", 6.0)])
+    assert total_interest(calc) > first
+
+def test_curves_load_from_directory(tmp_path, monkeypatch):
+    (tmp_path / "DIRCURVE.csv").write_text("date,rate\n# comment\n2024-01-01,5.0\n2024-02-01,4.5\n")
+    monkeypatch.setenv("LOAN_CALCULATOR_RATE_DIR", str(tmp_path))
+    try:
+        assert has_rate_curve("dircurve")
+        assert get_rate_curve("DIRCURVE").rates.tolist() == [5.0, 4.5]
+    finally:
+        unregister_rate_curve("dircurve")
+    assert not has_rate_curve("missing")
+    with pytest.raises(ValueError, match="Unknown rate curve: missing"):
+        get_rate_curve("missing")
+
+def test_curve_names_cannot_leave_the_directory(tmp_path, monkeypatch):
+    directory = tmp_path / "curves"
+    directory.mkdir()
+    (tmp_path / "OUTSIDE.csv").write_text("2024-01-01,5.0\n")
+    monkeypatch.setenv("LOAN_CALCULATOR_RATE_DIR", str(directory))
+    assert not has_rate_curve("../outside")
+    with pytest.raises(ValueError, match="Unknown rate curve"):
+        get_rate_curve("../OUTSIDE")
+
+def test_malformed_fixing_rows_are_rejected(tmp_path, monkeypatch):
+    (tmp_path / "SHORT.csv").write_text("date,rate\n2024-01-01,5.0\n2024-01-02\n")
+    monkeypatch.setenv("LOAN_CALCULATOR_RATE_DIR", str(tmp_path))
+    with pytest.raises(ValueError, match="Malformed fixing row in .*SHORT.csv: \\['2024-01-02'\\]"):
+        get_rate_curve("short")
+    assert not has_rate_curve("short")
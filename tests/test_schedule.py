@@ -0,0 +1,61 @@
+import pytest
+from array import array
+from datetime import date
+from loan_calculator.data_store import CalculationData
+from loan_calculator.interest_calculations import daily_interest_columns, daily_schedule
+from loan_calculator.schedule import Schedule, ScheduleRow
+
+@pytest.fixture
+def calc():
+    return CalculationData(
+        start_date="2024-01-01",
+        end_date="2024-01-31",
+        amount=1000.0,
+        currency="USD",
+        base_rate=5.0,
+        margin=2.0,
+        exclude_weekends=True,
+        method="compound"
+    )
+
+def test_schedule_columns_are_compact(calc):
+    schedule = daily_schedule(calc)
+    assert len(schedule) == 23
+    assert schedule.ordinals.typecode == "i"
+    assert schedule.base_interest.typecode == "d"
+    assert schedule.nbytes == 23 * (2 * schedule.ordinals.itemsize + 2 * schedule.base_interest.itemsize)
+
+def test_schedule_matches_columns(calc):
+    schedule = daily_schedule(calc)
+    columns = daily_interest_columns(calc)
+    assert schedule.to_dicts() == columns.to_dicts()
+    assert schedule[0].ordinal == date(2024, 1, 1).toordinal()
+
+def test_schedule_indexing_and_slicing(calc):
+    schedule = daily_schedule(calc)
+    row = schedule[-1]
+    assert isinstance(row, ScheduleRow)
+    assert row.accrual_date == "2024-01-31"
+    assert row.days_elapsed == 23
+    window = schedule[5:10]
+    assert isinstance(window, Schedule)
+    assert [r.days_elapsed for r in window] == [6, 7, 8, 9, 10]
+    assert window.to_dicts() == schedule.to_dicts()[5:10]
+
+def test_schedule_row_as_dict():
+    row = ScheduleRow(date(2024, 2, 29).toordinal(), 1.0, 2.0, 3)
+    assert row.as_dict() == {
+        "Accrual Date": "2024-02-29",
+        "Daily Interest (No Margin)": 1.0,
+        "Daily Interest (With Margin)": 2.0,
+        "Days Elapsed": 3
+    }
+    assert not hasattr(row, "__dict__")
+
+def test_empty_schedule():
+    schedule = Schedule()
+    assert len(schedule) == 0
+    assert list(schedule) == []
+    assert schedule.to_dicts() == []
+    assert schedule.nbytes == 0
+    assert schedule.ordinals == array("i")
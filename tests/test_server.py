@@ -0,0 +1,208 @@
+import asyncio
+import http.client
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from loan_calculator.data_store import MemoryStore, get_calculation, use_store
+from loan_calculator.interest_calculations import daily_interest_columns, total_interest
+from loan_calculator.server import Coalescer, LoanServer
+
+LOAN = {
+    "start_date": "2024-01-01",
+    "end_date": "2024-03-31",
+    "amount": 10000,
+    "currency": "usd",
+    "base_rate": 5.0,
+    "margin": 2.0,
+    "method": "compound",
+}
+
+@pytest.fixture
+def store():
+    previous = use_store(MemoryStore())
+    yield
+    use_store(previous)
+
+def serve(scenario):
+    # Runs the server on a free localhost port and drives it from plain
+    # blocking clients in a thread, as another service would.
+    async def main():
+        server = LoanServer(workers=2)
+        await server.start("127.0.0.1", 0)
+        try:
+            return await asyncio.to_thread(scenario, server)
+        finally:
+            await server.close()
+    return asyncio.run(main())
+
+def request(server, method, path, body=None, connection=None):
+    connection = connection or http.client.HTTPConnection("127.0.0.1", server.port, timeout=10)
+    payload = json.dumps(body) if body is not None else None
+    connection.request(method, path, payload, {"Content-Type": "application/json"})
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+def test_calculate_show_update_list(store):
+    def scenario(server):
+        connection = http.client.HTTPConnection("127.0.0.1", server.port, timeout=10)
+        status, created = request(server, "POST", "/calculations", LOAN, connection)
+        assert status == 201
+        calc = get_calculation(created["id"])
+        assert created["calculation"]["currency"] == "USD"
+        assert created["total_interest"] == pytest.approx(total_interest(calc))
+
+        # The same keep-alive connection serves the follow-up requests.
+        status, shown = request(server, "GET", f"/calculations/{created['id']}?limit=10&page=2", connection=connection)
+        assert status == 200
+        assert shown["pages"] == 10
+        assert [row["Accrual Date"] for row in shown["rows"]][:2] == ["2024-01-11", "2024-01-12"]
+        assert shown["rows"][0]["Daily Interest (With Margin)"] == daily_interest_columns(calc).margin_interest[10]
+
+        status, monthly = request(server, "GET", f"/calculations/{created['id']}?period=monthly", connection=connection)
+        assert [row["Period Start"] for row in monthly["rows"]] == ["2024-01-01", "2024-02-01", "2024-03-01"]
+
+        status, updated = request(server, "PUT", f"/calculations/{created['id']}", {**LOAN, "amount": 20000}, connection)
+        assert status == 200
+        assert updated["calculation"]["amount"] == 20000.0
+
+        status, listed = request(server, "GET", "/calculations", connection=connection)
+        assert [item["id"] for item in listed["items"]] == [created["id"]]
+        assert listed["items"][0]["total_interest"] == pytest.approx(updated["total_interest"])
+        assert (listed["total"], listed["next_cursor"]) == (1, None)
+    serve(scenario)
+
+@pytest.mark.parametrize("method, path, body, status, message", [
+    ("GET", "/calculations/7", None, 404, "Calculation not found."),
+    ("PUT", "/calculations/7", LOAN, 404, "Calculation not found."),
+    ("POST", "/calculations", {**LOAN, "end_date": "2023-01-01"}, 400, "End date must be after start date."),
+    ("POST", "/calculations", {"amount": 1}, 400, "Missing fields"),
+    ("POST", "/calculations", [1, 2], 400, "Request body must be a JSON object."),
+    ("DELETE", "/calculations", None, 405, "Method DELETE is not allowed"),
+    ("GET", "/loans", None, 404, "Unknown path: /loans"),
+])
+def test_errors(store, method, path, body, status, message):
+    def scenario(server):
+        return request(server, method, path, body)
+    got_status, payload = serve(scenario)
+    assert got_status == status
+    assert message in payload["error"]
+
+def test_list_filters_and_pages(store):
+    def scenario(server):
+        for amount, currency in [(500, "usd"), (2500, "eur"), (1500, "usd"), (3500, "usd")]:
+            request(server, "POST", "/calculations", {**LOAN, "amount": amount, "currency": currency})
+        _, first = request(server, "GET", "/calculations?currency=usd&sort=amount&desc=1&limit=2")
+        assert [item["calculation"]["amount"] for item in first["items"]] == [3500.0, 1500.0]
+        assert first["total"] == 3
+        _, second = request(server, "GET", f"/calculations?currency=usd&sort=amount&desc=1&limit=2&cursor={first['next_cursor']}")
+        assert [item["calculation"]["amount"] for item in second["items"]] == [500.0]
+        assert second["next_cursor"] is None
+        assert request(server, "GET", "/calculations?sort=rate")[1]["error"] == "Unknown sort field: rate"
+        assert request(server, "GET", "/calculations?min_amount=lots")[0] == 400
+    serve(scenario)
+
+def test_show_rejects_bad_query(store):
+    def scenario(server):
+        _, created = request(server, "POST", "/calculations", LOAN)
+        assert request(server, "GET", f"/calculations/{created['id']}?period=hourly")[1]["error"] == "Unknown period: hourly"
+        assert request(server, "GET", f"/calculations/{created['id']}?limit=0")[0] == 400
+        assert "out of range" in request(server, "GET", f"/calculations/{created['id']}?limit=50&page=3")[1]["error"]
+    serve(scenario)
+
+def test_identical_requests_share_one_computation():
+    release = threading.Event()
+    calls = []
+
+    def compute(value):
+        calls.append(value)
+        release.wait(5)
+        return value * 2
+
+    async def main():
+        coalescer = Coalescer(ThreadPoolExecutor(2))
+        tasks = [asyncio.create_task(coalescer.run(("key", 21), compute, 21)) for _ in range(10)]
+        other = asyncio.create_task(coalescer.run(("key", 1), compute, 1))
+        await asyncio.sleep(0.05)
+        assert len(coalescer) == 2
+        release.set()
+        results = await asyncio.gather(*tasks, other)
+        coalescer.executor.shutdown()
+        return coalescer, results
+
+    coalescer, results = asyncio.run(main())
+    assert results == [42] * 10 + [2]
+    assert sorted(calls) == [1, 21]
+    assert (coalescer.started, coalescer.coalesced) == (2, 9)
+    assert len(coalescer) == 0
+
+def test_concurrent_clients(store):
+    def scenario(server):
+        _, created = request(server, "POST", "/calculations", LOAN)
+
+        def client(results):
+            connection = http.client.HTTPConnection("127.0.0.1", server.port, timeout=10)
+            for _ in range(20):
+                results.append(request(server, "GET", f"/calculations/{created['id']}?period=monthly", connection=connection)[0])
+
+        results = []
+        threads = [threading.Thread(target=client, args=(results,)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results, server.requests
+    results, handled = serve(scenario)
+    assert results == [200] * 160
+    assert handled == 161
+
+def test_metrics_endpoint_serves_prometheus_text(store):
+    def scenario(server):
+        request(server, "POST", "/calculations", LOAN)
+        connection = http.client.HTTPConnection("127.0.0.1", server.port, timeout=10)
+        connection.request("GET", "/metrics")
+        response = connection.getresponse()
+        return response.status, response.getheader("Content-Type"), response.read().decode()
+
+    status, content_type, text = serve(scenario)
+    assert status == 200
+    assert content_type.startswith("text/plain")
+    assert 'loan_calculator_calls_total{operation="http.post"}' in text
+
+def test_summary_endpoint(store):
+    def scenario(server):
+        request(server, "POST", "/calculations", LOAN)
+        request(server, "POST", "/calculations", {**LOAN, "method": "simple"})
+        return request(server, "GET", "/summary"), request(server, "GET", "/summary?by_method=1")
+
+    (status, summary), (_, by_method) = serve(scenario)
+    assert status == 200
+    assert [(group["currency"], group["loans"], group["total_amount"]) for group in summary["groups"]] == [("USD", 2, 20000.0)]
+    assert [group["method"] for group in by_method["groups"]] == ["compound", "simple"]
+
+@pytest.mark.parametrize("length", ["ten", "-5"])
+def test_invalid_content_length(store, length):
+    def scenario(server):
+        connection = http.client.HTTPConnection("127.0.0.1", server.port, timeout=10)
+        connection.putrequest("POST", "/calculations")
+        connection.putheader("Content-Length", length)
+        connection.endheaders()
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+
+    assert serve(scenario) == (400, {"error": "Invalid Content-Length."})
+
+def test_saves_run_off_the_event_loop(store):
+    from loan_calculator import data_store
+    threads = []
+    hook = lambda calc_id, caldata, previous: threads.append(threading.current_thread().name)
+    data_store.add_save_hook(hook)
+    try:
+        def scenario(server):
+            _, created = request(server, "POST", "/calculations", LOAN)
+            request(server, "PUT", f"/calculations/{created['id']}", {**LOAN, "amount": 20000})
+        serve(scenario)
+    finally:
+        data_store.remove_save_hook(hook)
+    assert len(threads) == 2
+    assert all(name.startswith("loan-calculator-store") for name in threads)
@@ -0,0 +1,87 @@
+import random
+import pytest
+from loan_calculator.data_store import CalculationData, ListQuery, ShardedMemoryStore
+from loan_calculator.snapshot import HEADER, RECORD, SnapshotStore, write_snapshot
+
+def random_loan(rng):
+    return CalculationData(
+        start_date=rng.choice(["2024-01-01", "2024-03-15", "2024-07-01"]),
+        end_date=rng.choice(["2024-12-31", "2025-06-30", "2026-01-01"]),
+        amount=round(rng.uniform(1000, 1000000), 2),
+        currency=rng.choice(["USD", "EUR", "JPY"]),
+        base_rate=round(rng.uniform(0, 8), 3),
+        margin=1.5,
+        exclude_weekends=rng.random() < 0.5,
+        method=rng.choice(["simple", "compound"]),
+        calendar=rng.choice([None, "USD"]),
+        rate_curve=rng.choice([None, "SOFR"]),
+        rounding=rng.choice([None, "daily", "total"]),
+    )
+
+@pytest.fixture
+def stores(tmp_path):
+    rng = random.Random(3)
+    memory = ShardedMemoryStore()
+    memory.save_many(random_loan(rng) for _ in range(500))
+    memory.save(random_loan(rng), 900)
+    path = tmp_path / "loans.snap"
+    assert write_snapshot(str(path), memory) == 501
+    return memory, SnapshotStore(str(path)), rng
+
+QUERIES = [
+    ListQuery(limit=20),
+    ListQuery(currency="EUR", sort="amount", descending=True, limit=7, offset=3),
+    ListQuery(method="compound", start_from="2024-03-15", end_to="2025-06-30", sort="end_date", limit=10),
+    ListQuery(min_amount=250000, max_amount=750000, sort="start_date"),
+    ListQuery(currency="GBP"),
+]
+
+def test_fixed_width_layout(stores, tmp_path):
+    memory, snapshot, _ = stores
+    size = (tmp_path / "loans.snap").stat().st_size
+    # Seven distinct strings per field at most; the records dominate.
+    assert HEADER.size + 501 * RECORD.size < size < HEADER.size + 501 * RECORD.size + 500
+    assert snapshot.next_id == 901
+
+def test_restored_store_matches_original(stores):
+    memory, snapshot, _ = stores
+    assert len(snapshot) == len(memory)
+    assert snapshot.get(42) == memory.get(42)
+    assert snapshot.get(900) == memory.get(900)
+    assert snapshot.get(700) is None
+    assert snapshot.list() == memory.list()
+    assert list(snapshot.iter(batch_size=64)) == memory.list()
+    for query in QUERIES:
+        assert snapshot.query(query) == memory.query(query)
+
+def test_cursor_pages_match(stores):
+    memory, snapshot, _ = stores
+    query = ListQuery(sort="amount", limit=50)
+    while True:
+        page = snapshot.query(query)
+        assert page == memory.query(query)
+        if page.next_cursor is None:
+            break
+        query = ListQuery(sort="amount", limit=50, cursor=page.next_cursor)
+
+def test_saves_shadow_mapped_records(stores):
+    memory, snapshot, rng = stores
+    for calc_id in (0, 17, 17, 900):
+        calc = random_loan(rng)
+        memory.save(calc, calc_id)
+        snapshot.save(calc, calc_id)
+    # The header's next_id skips past every stored id, explicit ones included.
+    memory.next_id = snapshot.next_id
+    calc = random_loan(rng)
+    assert snapshot.save(calc) == memory.save(calc) == 901
+    assert snapshot.save_many([calc, calc]) == memory.save_many([calc, calc])
+    assert len(snapshot) == len(memory)
+    assert snapshot.list() == memory.list()
+    for query in QUERIES:
+        assert snapshot.query(query) == memory.query(query)
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "not.snap"
+    path.write_bytes(b"x" * 64)
+    with pytest.raises(ValueError, match="Not a calculation snapshot"):
+        SnapshotStore(str(path))
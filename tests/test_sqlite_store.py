@@ -0,0 +1,130 @@
+import pytest
+from loan_calculator import data_store
+from loan_calculator.data_store import (
+    CalculationData,
+    save_calculation,
+    save_calculations,
+    get_calculation,
+    list_calculations,
+    iter_calculations,
+    use_store
+)
+from loan_calculator.sqlite_store import SQLiteStore
+
+def make_calc(index: int = 0, currency: str = "USD") -> CalculationData:
+    return CalculationData(
+        start_date="2024-01-01",
+        end_date=f"2024-02-{index % 28 + 1:02d}",
+        amount=1000.0 + index,
+        currency=currency,
+        base_rate=5.0,
+        margin=2.0,
+        exclude_weekends=index % 2 == 0,
+        method="compound" if index % 3 == 0 else "simple"
+    )
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteStore(str(tmp_path / "calculations.db"))
+    previous = use_store(store)
+    yield store
+    use_store(previous)
+    store.close()
+
+def test_wal_mode_and_indexes(store):
+    (mode,) = store.connection.execute("PRAGMA journal_mode").fetchone()
+    assert mode == "wal"
+    indexes = {row[1] for row in store.connection.execute("PRAGMA index_list(calculations)")}
+    assert {
+        "idx_calculations_currency",
+        "idx_calculations_method",
+        "idx_calculations_start_date",
+        "idx_calculations_end_date",
+    } <= indexes
+
+def test_save_and_get_roundtrip(store):
+    calc = make_calc(3)
+    calc_id = save_calculation(calc)
+    assert calc_id == 0
+    assert get_calculation(calc_id) == calc
+    assert get_calculation(999) is None
+
+def test_save_with_id_overwrites(store):
+    calc_id = save_calculation(make_calc(1))
+    save_calculation(make_calc(2), calc_id)
+    assert get_calculation(calc_id) == make_calc(2)
+    assert len(store) == 1
+
+def test_explicit_ids_do_not_advance_counter(store):
+    assert save_calculation(make_calc(1), 10) == 10
+    assert save_calculation(make_calc(2)) == 0
+    assert save_calculation(make_calc(3)) == 1
+
+def test_save_calculations_batch(store):
+    ids = save_calculations(make_calc(i) for i in range(500))
+    assert ids == list(range(500))
+    assert len(store) == 500
+    assert get_calculation(250) == make_calc(250)
+    assert save_calculation(make_calc(0)) == 500
+
+def test_iter_calculations_streams_in_id_order(store):
+    save_calculations(make_calc(i) for i in range(25))
+    rows = list(iter_calculations(batch_size=4))
+    assert [calc_id for calc_id, _ in rows] == list(range(25))
+    assert rows == list_calculations()
+
+def test_writes_during_iteration(store):
+    save_calculations(make_calc(i) for i in range(10))
+    seen = 0
+    for calc_id, calc in iter_calculations(batch_size=3):
+        save_calculation(calc, calc_id)
+        seen += 1
+    assert seen == 10
+
+def test_store_persists_across_connections(tmp_path):
+    path = str(tmp_path / "persist.db")
+    first = SQLiteStore(path)
+    first.save_many([make_calc(1), make_calc(2)])
+    first.close()
+    second = SQLiteStore(path)
+    assert second.list() == [(0, make_calc(1)), (1, make_calc(2))]
+    assert second.save(make_calc(3)) == 2
+    second.close()
+
+def test_default_store_is_memory():
+    assert isinstance(data_store.get_store(), data_store.ShardedMemoryStore)
+
+def test_calendar_round_trip(store):
+    calc = CalculationData("2024-01-01", "2024-02-01", 1000.0, "USD", 5.0, 2.0, False, "simple", calendar="USD")
+    calc_id = save_calculation(calc)
+    assert get_calculation(calc_id) == calc
+    assert get_calculation(save_calculation(make_calc())).calendar is None
+
+def test_rate_curve_round_trip(store):
+    calc = CalculationData("2024-01-01", "2024-02-01", 1000.0, "USD", 5.0, 2.0, False, "simple", rate_curve="SOFR")
+    assert get_calculation(save_calculation(calc)) == calc
+
+def test_rounding_round_trip(store):
+    calc = CalculationData("2024-01-01", "2024-02-01", 1000.0, "USD", 5.0, 2.0, False, "compound", rounding="daily")
+    assert get_calculation(save_calculation(calc)) == calc
+
+def test_older_database_gains_calendar_column(tmp_path):
+    import sqlite3
+    path = str(tmp_path / "old.db")
+    connection = sqlite3.connect(path)
+    connection.executescript(
+        "CREATE TABLE calculations (id INTEGER PRIMARY KEY, start_date TEXT NOT NULL, end_date TEXT NOT NULL, "
+        "amount REAL NOT NULL, currency TEXT NOT NULL, base_rate REAL NOT NULL, margin REAL NOT NULL, "
+        "exclude_weekends INTEGER NOT NULL, method TEXT NOT NULL);"
+        "INSERT INTO calculations VALUES (0, '2024-01-01', '2024-02-01', 1000.0, 'USD', 5.0, 2.0, 0, 'simple');"
+    )
+    connection.commit()
+    connection.close()
+    store = SQLiteStore(path)
+    try:
+        assert store.get(0) == CalculationData("2024-01-01", "2024-02-01", 1000.0, "USD", 5.0, 2.0, False, "simple")
+        assert store.get(0).calendar is None
+        assert store.get(0).rate_curve is None
+        assert store.get(0).rounding is None
+    finally:
+        store.close()